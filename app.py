@@ -4,9 +4,50 @@ import streamlit as st
 import os
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import plotly.express as px
-import io
+from dataclasses import replace
+
+from snc import (
+    N_ANIOS_DEFAULT,
+    SOLUCIONES_PREDETERMINADAS,
+    Parametros,
+    ResultadoPortafolio,
+    calcular_portafolio,
+    captura_acumulada,
+    formato_largo,
+    preparar_soluciones,
+    trayectoria_precio,
+    vector_descuento,
+)
+from snc.almacen import TablaSoluciones
+from snc.cache import CACHE_DISCO, CACHE_RESULTADOS, huella
+from snc.columnar import FORMATOS, exportar, leer_soluciones, tabla_flujos, tabla_sensibilidad
+from snc.corridas import RUTA_CORRIDAS, almacen_corridas, clave_resultado
+from snc.escenarios import (
+    COLUMNAS_CURVA,
+    curvas_desde_tabla,
+    escenarios_desde_tabla,
+    evaluar_escenarios,
+    tabla_curvas,
+    tabla_escenarios,
+)
+from snc.figuras import COLUMNA_CATEGORIA, MAX_CATEGORIAS, agregar_matriz, agregar_tabla, muestra_dispersion
+from snc.incremental import PortafolioIncremental
+from snc.indicadores import indicadores_financieros
+from snc.ingesta import ErrorIngesta
+from snc.montecarlo import ConfiguracionMonteCarlo, Distribucion, simular
+from snc.optimizacion import (
+    AREA_MINIMA_ASIGNADA,
+    Restricciones,
+    coeficientes_por_ha,
+    frontera_pareto,
+    optimizar,
+    vpn_motor,
+)
+from snc.parcelas import calcular_parcelas, leer_parcelas
+from snc.perfil import Perfilador
+from snc.reporte import DatosReporte, reporte_excel, reporte_pdf
+from snc.sensibilidad import flujos_por_precio, precio_equilibrio, superficie_vpn
+from snc.tornado import analisis_tornado
 
 # --- CONFIGURAR PÁGINA ---
 st.set_page_config(
@@ -19,11 +60,6 @@ st.set_page_config(
 # --- TÍTULO DE CONTROL ---
 st.title("🧪 Laboratorio de Pruebas")
 
-# --- INICIALIZAR VARIABLES ---
-resultados = []
-df_resultados = pd.DataFrame()
-flujo_total = np.zeros(30)
-
 # --- ESTILOS ---
 st.markdown("""
 <style>
@@ -56,11 +92,12 @@ st.markdown("""
 
 # --- SESSION STATE ---
 if "soluciones" not in st.session_state:
-    st.session_state["soluciones"] = []
+    # Tabla columnar: arreglos de tipo fijo en vez de una lista de diccionarios
+    st.session_state["soluciones"] = TablaSoluciones()
 
 # --- CONFIGURACIÓN GENERAL ---
 st.sidebar.header("Parámetros Generales del Proyecto")
-n_anios_default = 30
+n_anios_default = N_ANIOS_DEFAULT
 precio_carbono = st.sidebar.number_input("Precio del carbono (USD/ton CO2)", min_value=0.0, value=15.0, step=1.0)
 # NUEVO: crecimiento anual del precio del carbono
 crecimiento_precio_carbono = st.sidebar.slider(
@@ -88,50 +125,147 @@ multiplicador_area = st.sidebar.slider("Multiplicador de Área (%)", 50, 150, 10
 multiplicador_precio_carbono = st.sidebar.slider("Multiplicador Precio Carbono (%)", 50, 150, 100, 10) / 100
 multiplicador_tasa_descuento = st.sidebar.slider("Multiplicador Tasa Descuento (%)", 50, 150, 100, 10) / 100
 
+# --- CURVAS ANUALES: precios del carbono y estructuras de tasas (opcionales) ---
+st.sidebar.header("Curvas Anuales")
+
+
+def cargar_curvas(etiqueta, ayuda, escala=1.0, precios=False):
+    """Curvas `{nombre: tupla}` de un CSV ancho (Año + una columna por curva); {} sin archivo o si no es válido."""
+    archivo_curvas = st.sidebar.file_uploader(etiqueta, type=["csv"], help=ayuda, key=f"archivo_{etiqueta}")
+    if not archivo_curvas:
+        return {}
+    try:
+        return curvas_desde_tabla(pd.read_csv(archivo_curvas), escala, precios)
+    except ValueError as error:
+        st.sidebar.error(f"Curvas no válidas: {error}")
+        return {}
+
+
+curvas_precio = cargar_curvas(
+    "Curvas de precio del carbono (CSV)",
+    "Columna 'Año' y una columna por curva en USD/tCO2e (p. ej. mercado regulado y voluntario)",
+    precios=True,
+)
+curvas_descuento = cargar_curvas(
+    "Estructuras de tasas de descuento (CSV)",
+    "Columna 'Año' y una columna por estructura con la tasa spot de cada año en %",
+    escala=0.01,
+)
+SIN_CURVA_PRECIO = "Precio y crecimiento constantes"
+SIN_ESTRUCTURA = "Tasa única"
+nombre_curva_precio = st.sidebar.selectbox(
+    "Precio del proyecto", [SIN_CURVA_PRECIO, *curvas_precio],
+    help="Con curva, el precio de cada año es el de la curva; el crecimiento solo aplica después de su último año"
+)
+nombre_estructura = st.sidebar.selectbox(
+    "Descuento del proyecto", [SIN_ESTRUCTURA, *curvas_descuento],
+    help="Con estructura, cada año se descuenta con su tasa spot; después del último año se mantiene la última tasa"
+)
+
+parametros = Parametros(
+    precio_carbono=precio_carbono,
+    crecimiento_precio_carbono=crecimiento_precio_carbono,
+    tasa_descuento=tasa_descuento,
+    crecimiento_ingreso_encadenado=crecimiento_ingreso_encadenado,
+    multiplicador_area=multiplicador_area,
+    multiplicador_precio_carbono=multiplicador_precio_carbono,
+    multiplicador_tasa_descuento=multiplicador_tasa_descuento,
+    curva_precio=curvas_precio.get(nombre_curva_precio, ()),
+    curva_descuento=curvas_descuento.get(nombre_estructura, ()),
+)
+
+# --- GRÁFICOS: por encima de este número de soluciones se agrupan por tipo y "Otros" ---
+st.sidebar.header("Gráficos")
+max_categorias = st.sidebar.number_input(
+    "Series por gráfico", 3, 50, MAX_CATEGORIAS,
+    help="Con más soluciones, los gráficos las agrupan por tipo y juntan las menores en 'Otros'"
+)
+
+# --- DIAGNÓSTICO: perfil de rendimiento por etapa (opcional) ---
+st.sidebar.header("Diagnóstico")
+perfil_activo = st.sidebar.checkbox("Perfil de rendimiento", help="Mide tiempo, filas y memoria de cada etapa")
+registrar_perfil = st.sidebar.checkbox("Logs estructurados (JSON)", disabled=not perfil_activo)
+if "sesion_perfil" not in st.session_state:
+    st.session_state["sesion_perfil"] = Perfilador().sesion
+perfil = Perfilador(perfil_activo, registrar_perfil, CACHE_RESULTADOS, st.session_state.sesion_perfil)
+
+# --- HISTORIAL: cada valoración se guarda en una base SQLite local ---
+st.sidebar.header("Historial de corridas")
+guardar_corridas = st.sidebar.checkbox(
+    "Guardar corridas", value=True,
+    help=f"Base local {RUTA_CORRIDAS}; una corrida idéntica se lee de la base en vez de recalcularse"
+)
+almacen = almacen_corridas() if guardar_corridas else None
+
+# --- DESCARGAS: los archivos se generan solo al pedirlos, en caché por huella de las entradas ---
+def descarga_diferida(columna, clave, etiqueta, generar, nombre_archivo, mime):
+    """Botón "Preparar" que arma el archivo en el servidor; luego ofrece la descarga."""
+    estado = f"descarga_{etiqueta}"
+    if columna.button(f"Preparar {etiqueta}", key=f"preparar_{etiqueta}"):
+        st.session_state[estado] = clave
+    # Con entradas nuevas la huella cambia y vuelve a aparecer el botón "Preparar"
+    if st.session_state.get(estado) == clave:
+        with perfil.etapa("exportacion"):
+            datos = CACHE_RESULTADOS.obtener(huella("descarga", etiqueta, clave), generar)
+        columna.download_button(
+            label=f"Descargar {etiqueta}",
+            data=datos,
+            file_name=nombre_archivo,
+            mime=mime,
+            key=f"descargar_{etiqueta}"
+        )
+
+
+# Diccionario base de soluciones
+soluciones_predeterminadas = SOLUCIONES_PREDETERMINADAS
+
 # --- CARGA O FORMULARIO de SNC del Estudio ---
 st.sidebar.header("Modelación de SNCs")
+if "portafolio_incremental" not in st.session_state:
+    st.session_state["portafolio_incremental"] = PortafolioIncremental(
+        parametros, N_ANIOS_DEFAULT, st.session_state.soluciones
+    )
 if st.sidebar.button("Resetear Modelo"):
-    st.session_state.soluciones = []
+    # Vacía también la tabla de soluciones, que es la misma del portafolio incremental
+    st.session_state.portafolio_incremental.reiniciar()
     st.rerun()
-opcion_fuente = st.sidebar.radio("Ingreso de soluciones", ("Subir archivo Excel", "Modelación Interactiva"))
+opcion_fuente = st.sidebar.radio(
+    "Ingreso de soluciones", ("Subir archivo Excel", "Modelación Interactiva", "Inventario de parcelas")
+)
+modo_interactivo = opcion_fuente == "Modelación Interactiva"
+modo_parcelas = opcion_fuente == "Inventario de parcelas"
 
-if opcion_fuente.strip().lower() == "subir archivo excel":
-    archivo = st.sidebar.file_uploader("Sube archivo .xlsx", type=["xlsx"])
-    df_soluciones = pd.read_excel(archivo) if archivo else pd.DataFrame()
+if modo_parcelas:
+    archivo_parcelas = st.sidebar.file_uploader(
+        "Sube inventario .csv, .parquet, .arrow o .gpkg", type=["csv", "parquet", "arrow", "feather", "gpkg"]
+    )
+    df_soluciones = pd.DataFrame()
+    df_parcelas = pd.DataFrame()
+    if archivo_parcelas:
+        try:
+            with perfil.etapa("ingesta") as medicion:
+                df_parcelas = leer_parcelas(archivo_parcelas)
+                medicion["filas"] = len(df_parcelas)
+        except ErrorIngesta as error:
+            st.sidebar.error(f"Inventario no válido: {error}")
+
+elif not modo_interactivo:
+    archivo = st.sidebar.file_uploader("Sube archivo .xlsx, .parquet o .arrow", type=["xlsx", "parquet", "arrow", "feather"])
+    df_soluciones = pd.DataFrame()
+    if archivo:
+        try:
+            with perfil.etapa("ingesta") as medicion:
+                df_soluciones = leer_soluciones(archivo)
+                medicion["filas"] = len(df_soluciones)
+        except ErrorIngesta as error:
+            st.sidebar.error(f"Archivo no válido: {error}")
 
 else:
-    # Diccionario base de soluciones
-    soluciones_predeterminadas = {
-        # Restauración (captura constante o especial)
-        "Pastos Marinos": {"captura": 7.5, "costo": 70, "duracion": 30, "capex": 500, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-        "Manglares": {"captura": 10, "costo": 90, "duracion": 30, "capex": 800, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-        "Bosque Seco Tropical": {"captura": 6, "costo": 55, "duracion": 25, "capex": 400, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-        "Corales": {"captura": 3, "costo": 100, "duracion": 20, "capex": 1500, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-        "Agroforestería con Cacao": {"captura": 5, "costo": 50, "duracion": 20, "capex": 300, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-        "Bosque de Galería": {"captura": 8, "costo": 65, "duracion": 30, "capex": 600, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-        "Turberas Andinas": {"captura": 5, "costo": 70, "duracion": 30, "capex": 750, "tipo_captura": "constante", "tipo_sn": "restauracion"},
-
-        # Restauración especial
-        "Restauración de Pastos Degradados": {
-            "tipo_captura": "lineal", "captura_inicial": 2.0, "captura_final": 6.0,
-            "costo": 40, "duracion": 30, "capex": 300, "tipo_sn": "restauracion"
-        },
-        "Reforestación Productiva Zonas ECP": {
-            "tipo_captura": "lineal", "captura_inicial": 1.5, "captura_final": 5.5,
-            "costo": 60, "duracion": 30, "capex": 350, "tipo_sn": "restauracion"
-        },
-        "Restauración de Manglares Caribe (Esp.)": {
-            "tipo_captura": "sigmoidal", "captura_max": 8.0, "velocidad": 0.3, "punto_medio": 15,
-            "costo": 80, "duracion": 30, "capex": 900, "tipo_sn": "restauracion"
-        },
-
-        # Degradación Evitada (NUEVOS)
-        "Manglar Degradación Evitada": {"captura": 8.0, "costo": 60, "duracion": 30, "capex": 400, "tipo_captura": "constante", "tipo_sn": "degradacion"},
-        "Bosque Húmedo Degradación Evitada": {"captura": 7.0, "costo": 50, "duracion": 30, "capex": 350, "tipo_captura": "constante", "tipo_sn": "degradacion"},
-        "Páramo Degradación Evitada": {"captura": 5.5, "costo": 55, "duracion": 30, "capex": 370, "tipo_captura": "constante", "tipo_sn": "degradacion"},
-        "Humedal Degradación Evitada": {"captura": 6.5, "costo": 60, "duracion": 30, "capex": 390, "tipo_captura": "constante", "tipo_sn": "degradacion"},
-        "Pastos Degradación Evitada": {"captura": 4.5, "costo": 40, "duracion": 30, "capex": 310, "tipo_captura": "constante", "tipo_sn": "degradacion"}
-    }
+    # Resultados por solución memorizados: solo se recalcula todo si cambian los parámetros
+    incremental = st.session_state.portafolio_incremental
+    with perfil.etapa("calculo", len(st.session_state.soluciones)):
+        incremental.actualizar_parametros(parametros, n_anios_default)
+        incremental.sincronizar(st.session_state.soluciones)
 
     # Selector dinámico
     tipo_sol = st.sidebar.selectbox("Tipo de solución", list(soluciones_predeterminadas))
@@ -143,6 +277,7 @@ else:
         costo = st.number_input("Costo anual USD/ha", 0.0, value=float(base["costo"]))
         capex = st.number_input("CAPEX Total (USD)", 0.0, value=float(base["capex"]))
         duracion = st.number_input("Duración (años)", 1, 50, int(base["duracion"]))
+        inicio = st.number_input("Año de inicio", 0, 50, 0, help="Años desde el inicio del portafolio hasta que arranca la solución")
         salvaguarda = st.number_input("Salvaguardas %", 0.0, 100.0, 0.0)
         ingreso_extra = st.number_input("Ingreso Encadenamiento Productivo USD/año", 0.0, value=0.0)
 
@@ -177,6 +312,7 @@ else:
                 "Costo anual por ha (USD)": costo,
                 "CAPEX Total (USD)": capex,
                 "Duración (años)": duracion,
+                "Año de Inicio": inicio,
                 "Salvaguardas (%)": salvaguarda,
                 "Ingreso Encadenado (USD/año)": ingreso_extra,
                 "Tipo Captura": tipo_captura,
@@ -194,273 +330,346 @@ else:
                 nueva["Velocidad"] = velocidad
                 nueva["Punto Medio"] = punto_medio
 
-            st.session_state.soluciones.append(nueva)
+            incremental.agregar(nueva)
 
-    # Crear DataFrame desde session_state
-    df_soluciones = pd.DataFrame(st.session_state.soluciones)
+    # Eliminar una solución sin recalcular las demás (las siguientes suben un lugar)
+    if len(st.session_state.soluciones):
+        indice_eliminar = st.sidebar.selectbox(
+            "Solución a eliminar",
+            range(len(st.session_state.soluciones)),
+            format_func=lambda i: f"{i + 1}. {st.session_state.soluciones.nombre(i)}"
+        )
+        if st.sidebar.button("Eliminar Solución"):
+            incremental.eliminar(indice_eliminar)
+
+    # Editar una solución en su lugar: solo se recalcula esa fila
+    if len(st.session_state.soluciones):
+        indice_editar = st.sidebar.selectbox(
+            "Solución a editar",
+            range(len(st.session_state.soluciones)),
+            format_func=lambda i: f"{i + 1}. {st.session_state.soluciones.nombre(i)}"
+        )
+        actual = st.session_state.soluciones.registro(indice_editar)
+        with st.sidebar.form(f"form_editar_{indice_editar}"):
+            cambios = {
+                "Área (ha)": st.number_input("Área (ha)", 0.0, value=float(actual["Área (ha)"]), key=f"editar_area_{indice_editar}"),
+                "Costo anual por ha (USD)": st.number_input("Costo anual USD/ha", 0.0, value=float(actual["Costo anual por ha (USD)"]), key=f"editar_costo_{indice_editar}"),
+                "CAPEX Total (USD)": st.number_input("CAPEX Total (USD)", 0.0, value=float(actual["CAPEX Total (USD)"]), key=f"editar_capex_{indice_editar}"),
+                "Duración (años)": st.number_input("Duración (años)", 1, 50, min(int(actual["Duración (años)"]), 50), key=f"editar_duracion_{indice_editar}"),
+                "Año de Inicio": st.number_input("Año de inicio", 0, 50, min(int(actual["Año de Inicio"]), 50), key=f"editar_inicio_{indice_editar}"),
+                "Salvaguardas (%)": st.number_input("Salvaguardas %", 0.0, 100.0, float(actual["Salvaguardas (%)"]), key=f"editar_salvaguarda_{indice_editar}"),
+                "Ingreso Encadenado (USD/año)": st.number_input("Ingreso Encadenamiento Productivo USD/año", 0.0, value=float(actual["Ingreso Encadenado (USD/año)"]), key=f"editar_ingreso_{indice_editar}"),
+            }
+
+            if actual["Tipo Captura"] == "constante":
+                cambios["Captura por ha (tCO2e)"] = st.number_input("Captura ó Emisión Evitada CO2eq. ha/año", 0.0, value=float(actual["Captura por ha (tCO2e)"]), key=f"editar_captura_{indice_editar}")
+            elif actual["Tipo Captura"] == "lineal":
+                cambios["Captura Inicial"] = st.number_input("Captura Inicial CO2eq. ha/año", 0.0, value=float(actual["Captura Inicial"]), key=f"editar_captura_inicial_{indice_editar}")
+                cambios["Captura Final"] = st.number_input("Captura Final CO2eq. ha/año", 0.0, value=float(actual["Captura Final"]), key=f"editar_captura_final_{indice_editar}")
+            elif actual["Tipo Captura"] == "sigmoidal":
+                cambios["Captura Máxima"] = st.number_input("Captura Máxima ha/año", 0.0, value=float(actual["Captura Máxima"]), key=f"editar_captura_max_{indice_editar}")
+                cambios["Velocidad"] = st.number_input("Velocidad de Captura", 0.01, 5.0, value=float(actual["Velocidad"]), key=f"editar_velocidad_{indice_editar}")
+                cambios["Punto Medio"] = st.number_input("Año Punto Medio", 1, 50, int(actual["Punto Medio"]), key=f"editar_punto_medio_{indice_editar}")
+
+            if actual["Tipo SNC"] == "degradacion":
+                cambios["% Pérdida Evitada"] = st.number_input("% Pérdida Evitada", 0.0, 100.0, float(actual["% Pérdida Evitada"]), key=f"editar_perdida_{indice_editar}")
+
+            if st.form_submit_button("Guardar Cambios"):
+                incremental.editar(indice_editar, {**actual, **cambios})
+
+    # DataFrame solo para mostrar; el motor lee las columnas de la tabla sin copia
+    df_soluciones = st.session_state.soluciones.a_dataframe()
+
+# --- MODO PARCELA: resultados por parcela agregados por región / solución ---
+if modo_parcelas:
+    st.subheader("Inventario de Parcelas")
+    if df_parcelas.empty:
+        st.info("Sube un inventario con columnas 'Solución' y 'Área (ha)' (opcionales: Región, Factor de Captura, "
+                "Costo anual por ha (USD), CAPEX por ha (USD), Año de Inicio, Duración (años)).")
+    else:
+        agrupar_parcelas = st.radio("Agrupar series anuales por", ("Región", "Solución"), horizontal=True)
+        with perfil.etapa("calculo", len(df_parcelas)):
+            huella_parcelas = huella(df_parcelas)
+            resultado_parcelas = CACHE_RESULTADOS.obtener(
+                huella("parcelas", huella_parcelas, parametros, n_anios_default, agrupar_parcelas),
+                lambda: calcular_parcelas(df_parcelas, parametros, n_anios_default, agrupar_parcelas)
+            )
+        df_por_parcela = resultado_parcelas.parcelas
+
+        par_m1, par_m2, par_m3, par_m4 = st.columns(4)
+        par_m1.metric("Parcelas", f"{len(df_por_parcela):,}")
+        par_m2.metric("Área (ha)", f"{df_por_parcela['Área (ha)'].sum(dtype=float):,.0f}")
+        par_m3.metric("Carbono (tCO2e)", f"{df_por_parcela['Carbono Total (tCO2e)'].sum(dtype=float):,.0f}")
+        par_m4.metric("VPN (USD)", f"{df_por_parcela['VPN (USD)'].sum():,.0f}")
+
+        df_resumen_parcelas = resultado_parcelas.resumen()
+        st.dataframe(df_resumen_parcelas.style.format(
+            {col: "{:,.0f}" for col in df_resumen_parcelas.columns if col not in ("Región", "Solución")}
+        ))
+
+        with perfil.etapa("graficos"):
+            import plotly.express as px
+            fig_captura_parcelas = px.area(
+                resultado_parcelas.series_largo("captura"),
+                x="Año", y="Captura (tCO2e)", color="Grupo",
+                title=f"Captura Anual del Inventario por {agrupar_parcelas}"
+            )
+            st.plotly_chart(fig_captura_parcelas, use_container_width=True)
+            fig_flujo_parcelas = px.bar(
+                resultado_parcelas.series_largo("flujo"),
+                x="Año", y="Flujo (USD)", color="Grupo",
+                title=f"Flujo de Caja Anual del Inventario por {agrupar_parcelas}"
+            )
+            fig_flujo_parcelas.update_layout(plot_bgcolor="white", margin=dict(t=50, b=40))
+            st.plotly_chart(fig_flujo_parcelas, use_container_width=True)
+
+        formato_parcelas = st.radio("Formato de resultados por parcela", list(FORMATOS), horizontal=True)
+        extension_parcelas, mime_parcelas = FORMATOS[formato_parcelas]
+        descarga_diferida(
+            st, huella(huella_parcelas, parametros, n_anios_default, agrupar_parcelas, formato_parcelas),
+            f"resultados por parcela (.{extension_parcelas})",
+            lambda: exportar(df_por_parcela, formato_parcelas),
+            f"resultados_parcelas.{extension_parcelas}", mime_parcelas,
+        )
 
 # --- MOSTRAR TABLA DE ENTRADA ---
-st.subheader("Soluciones Climáticas Actuales")
-if not df_soluciones.empty:
-    st.dataframe(df_soluciones)
 else:
-    st.info("Agrega soluciones para comenzar.")
+    st.subheader("Soluciones Climáticas Actuales")
+    if not df_soluciones.empty:
+        st.dataframe(df_soluciones)
+    else:
+        st.info("Agrega soluciones para comenzar.")
 
 # --- CÁLCULO DE RESULTADOS ---
 st.subheader("Resultados de Modelación")
 
 if not df_soluciones.empty:
-    resultados = []
-    flujo_total = np.zeros(n_anios_default)
-
-    for _, sol in df_soluciones.iterrows():
-        dur = int(sol["Duración (años)"])
-        area_ajustada = sol["Área (ha)"] * multiplicador_area
-        tipo_captura = sol.get("Tipo Captura", "constante")
-        tipo_sn = sol.get("Tipo SNC", "restauracion")  # <- CORRECTO para identificar degradación
-
-        # Verificación temporal
-        st.write(f"🔍 Verificación: {sol['Solución']} | Tipo SNC: {tipo_sn} | Captura: {tipo_captura} | % Pérdida Evitada: {sol.get('% Pérdida Evitada', 'NA')}")
-
-        # === Cálculo de captura ===
-        if tipo_captura == "lineal":
-            cap_ini = soluciones_predeterminadas[sol["Solución"]]["captura_inicial"]
-            cap_fin = soluciones_predeterminadas[sol["Solución"]]["captura_final"]
-            captura_anual = np.linspace(cap_ini, cap_fin, dur)
+    # Resultados cacheados por huella de la tabla de soluciones y de los parámetros
+    huella_soluciones = huella(df_soluciones)
+
+    def cacheado(nombre, calcular, *claves, disco=False):
+        clave = clave_resultado(nombre, huella_soluciones, *claves)
+        if disco and CACHE_DISCO is not None:
+            # Arreglos .npy mapeados en memoria: compartidos entre procesos y entre reinicios
+            return CACHE_RESULTADOS.obtener(clave, lambda: CACHE_DISCO.obtener(clave, calcular))
+        return CACHE_RESULTADOS.obtener(clave, calcular)
+
+    with perfil.etapa("calculo", len(df_soluciones)):
+        # Motor vectorizado: todas las soluciones en una sola pasada
+        if modo_interactivo:
+            # Copia: los resultados cacheados de esta ejecución no deben ver las ediciones siguientes
+            columnas_soluciones = st.session_state.soluciones.columnas(copia=True)
+            portafolio = incremental.resultado()
+            if almacen is not None:
+                cacheado(
+                    "corrida",
+                    lambda: almacen.guardar(portafolio, parametros, n_anios_default, huella_soluciones, "app"),
+                    parametros, n_anios_default,
+                )
+        else:
+            columnas_soluciones = cacheado("columnas", lambda: preparar_soluciones(df_soluciones))
+
+            def calcular_resultado():
+                return calcular_portafolio(df_soluciones, parametros, n_anios_default, columnas_soluciones)
+
+            # Una corrida idéntica ya guardada se lee del caché en disco o del historial
+            arreglos_portafolio = cacheado(
+                "arreglos_portafolio",
+                lambda: (
+                    almacen.obtener(huella_soluciones, parametros, n_anios_default, calcular_resultado, "app")
+                    if almacen is not None else calcular_resultado()
+                ).arreglos(),
+                parametros, n_anios_default, disco=True,
+            )
+            portafolio = cacheado(
+                "portafolio",
+                lambda: ResultadoPortafolio.desde_arreglos(arreglos_portafolio, columnas_soluciones["solucion"]),
+                parametros, n_anios_default,
+            )
 
-        elif tipo_captura == "sigmoidal":
-            cap_max = soluciones_predeterminadas[sol["Solución"]]["captura_max"]
-            k = soluciones_predeterminadas[sol["Solución"]]["velocidad"]
-            x0 = soluciones_predeterminadas[sol["Solución"]]["punto_medio"]
-            x_vals = np.arange(dur)
-            captura_anual = cap_max / (1 + np.exp(-k * (x_vals - x0)))
-
-        elif tipo_sn == "degradacion":
-            # Solo para degradación evitada
-            porcentaje_perdida = sol.get("% Pérdida Evitada", 0.0) / 100
-            base_captura = sol.get("Captura por ha (tCO2e)", 0.0)
-            captura_base = base_captura * porcentaje_perdida
-            captura_anual = np.full(dur, captura_base)
+        # Indicadores por solución: TIR, precio de equilibrio y año de recuperación
+        def calcular_indicadores():
+            if modo_interactivo:
+                flujo_fijo, flujo_unitario = incremental.flujos_por_precio()
+            else:
+                flujo_fijo, flujo_unitario = cacheado(
+                    "flujos_por_precio",
+                    lambda: flujos_por_precio(df_soluciones, parametros, n_anios_default, columnas_soluciones),
+                    parametros, n_anios_default, disco=True,
+                )
+            # Precio de equilibrio del primer año, con la trayectoria y el descuento del eje del portafolio
+            return indicadores_financieros(
+                portafolio.flujos, flujo_fijo, flujo_unitario, parametros.tasa_ajustada,
+                portafolio.inicio, vector_descuento(parametros, portafolio.horizonte),
+            )
 
+        df_indicadores = cacheado("indicadores", calcular_indicadores, parametros, n_anios_default)
+        df_resultados = pd.concat([portafolio.resultados, df_indicadores], axis=1)
+        flujo_total = portafolio.flujo_total
+
+    # CONJUNTO DE ESCENARIOS: por defecto el precio del carbono -20% / base / +20%,
+    # o una fila por combinación de curva de precio y estructura de tasas cargadas
+    curvas_cargadas = {"curva_precio": curvas_precio, "curva_descuento": curvas_descuento}
+    with st.expander("Conjunto de escenarios (precio, crecimiento, tasa, área, encadenamiento)", expanded=False):
+        st.caption("Agrega filas para evaluar N escenarios a la vez; las tasas y crecimientos van en %.")
+        if curvas_precio or curvas_descuento:
+            st.caption("En las filas con curva de precio, el precio es el del primer año y escala la curva "
+                       "(en blanco, la curva tal cual); con estructura de tasas, la estructura reemplaza a la tasa.")
+            tabla_inicial = tabla_curvas(parametros, curvas_precio, curvas_descuento)
         else:
-            # Constante estándar
-            captura_anual = np.full(dur, sol.get("Captura por ha (tCO2e)", 0.0))
-
-        # Ajustar por área y salvaguardas
-        factor_salvaguarda = 1 - sol.get("Salvaguardas (%)", 0) / 100
-        captura_anual *= area_ajustada * factor_salvaguarda
-        captura_total = sum(captura_anual)
-
-        # === Cálculo financiero ===
-        costo = sol["Costo anual por ha (USD)"] * area_ajustada
-        capex = sol["CAPEX Total (USD)"]
-        ingreso_base = sol["Ingreso Encadenado (USD/año)"]
-
-        precio_base = precio_carbono * multiplicador_precio_carbono
-        ingreso_carbono = sum([
-            captura_anual[anio] * (precio_base * ((1 + crecimiento_precio_carbono) ** anio))
-            for anio in range(dur)
-        ])
-        ingreso_encadenado = sum([
-            ingreso_base * ((1 + crecimiento_ingreso_encadenado) ** anio)
-            for anio in range(dur)
-        ])
-        ingreso_total = ingreso_carbono + ingreso_encadenado
-
-        flujo_anual = ingreso_total - (costo * dur)
-        flujo_proyecto = np.zeros(n_anios_default)
-        flujo_proyecto[0] = -capex
-        flujo_proyecto[1:dur] = flujo_anual / dur
-
-        flujo_total += flujo_proyecto
-        tasa_desc = tasa_descuento * multiplicador_tasa_descuento
-        vpn = sum([
-            flujo_proyecto[i] / ((1 + tasa_desc) ** (i + 1))
-            for i in range(n_anios_default)
-        ])
-
-        resultados.append({
-            "Solución": sol["Solución"],
-            "Área (ha)": area_ajustada,
-            "Carbono Total (tCO2e)": captura_total,
-            "Costo Total (USD)": costo * dur,
-            "CAPEX Total (USD)": capex,
-            "Ingreso Total (USD)": ingreso_total,
-            "VPN (USD)": vpn
-        })
-
-    df_resultados = pd.DataFrame(resultados)
-
-    # CÁLCULOS DE ESCENARIOS CON VARIACIÓN DEL PRECIO DEL CARBONO
-    precios_escenarios = [precio_carbono * 0.8, precio_carbono, precio_carbono * 1.2]
-    nombres_escenarios = ["Precio -20%", "Precio base", "Precio +20%"]
-    df_escenarios_plot = []
-
-    for nombre_escenario, precio_s in zip(nombres_escenarios, precios_escenarios):
-        for _, sol in df_soluciones.iterrows():
-            duracion = int(sol["Duración (años)"])
-            area_ajustada = sol["Área (ha)"] * multiplicador_area
-            captura_bruta = sol["Captura por ha (tCO2e)"] * area_ajustada
-            factor_salvaguarda = 1 - (sol["Salvaguardas (%)"] / 100)
-            captura_total_anual = captura_bruta * factor_salvaguarda
-            costo_total_anual = sol["Costo anual por ha (USD)"] * area_ajustada
-            capex_total = sol["CAPEX Total (USD)"]
-            ingreso_carbono = captura_total_anual * precio_s * multiplicador_precio_carbono
-            ingreso_encadenado = sol["Ingreso Encadenado (USD/año)"]
-            ingreso_total = ingreso_carbono + ingreso_encadenado
-            flujo_anual = ingreso_total - costo_total_anual
-
-            flujo_proyecto = np.zeros(n_anios_default)
-            flujo_proyecto[0] = -capex_total
-            flujo_proyecto[1:duracion] = flujo_anual
-            tasa_ajustada = tasa_descuento * multiplicador_tasa_descuento
-            vpn = sum([
-                flujo_proyecto[i] / ((1 + tasa_ajustada) ** (i + 1))
-                for i in range(n_anios_default)
-            ])
-            df_escenarios_plot.append({
-                "Escenario": nombre_escenario,
-                "Solución": sol["Solución"],
-                "VPN": vpn
-            })
-
-    df_escenarios_plot = pd.DataFrame(df_escenarios_plot)
-    
+            tabla_inicial = tabla_escenarios(
+                [replace(parametros, precio_carbono=precio_carbono * f) for f in (0.8, 1.0, 1.2)],
+                ["Bajo", "Medio", "Alto"],
+            )
+        tabla_escenarios_editada = st.data_editor(
+            tabla_inicial,
+            num_rows="dynamic",
+            hide_index=True,
+            column_config={
+                columna: st.column_config.SelectboxColumn(columna, options=list(curvas_cargadas[campo]))
+                for columna, campo in COLUMNAS_CURVA.items()
+            },
+            key=f"tabla_escenarios_{huella(curvas_cargadas)[:8]}"
+        )
+    try:
+        escenarios = escenarios_desde_tabla(tabla_escenarios_editada, parametros, curvas_cargadas)
+    except ValueError as error:
+        st.error(f"Escenarios no válidos: {error}. Se evalúan los escenarios iniciales.")
+        escenarios = escenarios_desde_tabla(tabla_inicial, parametros, curvas_cargadas)
+    with perfil.etapa("escenarios", len(df_soluciones) * len(escenarios)):
+        resultado_escenarios = cacheado(
+            "escenarios",
+            lambda: evaluar_escenarios(
+                df_soluciones, [p for _, p in escenarios], n_anios_default, columnas_soluciones,
+                nombres=[nombre for nombre, _ in escenarios],
+            ),
+            escenarios, n_anios_default,
+        )
+
     # DESPLIEGUE DEL MODELO INTERACTIVO - GRÁFICAS Y SENSIBILIDADES
     # --- Gráfico: Impacto del Precio del Carbono sobre el VPN ---
-    st.markdown("### Potencial de Carbono por SNC")
-    fig = px.bar(df_resultados, x="Solución", y="Carbono Total (tCO2e)", text="Carbono Total (tCO2e)", color="Solución")
-    st.plotly_chart(fig, use_container_width=True)
-
-    st.markdown("### Valor Presente Neto (VPN) por Solución Natural del Clima")
-
-    fig_precio = px.bar(
-        df_resultados,
-        x="Solución",
-        y="VPN (USD)",
-        color="Solución",
-        text="VPN (USD)",
-        title=f"VPN según Precio del Carbono: {precio_carbono} USD/ton",
-        labels={"VPN (USD)": "Valor Presente Neto (USD)"}
-    )
+    # Figuras cacheadas por huella de los datos; con muchas soluciones se agrupan por tipo / "Otros"
+    # Plotly se importa solo cuando hay gráficos que dibujar
+    import plotly.express as px
+
+    def figura_carbono():
+        datos = agregar_tabla(df_resultados, ["Carbono Total (tCO2e)"], "Carbono Total (tCO2e)",
+                              max_categorias=max_categorias)
+        return px.bar(datos, x="Solución", y="Carbono Total (tCO2e)", text="Carbono Total (tCO2e)", color="Solución")
+
+    def figura_vpn():
+        fig_precio = px.bar(
+            agregar_tabla(df_resultados, ["VPN (USD)"], "VPN (USD)", max_categorias=max_categorias),
+            x="Solución",
+            y="VPN (USD)",
+            color="Solución",
+            text="VPN (USD)",
+            title=f"VPN según Precio del Carbono: {precio_carbono} USD/ton" if not parametros.curva_precio
+            else f"VPN según Precio del Carbono: curva {nombre_curva_precio}",
+            labels={"VPN (USD)": "Valor Presente Neto (USD)"}
+        )
 
-    fig_precio.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-    fig_precio.update_layout(
-        xaxis_title=None,
-        yaxis_title="Valor Presente Neto (USD)",
-        showlegend=False,
-        plot_bgcolor='white',
-        margin=dict(t=50, b=50)
-    )
+        fig_precio.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+        fig_precio.update_layout(
+            xaxis_title=None,
+            yaxis_title="Valor Presente Neto (USD)",
+            showlegend=False,
+            plot_bgcolor='white',
+            margin=dict(t=50, b=50)
+        )
+        return fig_precio
 
-    st.plotly_chart(fig_precio, use_container_width=True)
-    
-    # === Gráfico: Captura acumulada de carbono por solución + total ===
-    #st.markdown("## 🌿 Captura Acumulada de Carbono por Solución y Total")
-
-    data_acumulada = []
-
-    for sol in st.session_state.soluciones:
-        nombre = sol["Solución"]
-        area = sol["Área (ha)"] * multiplicador_area
-        dur = int(sol["Duración (años)"])
-        tipo = soluciones_predeterminadas[nombre]["tipo_captura"]
-        salvaguarda = 1 - sol.get("Salvaguardas (%)", 0) / 100
-
-        acumulado = 0
-        for anio in range(n_anios_default):
-            if anio >= dur:
-                captura_anual = 0
-            elif tipo == "constante":
-                captura_ha = sol["Captura por ha (tCO2e)"]
-            elif tipo == "lineal":
-                cap_ini = soluciones_predeterminadas[nombre]["captura_inicial"]
-                cap_fin = soluciones_predeterminadas[nombre]["captura_final"]
-                captura_ha = cap_ini + (cap_fin - cap_ini) * (anio / dur)
-            elif tipo == "sigmoidal":
-                cap_max = soluciones_predeterminadas[nombre]["captura_max"]
-                velocidad = soluciones_predeterminadas[nombre]["velocidad"]
-                p_medio = soluciones_predeterminadas[nombre]["punto_medio"]
-                captura_ha = cap_max / (1 + np.exp(-velocidad * (anio - p_medio)))
-            else:
-                captura_ha = 0
-
-            captura_anual = captura_ha * area * salvaguarda
-            acumulado += captura_anual
-
-            data_acumulada.append({
-                "Año": anio + 1,
-                "Solución": nombre,
-                "Captura Acumulada": acumulado
-            })
-
-    # DataFrame base
-    df_acumulada = pd.DataFrame(data_acumulada)
-
-    # Total acumulado
-    df_total_acum = df_acumulada.groupby("Año")["Captura Acumulada"].sum().reset_index()
-    df_total_acum["Solución"] = "Total Portafolio"
-
-    # Combinar
-    df_graf = pd.concat([df_acumulada, df_total_acum])
-
-    # Plot
-    fig_acum = px.line(
-        df_graf,
-        x="Año",
-        y="Captura Acumulada",
-        color="Solución",
-        title="📈 Captura de Carbono Acumulada por Solución y Total (SNCs Aditivas)",
-        labels={"Captura Acumulada": "Toneladas CO₂e"}
-    )
+    def figura_captura_acumulada():
+        # Captura por tipo de solución en el eje del portafolio; la suma acumulada sale por filas
+        captura_grupos, nombres_grupos = agregar_matriz(
+            portafolio.captura, df_resultados["Solución"], max_categorias,
+            portafolio.inicio, portafolio.horizonte,
+        )
+        acumulada, total_acumulado = captura_acumulada(captura_grupos, portafolio.horizonte)
+
+        # Formato largo solo en la frontera del gráfico
+        df_graf = pd.concat([
+            formato_largo(acumulada, nombres_grupos, "Captura Acumulada"),
+            formato_largo(total_acumulado[None, :], ["Total Portafolio"], "Captura Acumulada"),
+        ], ignore_index=True)
+
+        fig_acum = px.line(
+            df_graf,
+            x="Año",
+            y="Captura Acumulada",
+            color="Solución",
+            render_mode="webgl",
+            title="📈 Captura de Carbono Acumulada por Solución y Total (SNCs Aditivas)",
+            labels={"Captura Acumulada": "Toneladas CO₂e"}
+        )
 
-    fig_acum.update_layout(
-        xaxis_title="Año del Proyecto",
-        yaxis_title="Carbono Acumulado (tCO₂e)",
-        plot_bgcolor="white",
-        margin=dict(t=50, b=40),
-        legend_title="Solución"
-    )
+        fig_acum.update_layout(
+            xaxis_title="Año del Proyecto",
+            yaxis_title="Carbono Acumulado (tCO₂e)",
+            plot_bgcolor="white",
+            margin=dict(t=50, b=40),
+            legend_title="Solución"
+        )
+        return fig_acum
+
+    with perfil.etapa("graficos"):
+        st.markdown("### Potencial de Carbono por SNC")
+        fig = cacheado("figura_carbono", figura_carbono, parametros, n_anios_default, max_categorias)
+        st.plotly_chart(fig, use_container_width=True)
 
-    st.plotly_chart(fig_acum, use_container_width=True)
+        st.markdown("### Valor Presente Neto (VPN) por Solución Natural del Clima")
+        fig_precio = cacheado("figura_vpn", figura_vpn, parametros, n_anios_default, max_categorias)
+        st.plotly_chart(fig_precio, use_container_width=True)
+    
+        # === Gráfico: Captura acumulada de carbono por solución + total ===
+        #st.markdown("## 🌿 Captura Acumulada de Carbono por Solución y Total")
+        fig_acum = cacheado(
+            "figura_captura_acumulada", figura_captura_acumulada, parametros, n_anios_default, max_categorias
+        )
+        st.plotly_chart(fig_acum, use_container_width=True)
 
     # grafica 3d
     with st.expander("Visualización 3D: Área vs Carbono vs VPN", expanded=True):
-        import plotly.express as px
-
-        if not df_resultados.empty:
+        def figura_3d():
             fig_3d = px.scatter_3d(
-                df_resultados,
+                muestra_dispersion(df_resultados, "VPN (USD)", max_categorias=max_categorias),
                 x="Área (ha)",
                 y="Carbono Total (tCO2e)",
                 z="VPN (USD)",
-                color="Solución",
+                color=COLUMNA_CATEGORIA,
                 size="Área (ha)",
                 hover_name="Solución",
                 title="Relación 3D entre Área, Carbono y VPN"
             )
             fig_3d.update_layout(margin=dict(l=0, r=0, b=0, t=40))
-            st.plotly_chart(fig_3d, use_container_width=True)
+            return fig_3d
+
+        with perfil.etapa("graficos"):
+            if not df_resultados.empty:
+                fig_3d = cacheado("figura_3d", figura_3d, parametros, n_anios_default, max_categorias)
+                st.plotly_chart(fig_3d, use_container_width=True)
 
     # --- Gráfico Plotly: Flujo de Caja Acumulado ---
     st.markdown("Flujo de Caja Acumulado del Proyecto")
-    anios = np.arange(1, n_anios_default + 1)
-    flujo_caja_acumulado = np.cumsum(flujo_total)
-
-    fig_flujo = px.line(
-        x=anios,
-        y=flujo_caja_acumulado,
-        markers=True,
-        title=" Evolución del Flujo de Caja Acumulado",
-        labels={"x": "Año", "y": "Flujo de Caja (USD)"}
-    )
-    fig_flujo.update_layout(
-        xaxis_title="Año del Proyecto",
-        yaxis_title="USD Acumulado",
-        plot_bgcolor='white',
-        margin=dict(t=50, b=50)
-    )
-    st.plotly_chart(fig_flujo, use_container_width=True)
+    with perfil.etapa("graficos"):
+        anios = np.arange(1, len(flujo_total) + 1)
+        flujo_caja_acumulado = np.cumsum(flujo_total)
+
+        fig_flujo = px.line(
+            x=anios,
+            y=flujo_caja_acumulado,
+            markers=True,
+            render_mode="webgl",
+            title=" Evolución del Flujo de Caja Acumulado",
+            labels={"x": "Año", "y": "Flujo de Caja (USD)"}
+        )
+        fig_flujo.update_layout(
+            xaxis_title="Año del Proyecto",
+            yaxis_title="USD Acumulado",
+            plot_bgcolor='white',
+            margin=dict(t=50, b=50)
+        )
+        st.plotly_chart(fig_flujo, use_container_width=True)
 
     # --- Matriz Comparativa ---
     st.markdown("## Matriz Comparativa de Eficiencia por Solución")
@@ -473,7 +682,8 @@ if not df_soluciones.empty:
         # Redondear y ordenar columnas
         columnas_orden = [
             "Solución", "Área (ha)", "Carbono Total (tCO2e)", "VPN (USD)", "Costo Total (USD)",
-            "Eficiencia CO₂e/ha", "Eficiencia VPN/ha"
+            "Eficiencia CO₂e/ha", "Eficiencia VPN/ha",
+            "TIR (%)", "Precio de Equilibrio (USD/tCO2e)", "Año de Recuperación"
         ]
         df_comparativa = df_comparativa[columnas_orden].copy()
         df_comparativa.iloc[:, 1:] = df_comparativa.iloc[:, 1:].round(2)
@@ -481,113 +691,187 @@ if not df_soluciones.empty:
         # Aplicar formato estilo semáforo
         st.dataframe(
             df_comparativa.style.background_gradient(cmap="YlGnBu", subset=["Eficiencia CO₂e/ha", "Eficiencia VPN/ha"])
-                        .format({col: "{:,.2f}" for col in df_comparativa.columns if col != "Solución"})
+                        .format({col: "{:,.2f}" for col in df_comparativa.columns if col != "Solución"}, na_rep="—")
         )
+        st.caption("TIR y año de recuperación vacíos (—): el flujo de caja no cambia de signo o no se recupera "
+                   "dentro del horizonte. Precio de equilibrio 0: rentable sin ingreso de carbono.")
     else:
         st.info("No hay resultados para mostrar en la matriz comparativa.")
         
     # === HEATMAP DE SENSIBILIDAD DE VPN ===
     #st.markdown("Análisis de Sensibilidad: Precio del Carbono vs Tasa de Descuento")
 
-    # Rango de análisis
-    rango_precio = np.arange(5, 51, 5)  # precios de carbono
-    rango_descuento = np.arange(1, 22, 1)  # tasas de descuento en %
-
-    # Crear matriz de sensibilidad
-    matriz_vpn = np.zeros((len(rango_descuento), len(rango_precio)))
-
-    for i, td in enumerate(rango_descuento):
-        for j, pc in enumerate(rango_precio):
-            flujo_total_sens = np.zeros(n_anios_default)
-            for _, sol in df_soluciones.iterrows():
-                duracion = int(sol.get("Duración (años)", n_anios_default))
-                area_ajustada = sol["Área (ha)"] * multiplicador_area
-                captura_bruta = sol["Captura por ha (tCO2e)"] * area_ajustada
-                factor_salvaguarda = 1 - (sol.get("Salvaguardas (%)", 0) / 100)
-                captura_total_anual = captura_bruta * factor_salvaguarda
-                ingreso_carbono = captura_total_anual * pc
-                ingreso_encadenado = sol.get("Ingreso Encadenado (USD/año)", 0)
-                ingreso_anual_total = ingreso_carbono + ingreso_encadenado
-                costo_total_anual = sol["Costo anual por ha (USD)"] * area_ajustada
-                flujo_anual = ingreso_anual_total - costo_total_anual
-                capex_total = sol["CAPEX Total (USD)"] * area_ajustada
-                flujo_proyecto = np.zeros(n_anios_default)
-                flujo_proyecto[0] = -capex_total
-                flujo_proyecto[1:duracion] = flujo_anual
-                flujo_total_sens += flujo_proyecto
-            tasa = td / 100
-            vpn_sens = sum([
-                flujo_total_sens[k] / ((1 + tasa) ** (k + 1))
-                for k in range(n_anios_default)
-            ])
-            matriz_vpn[i, j] = vpn_sens
-
-    # Crear heatmap
-    import plotly.graph_objects as go
-    fig_heat = go.Figure(
-        data=go.Heatmap(
-            z=matriz_vpn,
-            x=rango_precio,
+    # Rango de análisis (configurable para acercarse a la frontera de equilibrio)
+    with st.expander("Rango del análisis de sensibilidad", expanded=False):
+        limites_precio = st.slider("Precio del carbono (USD/tCO₂e)", 0.0, 200.0, (5.0, 50.0), 1.0)
+        puntos_precio = st.number_input("Puntos de precio", 2, 400, 10)
+        limites_descuento = st.slider("Tasa de descuento (%)", 0.0, 50.0, (1.0, 21.0), 0.5)
+        puntos_descuento = st.number_input("Puntos de tasa de descuento", 2, 400, 21)
+
+    rango_precio = np.linspace(*limites_precio, int(puntos_precio))  # precios de carbono
+    rango_descuento = np.linspace(*limites_descuento, int(puntos_descuento))  # tasas de descuento en %
+
+    # Crear matriz de sensibilidad (una sola operación sobre toda la grilla)
+    with perfil.etapa("sensibilidad", len(df_soluciones)):
+        if modo_interactivo:
+            # Agregados mantenidos por diferencia: la grilla no recorre las soluciones
+            matriz_vpn = incremental.superficie_vpn(rango_precio, rango_descuento / 100)
+            frontera_precio = incremental.precio_equilibrio(rango_descuento / 100)
+        else:
+            matriz_vpn = cacheado(
+                "superficie_vpn",
+                lambda: superficie_vpn(
+                    df_soluciones, parametros, rango_precio, rango_descuento / 100,
+                    n_anios_default, columnas_soluciones,
+                ),
+                parametros, rango_precio, rango_descuento, n_anios_default, disco=True,
+            )
+            frontera_precio = cacheado(
+                "precio_equilibrio",
+                lambda: precio_equilibrio(
+                    df_soluciones, parametros, rango_descuento / 100,
+                    n_anios_default, columnas_soluciones,
+                ),
+                parametros, rango_descuento, n_anios_default, disco=True,
+            )
+
+    with perfil.etapa("graficos"):
+        # Crear heatmap
+        import plotly.graph_objects as go
+        fig_heat = go.Figure(
+            data=go.Heatmap(
+                z=matriz_vpn,
+                x=rango_precio,
+                y=rango_descuento,
+                colorscale='Viridis',
+                colorbar=dict(title="VPN (USD)", tickformat=".0f")
+            )
+        )
+        fig_heat.add_trace(go.Scatter(
+            x=frontera_precio,
             y=rango_descuento,
-            colorscale='Viridis',
-            colorbar=dict(title="VPN (USD)", tickformat=".0f")
+            mode="lines",
+            line=dict(color="white", dash="dash"),
+            name="VPN = 0"
+        ))
+        fig_heat.update_xaxes(range=[rango_precio[0], rango_precio[-1]])
+        fig_heat.update_layout(
+            title="Sensibilidad VPN, Portafolio Integrado SNC – Precio Carbono vs Tasa de Descuento",
+            xaxis_title="Precio del Carbono (USD/tCO₂e)",
+            yaxis_title="Tasa de Descuento (%)",
+            margin=dict(l=40, r=40, t=60, b=40)
         )
-    )
-    fig_heat.update_layout(
-        title="Sensibilidad VPN, Portafolio Integrado SNC – Precio Carbono vs Tasa de Descuento",
-        xaxis_title="Precio del Carbono (USD/tCO₂e)",
-        yaxis_title="Tasa de Descuento (%)",
-        margin=dict(l=40, r=40, t=60, b=40)
-    )
-    st.plotly_chart(fig_heat, use_container_width=True)
+        st.plotly_chart(fig_heat, use_container_width=True)
+
+    # === ANÁLISIS TORNADO: UN INSUMO A LA VEZ ===
+    with st.expander("Análisis Tornado: qué insumo mueve más el VPN", expanded=False):
+        tor_col1, tor_col2 = st.columns(2)
+        variacion_tornado = tor_col1.slider("Variación de los insumos (±%)", 1, 50, 20) / 100
+        puntos_tornado = tor_col2.slider("Variación de crecimiento y salvaguardas (± puntos %)", 0.5, 10.0, 1.0, 0.5) / 100
+        with perfil.etapa("sensibilidad", len(df_soluciones)):
+            resultado_tornado = cacheado(
+                "tornado",
+                lambda: analisis_tornado(
+                    df_soluciones, parametros, variacion_tornado, puntos_tornado,
+                    n_anios_default, columnas_soluciones,
+                ),
+                parametros, variacion_tornado, puntos_tornado, n_anios_default,
+            )
+        indice_tornado = st.selectbox(
+            "Alcance",
+            [None, *range(len(df_resultados))],
+            format_func=lambda i: "Portafolio completo" if i is None else f"{i + 1}. {df_resultados['Solución'].iloc[i]}",
+            key="alcance_tornado"
+        )
+        df_tornado = resultado_tornado.tabla(indice_tornado)
+
+        with perfil.etapa("graficos"):
+            fig_tornado = px.bar(
+                df_tornado.melt(
+                    id_vars="Variable", value_vars=["Δ Bajo (USD)", "Δ Alto (USD)"],
+                    var_name="Movimiento", value_name="Δ VPN (USD)"
+                ),
+                x="Δ VPN (USD)",
+                y="Variable",
+                color="Movimiento",
+                orientation="h",
+                barmode="overlay",
+                category_orders={"Variable": list(df_tornado["Variable"])},
+                title=f"Tornado del VPN (insumos ±{variacion_tornado:.0%})"
+            )
+            fig_tornado.update_layout(plot_bgcolor="white", yaxis_title=None, margin=dict(t=50, b=40))
+            fig_tornado.add_vline(x=0, line_color="black")
+            st.plotly_chart(fig_tornado, use_container_width=True)
+        st.dataframe(df_tornado.style.format({col: "{:,.0f}" for col in df_tornado.columns if col != "Variable"}))
+
+    # === SIMULACIÓN MONTE CARLO (INCERTIDUMBRE) ===
+    with st.expander("Simulación Monte Carlo: incertidumbre de VPN y Carbono", expanded=False):
+        mc_col1, mc_col2 = st.columns(2)
+        n_simulaciones = mc_col1.select_slider(
+            "Número de simulaciones", [1_000, 10_000, 100_000, 250_000, 500_000], value=100_000
+        )
+        volatilidad_precio = mc_col1.slider("Volatilidad anual del precio del carbono (%)", 0.0, 60.0, 20.0, 1.0) / 100
+        desviacion_precio = mc_col1.slider("Incertidumbre del precio inicial (%)", 0.0, 100.0, 25.0, 5.0) / 100
+        limites_tasa_mc = mc_col2.slider("Rango de tasa de descuento (%)", 0.0, 30.0,
+                                         (tasa_descuento * 100 * 0.5, tasa_descuento * 100 * 1.5), 0.5)
+        desviacion_captura = mc_col2.slider("Incertidumbre de la captura (%)", 0.0, 50.0, 10.0, 1.0) / 100
+        limites_salvaguardas = mc_col2.slider("Rango de salvaguardas (%)", 0.0, 100.0, (0.0, 20.0), 1.0)
+        usar_salvaguardas_mc = mc_col2.checkbox("Muestrear salvaguardas (reemplaza las de cada solución)")
+        ejecutar_mc = st.checkbox("Ejecutar simulación")
+
+        if ejecutar_mc:
+            config_mc = ConfiguracionMonteCarlo(
+                precio_inicial=Distribucion("lognormal", media=parametros.precio_base, desviacion=desviacion_precio),
+                volatilidad_precio=volatilidad_precio,
+                crecimiento_precio=crecimiento_precio_carbono,
+                tendencia_precio=tuple(trayectoria_precio(parametros, len(parametros.curva_precio)).tolist()),
+                tasa_descuento=Distribucion(
+                    "triangular",
+                    minimo=limites_tasa_mc[0] / 100,
+                    moda=min(max(parametros.tasa_ajustada, limites_tasa_mc[0] / 100), limites_tasa_mc[1] / 100),
+                    maximo=limites_tasa_mc[1] / 100,
+                ),
+                factor_captura=Distribucion("normal", media=1.0, desviacion=desviacion_captura, minimo=0.0),
+                salvaguardas=Distribucion("uniforme", minimo=limites_salvaguardas[0], maximo=limites_salvaguardas[1])
+                if usar_salvaguardas_mc else None,
+                n_simulaciones=n_simulaciones,
+                procesos=min(4, os.cpu_count() or 1),
+            )
+            with perfil.etapa("montecarlo", n_simulaciones):
+                resultado_mc = cacheado(
+                    "montecarlo",
+                    lambda: simular(df_soluciones, parametros, config_mc, n_anios_default, columnas_soluciones),
+                    parametros, config_mc, n_anios_default,
+                )
+
+            mc_m1, mc_m2, mc_m3 = st.columns(3)
+            mc_m1.metric("P(VPN < 0)", f"{resultado_mc.prob_vpn_negativo:.1%}")
+            mc_m2.metric("VaR 95% del VPN (USD)", f"{resultado_mc.valor_en_riesgo(0.95):,.0f}")
+            mc_m3.metric("VPN mediano (USD)", f"{np.median(resultado_mc.vpn):,.0f}")
+            st.dataframe(resultado_mc.resumen().style.format("{:,.0f}"))
+
+            # Histograma precalculado: solo viajan los conteos al navegador
+            with perfil.etapa("graficos"):
+                conteos, bordes = np.histogram(resultado_mc.vpn, bins=60)
+                fig_mc = px.bar(
+                    x=(bordes[:-1] + bordes[1:]) / 2,
+                    y=conteos,
+                    title="Distribución simulada del VPN del portafolio",
+                    labels={"x": "VPN (USD)", "y": "Simulaciones"}
+                )
+                fig_mc.update_layout(bargap=0, plot_bgcolor="white", margin=dict(t=50, b=40))
+                fig_mc.add_vline(x=0, line_dash="dash", line_color="red")
+                st.plotly_chart(fig_mc, use_container_width=True)
     
     # --- Animación Temporal del Flujo de Caja por Solución ---
     #st.markdown("###Animación: Flujo de Caja por Solución Año a Año")
 
-    # Crear DataFrame largo para la animación
-    data_animada = []
-
-    for sol in st.session_state.soluciones:
-        nombre = sol["Solución"]
-        area = sol["Área (ha)"] * multiplicador_area
-        tipo_captura = soluciones_predeterminadas.get(nombre, {}).get("tipo_captura", "constante")
-
-        if tipo_captura == "constante":
-            captura = sol["Captura por ha (tCO2e)"] * area
-        elif tipo_captura == "lineal":
-            captura_ini = soluciones_predeterminadas[nombre]["captura_inicial"]
-            captura_fin = soluciones_predeterminadas[nombre]["captura_final"]
-            captura = ((captura_ini + captura_fin) / 2) * area
-        elif tipo_captura == "sigmoidal":
-            cap_max = soluciones_predeterminadas[nombre]["captura_max"]
-            captura = (cap_max / 2) * area  # estimación media
-        else:
-            captura = 0
-
-        salvaguarda = 1 - sol.get("Salvaguardas (%)", 0) / 100
-        carbono_anual = captura * salvaguarda
-        ingreso_carbono = carbono_anual * (precio_carbono * multiplicador_precio_carbono)
-        ingreso_extra = sol.get("Ingreso Encadenado (USD/año)", 0)
-        ingreso_total = ingreso_carbono + ingreso_extra
-        costo_anual = sol["Costo anual por ha (USD)"] * area
-        flujo = ingreso_total - costo_anual
-        capex = sol["CAPEX Total (USD)"] * area
-        duracion = int(sol["Duración (años)"])
-
-        for anio in range(n_anios_default):
-            if anio == 0:
-                valor = -capex
-            elif anio < duracion:
-                valor = flujo
-            else:
-                valor = 0
-            data_animada.append({
-                "Año": anio + 1,
-                "Solución": nombre,
-                "Flujo": valor
-            })
-
-    df_animada = pd.DataFrame(data_animada)
+    # Crear DataFrame largo para la animación (flujos del motor, sin recalcular curvas).
+    # Suspendido junto con el gráfico: se construía en cada ejecución sin usarse.
+    #flujos_grupos, nombres_grupos = agregar_matriz(
+    #    portafolio.flujos, df_resultados["Solución"], max_categorias, portafolio.inicio, portafolio.horizonte
+    #)
+    #df_animada = formato_largo(flujos_grupos, nombres_grupos, "Flujo")
 
     # --- Gráfico animado, Se suspende temporalmente. Bloque full comentado ---
     #fig_anim = px.bar(
@@ -602,134 +886,157 @@ if not df_soluciones.empty:
     #fig_anim.update_layout(yaxis_title="Flujo de Caja (USD)", xaxis_title=None)
     #st.plotly_chart(fig_anim, use_container_width=True, key="grafico_animado")
 
-else:
+elif not modo_parcelas:
     st.warning("No se han generado resultados.")
 
 if not df_soluciones.empty:
     # --- COMPARACIÓN DE ESCENARIOS (VPN por Solución con diferentes precios de carbono) ---
 
-    # Crear tres escenarios: bajo, medio, alto
-    precios = [precio_carbono * 0.8, precio_carbono, precio_carbono * 1.2]
-    etiquetas = ["Bajo", "Medio", "Alto"]
-
-    df_escenarios_plot = []
-
-    for i, p in enumerate(precios):
-        resultados_tmp = []
-        for _, sol in df_soluciones.iterrows():
-            duracion = int(sol["Duración (años)"])
-            area_ajustada = sol["Área (ha)"] * multiplicador_area
-            captura_bruta = sol["Captura por ha (tCO2e)"] * area_ajustada
-            factor_salvaguarda = 1 - (sol.get("Salvaguardas (%)", 0) / 100)
-            captura_total_anual = captura_bruta * factor_salvaguarda
-
-            costo_total_anual = sol["Costo anual por ha (USD)"] * area_ajustada
-            capex_total = sol["CAPEX Total (USD)"]
-            ingreso_carbono = captura_total_anual * (p * multiplicador_precio_carbono)
-            ingreso_encadenado = sol.get("Ingreso Encadenado (USD/año)", 0)
-            ingreso_anual_total = ingreso_carbono + ingreso_encadenado
-            flujo_anual = ingreso_anual_total - costo_total_anual
-
-            flujo_tmp = np.zeros(n_anios_default)
-            flujo_tmp[0] = -capex_total
-            flujo_tmp[1:duracion] = flujo_anual
-
-            tasa_descuento_ajustada = tasa_descuento * multiplicador_tasa_descuento
-            vpn = sum([
-                flujo_tmp[i] / ((1 + tasa_descuento_ajustada) ** (i + 1))
-                for i in range(n_anios_default)
-            ])
-            
-            resultados_tmp.append({
-                "Solución": sol["Solución"],
-                "VPN": vpn,
-                "Escenario": etiquetas[i]
-            })
-        
-        df_escenarios_plot.extend(resultados_tmp)
-
-    # Convertir a DataFrame para graficar
-    df_escenarios_plot = pd.DataFrame(df_escenarios_plot)
-
-    # Gráfico comparativo de VPN por escenario
-    fig_escenarios = px.bar(
-        df_escenarios_plot,
-        x="Solución",
-        y="VPN",
-        color="Escenario",
-        barmode="group",
-        text="VPN",
-        title="📊 VPN por Solución en Tres Escenarios de Precio del Carbono (+-20%)",
-        labels={"VPN": "Valor Presente Neto (USD)"}
-    )
+    # Todos los escenarios evaluados en un solo lote
+    import plotly.express as px
 
-    fig_escenarios.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
-    fig_escenarios.update_layout(
-        xaxis_title=None,
-        yaxis_title="VPN (USD)",
-        plot_bgcolor='white',
-        margin=dict(t=50, b=50)
-    )
+    def figura_escenarios():
+        df_escenarios_plot = agregar_tabla(
+            resultado_escenarios.formato_largo(), ["VPN"], "VPN", por=["Escenario"], max_categorias=max_categorias
+        )
+
+        # Gráfico comparativo de VPN por escenario
+        fig_escenarios = px.bar(
+            df_escenarios_plot,
+            x="Solución",
+            y="VPN",
+            color="Escenario",
+            barmode="group",
+            text="VPN" if len(escenarios) <= 5 else None,
+            title=f"📊 VPN por Solución en {len(escenarios)} Escenarios",
+            labels={"VPN": "Valor Presente Neto (USD)"}
+        )
+
+        fig_escenarios.update_traces(texttemplate='%{text:,.0f}', textposition='outside')
+        fig_escenarios.update_layout(
+            xaxis_title=None,
+            yaxis_title="VPN (USD)",
+            plot_bgcolor='white',
+            margin=dict(t=50, b=50)
+        )
+        return fig_escenarios
 
-    st.plotly_chart(fig_escenarios, use_container_width=True)
+    with perfil.etapa("graficos"):
+        fig_escenarios = cacheado("figura_escenarios", figura_escenarios, escenarios, n_anios_default, max_categorias)
+        st.plotly_chart(fig_escenarios, use_container_width=True)
+
+    st.markdown("#### VPN del Portafolio por Escenario")
+    st.dataframe(
+        tabla_escenarios_editada.assign(**{"VPN Portafolio (USD)": resultado_escenarios.vpn_portafolio.to_numpy()})
+        .style.format({"VPN Portafolio (USD)": "{:,.0f}"})
+    )
 
 # --- Gráfico 3D Interactivo de Soluciones ---
 
-if not df_resultados.empty:
-    fig3d = px.scatter_3d(
-        df_resultados,
-        x="Carbono Total (tCO2e)",
-        y="VPN (USD)",
-        z="Área (ha)",
-        color="Solución",
-        hover_name="Solución",
-        size="Área (ha)",
-        title="Análisis 3D: Carbono, Rentabilidad y Escala",
-        labels={
-            "Carbono Total (tCO2e)": "Carbono (tCO2e)",
-            "VPN (USD)": "Valor Presente Neto (USD)",
-            "Área (ha)": "Área (ha)"
-        }
+if not df_soluciones.empty:
+    import plotly.express as px
+
+    def figura_3d_escala():
+        fig3d = px.scatter_3d(
+            muestra_dispersion(df_resultados, "VPN (USD)", max_categorias=max_categorias),
+            x="Carbono Total (tCO2e)",
+            y="VPN (USD)",
+            z="Área (ha)",
+            color=COLUMNA_CATEGORIA,
+            hover_name="Solución",
+            size="Área (ha)",
+            title="Análisis 3D: Carbono, Rentabilidad y Escala",
+            labels={
+                "Carbono Total (tCO2e)": "Carbono (tCO2e)",
+                "VPN (USD)": "Valor Presente Neto (USD)",
+                "Área (ha)": "Área (ha)"
+            }
+        )
+        fig3d.update_layout(margin=dict(l=0, r=0, b=0, t=40))
+        return fig3d
+
+    with perfil.etapa("graficos"):
+        fig3d = cacheado("figura_3d_escala", figura_3d_escala, parametros, n_anios_default, max_categorias)
+        st.plotly_chart(fig3d, use_container_width=True)
+
+# --- Optimización de Portafolio (asignación de hectáreas por tipo de SNC) ---
+with st.expander("Optimización de Portafolio: asignación de hectáreas por SNC", expanded=False):
+    op_col1, op_col2 = st.columns(2)
+    area_disponible = op_col1.number_input("Área total disponible (ha)", 0.0, value=10_000.0, step=500.0)
+    presupuesto_capex = op_col1.number_input(
+        "Presupuesto CAPEX (USD, CAPEX del catálogo por ha; 0 = sin límite)", 0.0, value=0.0, step=100_000.0
+    )
+    carbono_meta = op_col2.number_input("Carbono mínimo (tCO2e)", 0.0, value=0.0, step=10_000.0)
+    modo_optimizacion = op_col2.radio("Objetivo", ("Maximizar VPN", "Frontera VPN vs Carbono"), horizontal=True)
+
+    limites_area = st.data_editor(
+        pd.DataFrame({
+            "Solución": list(soluciones_predeterminadas),
+            "Mín (ha)": 0.0,
+            "Máx (ha)": area_disponible,
+        }),
+        hide_index=True,
+        disabled=["Solución"],
+        key="limites_optimizacion"
     )
-    fig3d.update_layout(margin=dict(l=0, r=0, b=0, t=40))
-    st.plotly_chart(fig3d, use_container_width=True)
-
-#Exportación de Resultados a PDF
-import streamlit.components.v1 as components
-
-#st.markdown("Descargar la modelación como PDF")
-
-components.html("""
-    <html>
-    <head>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js"></script>
-        <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
-    </head>
-    <body>
-        <button onclick="exportarTodo()" style="padding:12px 24px; font-size:14px; background:#f8f9fa; color:grey; border:none; border-radius:8px;">
-            📥 Descargar Modelación Completa en PDF
-        </button>
-
-        <script>
-        async function exportarTodo() {
-            const { jsPDF } = window.jspdf;
-            const doc = new jsPDF('p', 'pt', 'a4');
-            const body = document.body;
-
-            await html2canvas(body, { scale: 2 }).then(canvas => {
-                const imgData = canvas.toDataURL("image/png");
-                const imgProps = doc.getImageProperties(imgData);
-                const pdfWidth = doc.internal.pageSize.getWidth();
-                const pdfHeight = (imgProps.height * pdfWidth) / imgProps.width;
-
-                doc.addImage(imgData, 'PNG', 0, 0, pdfWidth, pdfHeight);
-                doc.save("modelo_sumideros_completo.pdf");
-            });
-        }
-        </script>
-    </body>
-    </html>
-""", height=120)
+    restricciones = Restricciones(
+        area_total=area_disponible,
+        capex_total=presupuesto_capex if presupuesto_capex > 0 else np.inf,
+        carbono_minimo=carbono_meta,
+        area_minima=dict(zip(limites_area["Solución"], limites_area["Mín (ha)"])),
+        area_maxima=dict(zip(limites_area["Solución"], limites_area["Máx (ha)"])),
+    )
+    with perfil.etapa("optimizacion"):
+        coeficientes_ha = CACHE_RESULTADOS.obtener(
+            huella("coeficientes_por_ha", parametros, n_anios_default),
+            lambda: coeficientes_por_ha(parametros, n_anios_default)
+        )
+
+    if modo_optimizacion == "Maximizar VPN":
+        with perfil.etapa("optimizacion"):
+            optimo = CACHE_RESULTADOS.obtener(
+                huella("optimizar", coeficientes_ha, restricciones),
+                lambda: optimizar(coeficientes_ha, restricciones)
+            )
+        if optimo.exito:
+            with perfil.etapa("optimizacion"):
+                vpn_asignacion = CACHE_RESULTADOS.obtener(
+                    huella("vpn_motor", optimo.asignacion, parametros, n_anios_default),
+                    lambda: vpn_motor(optimo.asignacion, parametros, n_anios_default)
+                )
+            op_m1, op_m2, op_m3, op_m4 = st.columns(4)
+            op_m1.metric("VPN óptimo (USD, CAPEX por ha)", f"{optimo.vpn:,.0f}")
+            op_m2.metric("VPN en el motor (USD, CAPEX total)", f"{vpn_asignacion:,.0f}")
+            op_m3.metric("Carbono (tCO2e)", f"{optimo.carbono:,.0f}")
+            op_m4.metric("CAPEX (USD, por ha × ha)", f"{optimo.capex:,.0f}")
+            st.caption(
+                "El optimizador toma el CAPEX del catálogo en USD por hectárea. Los resultados de modelación "
+                "toman el 'CAPEX Total (USD)' de cada fila como un monto por solución: 'VPN en el motor' es el "
+                "VPN de la misma asignación agregada con los valores por defecto del formulario."
+            )
+            asignacion = optimo.asignacion[optimo.asignacion > AREA_MINIMA_ASIGNADA].reset_index()
+            st.dataframe(asignacion.style.format({"Área (ha)": "{:,.1f}"}))
+        else:
+            st.warning(f"Sin solución factible: {optimo.mensaje}")
+    else:
+        with perfil.etapa("optimizacion"):
+            frontera = CACHE_RESULTADOS.obtener(
+                huella("frontera_pareto", coeficientes_ha, restricciones, 50),
+                lambda: frontera_pareto(coeficientes_ha, restricciones, 50)
+            )
+        if frontera.empty:
+            st.warning("Sin solución factible para las restricciones dadas.")
+        else:
+            import plotly.express as px
+            fig_pareto = px.line(
+                frontera,
+                x="Carbono (tCO2e)",
+                y="VPN (USD)",
+                markers=True,
+                title="Frontera VPN vs Carbono del Portafolio Óptimo (CAPEX por ha)"
+            )
+            fig_pareto.update_layout(plot_bgcolor="white", margin=dict(t=50, b=40))
+            st.plotly_chart(fig_pareto, use_container_width=True)
 
 
 #st.markdown("## 📘 Glosario de Modelo SNC")
@@ -745,20 +1052,80 @@ with st.expander("📖 Términos clave del modelo", expanded=False):
     **Otros Conceptos**: Nuevos Conceptos.            
     """)
 
-# --- Exportar a Excel ---
-import io
-output = io.BytesIO()
-with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-    df_resultados.to_excel(writer, index=False)
-output.seek(0)
-
-#st.markdown("##Exportar Resultados del Modelo")
-st.download_button(
-    label="Descargar Excel",
-    data=output,
-    file_name="resultados_modelo_SNC.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
+# --- HISTORIAL DE CORRIDAS de este portafolio y evolución por solución ---
+if not df_soluciones.empty and almacen is not None:
+    with st.expander("Historial de corridas", expanded=False):
+        with perfil.etapa("historial"):
+            df_corridas = almacen.corridas(portafolio=huella_soluciones, limite=50)
+        st.caption(f"Últimas corridas de este portafolio ({len(df_corridas)}), guardadas en {RUTA_CORRIDAS}")
+        st.dataframe(
+            df_corridas.drop(columns=["Portafolio"]).style.format(
+                {"VPN (USD)": "{:,.0f}", "Carbono Total (tCO2e)": "{:,.0f}"}
+            ),
+            hide_index=True,
+        )
+
+        solucion_historial = st.selectbox(
+            "Evolución de la solución", list(dict.fromkeys(df_resultados["Solución"].astype(str)))
+        )
+        with perfil.etapa("historial"):
+            df_evolucion = almacen.evolucion(solucion_historial, limite=200)
+        if not df_evolucion.empty:
+            import plotly.express as px
+            fig_evolucion = px.line(
+                df_evolucion.sort_values("Corrida"), x="Corrida", y="VPN (USD)", markers=True,
+                hover_data=["Fecha", "Área (ha)", "Carbono Total (tCO2e)"],
+                title=f"VPN de {solucion_historial} en las últimas {len(df_evolucion)} corridas (todos los portafolios)"
+            )
+            st.plotly_chart(fig_evolucion, use_container_width=True)
+
+# --- REPORTES DEL MODELO (Excel de varias hojas y PDF generados en el servidor) ---
+if not df_soluciones.empty:
+    st.markdown("#### Reporte del modelo")
+    datos_reporte = DatosReporte(
+        resultados=df_resultados,
+        portafolio=portafolio,
+        escenarios=resultado_escenarios,
+        matriz_vpn=matriz_vpn,
+        precios=rango_precio,
+        tasas=rango_descuento,
+        frontera_precio=frontera_precio,
+        parametros=parametros,
+    )
+    clave_reporte = huella(
+        "reporte", huella_soluciones, parametros, escenarios, rango_precio, rango_descuento, n_anios_default
+    )
+    col_excel, col_pdf = st.columns(2)
+    descarga_diferida(
+        col_excel, clave_reporte, "Excel", lambda: reporte_excel(datos_reporte),
+        "resultados_modelo_SNC.xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+    descarga_diferida(
+        col_pdf, clave_reporte, "PDF", lambda: reporte_pdf(datos_reporte),
+        "modelo_sumideros_completo.pdf", "application/pdf",
+    )
+
+    # --- Exportación columnar (Parquet / Arrow) para la cadena de BI ---
+    formato_columnar = st.radio("Formato columnar", list(FORMATOS), horizontal=True)
+    extension, mime_columnar = FORMATOS[formato_columnar]
+    clave_columnar = huella(clave_reporte, formato_columnar)
+    col_res, col_flujos, col_sens = st.columns(3)
+    descarga_diferida(
+        col_res, clave_columnar, f"Resultados ({formato_columnar})",
+        lambda: exportar(df_resultados, formato_columnar),
+        f"resultados_modelo_SNC.{extension}", mime_columnar,
+    )
+    descarga_diferida(
+        col_flujos, clave_columnar, f"Flujos anuales ({formato_columnar})",
+        lambda: exportar(tabla_flujos(portafolio), formato_columnar),
+        f"flujos_anuales_SNC.{extension}", mime_columnar,
+    )
+    descarga_diferida(
+        col_sens, clave_columnar, f"Sensibilidad VPN ({formato_columnar})",
+        lambda: exportar(tabla_sensibilidad(matriz_vpn, rango_precio, rango_descuento), formato_columnar),
+        f"sensibilidad_vpn_SNC.{extension}", mime_columnar,
+    )
 
 # === PIE DE PÁGINA ===
 st.markdown("""---""")
@@ -769,3 +1136,18 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# --- PANEL DE DIAGNÓSTICO: tiempos por etapa de esta ejecución ---
+if perfil_activo:
+    perfil.cerrar()
+    with st.sidebar.expander("Perfil de la ejecución", expanded=True):
+        st.metric("Tiempo medido (ms)", f"{perfil.total * 1000:,.0f}")
+        df_perfil = perfil.tabla()
+        st.dataframe(
+            df_perfil.style.format({
+                "Filas": "{:,}", "Tiempo (ms)": "{:,.1f}", "% del total": "{:.0f}%", "Memoria pico del proceso (MB)": "{:,.1f}",
+            }),
+            hide_index=True
+        )
+        st.caption("Memoria pico del proceso: RSS de todo el servidor por encima del inicio de la etapa "
+                   "(incluye lo que otras sesiones asignen a la vez). "
+                   "Caché: aciertos y fallos del caché de resultados durante la etapa.")
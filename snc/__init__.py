@@ -0,0 +1,33 @@
+"""Núcleo del modelo de Sumideros Naturales de Carbono (sin dependencias de UI)."""
+
+from snc.motor import (
+    N_ANIOS_DEFAULT,
+    SOLUCIONES_PREDETERMINADAS,
+    Parametros,
+    ResultadoPortafolio,
+    calcular_portafolio,
+    captura_acumulada,
+    factores_descuento,
+    formato_largo,
+    matriz_captura_ha,
+    preparar_soluciones,
+    trayectoria_precio,
+    vector_descuento,
+    vector_precios,
+)
+
+__all__ = [
+    "N_ANIOS_DEFAULT",
+    "SOLUCIONES_PREDETERMINADAS",
+    "Parametros",
+    "ResultadoPortafolio",
+    "calcular_portafolio",
+    "captura_acumulada",
+    "factores_descuento",
+    "formato_largo",
+    "matriz_captura_ha",
+    "preparar_soluciones",
+    "trayectoria_precio",
+    "vector_descuento",
+    "vector_precios",
+]
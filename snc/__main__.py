@@ -0,0 +1,5 @@
+import sys
+
+from snc.cli import main
+
+sys.exit(main())
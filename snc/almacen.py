@@ -0,0 +1,167 @@
+# Archivo: snc/almacen.py
+"""Tabla de soluciones de la sesión guardada por columnas.
+
+`TablaSoluciones` reemplaza la lista de diccionarios de la modelación
+interactiva: cada campo es un arreglo NumPy de tipo fijo con capacidad de
+reserva, así que agregar es O(1) amortizado, editar es O(1) y eliminar conserva
+el orden de las filas desplazando las siguientes dentro del mismo arreglo (sin
+reservar memoria). Los parámetros de curva que el formulario no pide se
+completan con el catálogo al agregar, de modo que no hay NaN.
+
+`columnas()` entrega vistas sin copia con las mismas claves que
+`preparar_soluciones`, listas para el motor; valen hasta la siguiente escritura
+en la tabla. Lo que guarde las columnas más allá de eso (resultados en el caché)
+pide `columnas(copia=True)`.
+"""
+
+import numpy as np
+
+from snc.motor import COLUMNAS_NUMERICAS, PARAMETROS_CURVA, SOLUCIONES_PREDETERMINADAS
+
+CAPACIDAD_INICIAL = 16
+
+# Columnas de texto: (columna de la tabla, clave interna, clave del catálogo, valor por defecto)
+COLUMNAS_TEXTO = [
+    ("Solución", "solucion", None, ""),
+    ("Tipo Captura", "tipo_captura", "tipo_captura", "constante"),
+    ("Tipo SNC", "tipo_snc", "tipo_sn", "restauracion"),
+]
+
+# Clave interna → columna de la tabla, en el orden de `a_dataframe`
+COLUMNAS_TABLA = {
+    **{clave: columna for columna, clave, _, _ in COLUMNAS_TEXTO},
+    **{clave: columna for columna, (clave, _) in COLUMNAS_NUMERICAS.items()},
+    **{clave: columna for columna, clave, _ in PARAMETROS_CURVA},
+}
+
+_TEXTOS = tuple(clave for _, clave, _, _ in COLUMNAS_TEXTO)
+_ENTEROS = ("duracion", "inicio")
+
+
+def _tipo(clave):
+    if clave in _TEXTOS:
+        return object
+    return np.int64 if clave in _ENTEROS else float
+
+
+def _valor(solucion, columna, catalogo, defecto):
+    valor = solucion.get(columna)
+    if valor is None or (isinstance(valor, float) and np.isnan(valor)):
+        if catalogo is not None:
+            valor = SOLUCIONES_PREDETERMINADAS.get(str(solucion.get("Solución", "")), {}).get(catalogo)
+        if valor is None:
+            valor = defecto
+    return valor
+
+
+def normalizar(solucion):
+    """Diccionario de la tabla (con claves faltantes) → valores internos completos."""
+    fila = {}
+    for columna, clave, catalogo, defecto in COLUMNAS_TEXTO:
+        fila[clave] = str(_valor(solucion, columna, catalogo, defecto))
+    for columna, (clave, defecto) in COLUMNAS_NUMERICAS.items():
+        fila[clave] = float(_valor(solucion, columna, None, defecto))
+    fila["duracion"] = int(fila["duracion"])
+    fila["inicio"] = max(int(fila["inicio"]), 0)
+    for columna, clave, catalogo in PARAMETROS_CURVA:
+        fila[clave] = float(_valor(solucion, columna, catalogo, 0.0))
+    return fila
+
+
+class TablaSoluciones:
+    """Soluciones de la sesión en arreglos de tipo fijo (una columna por campo)."""
+
+    def __init__(self, capacidad=CAPACIDAD_INICIAL):
+        self._n = 0
+        self._datos = {clave: np.empty(capacidad, dtype=_tipo(clave)) for clave in COLUMNAS_TABLA}
+
+    @classmethod
+    def desde_registros(cls, soluciones):
+        tabla = cls(max(len(soluciones), CAPACIDAD_INICIAL))
+        for solucion in soluciones:
+            tabla.agregar(solucion)
+        return tabla
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def capacidad(self):
+        return len(self._datos["solucion"])
+
+    @property
+    def nbytes(self):
+        """Bytes reservados por los arreglos (sin contar los textos compartidos)."""
+        return sum(valores.nbytes for valores in self._datos.values())
+
+    # --- Mutaciones ---
+    def _reservar(self, capacidad):
+        for clave, valores in self._datos.items():
+            nuevos = np.empty(capacidad, dtype=valores.dtype)
+            nuevos[:self._n] = valores[:self._n]
+            self._datos[clave] = nuevos
+
+    def _escribir(self, indice, fila):
+        for clave, valor in fila.items():
+            self._datos[clave][indice] = valor
+
+    def agregar(self, solucion):
+        """Agrega una solución (diccionario con las columnas de la tabla); devuelve su índice."""
+        if self._n == self.capacidad:
+            self._reservar(max(2 * self.capacidad, CAPACIDAD_INICIAL))
+        self._escribir(self._n, normalizar(solucion))
+        self._n += 1
+        return self._n - 1
+
+    def editar(self, indice, solucion):
+        self._validar(indice)
+        self._escribir(indice, normalizar(solucion))
+
+    def eliminar(self, indice):
+        """Quita la fila `indice`; las siguientes suben un lugar (el orden se conserva)."""
+        self._validar(indice)
+        ultima = self._n - 1
+        for valores in self._datos.values():
+            valores[indice:ultima] = valores[indice + 1:self._n]
+        self._datos["solucion"][ultima] = None
+        self._n = ultima
+
+    def vaciar(self):
+        self.__init__()
+
+    def _validar(self, indice):
+        if not 0 <= indice < self._n:
+            raise IndexError(f"Solución {indice} fuera de rango (hay {self._n})")
+
+    # --- Consultas ---
+    def columnas(self, inicio=0, fin=None, copia=False):
+        """Filas [inicio, fin) con las claves de `preparar_soluciones`.
+
+        Sin `copia` son vistas válidas hasta la siguiente escritura en la tabla.
+        """
+        fin = self._n if fin is None else fin
+        if copia:
+            return {clave: valores[inicio:fin].copy() for clave, valores in self._datos.items()}
+        return {clave: valores[inicio:fin] for clave, valores in self._datos.items()}
+
+    def fila(self, indice):
+        """Columnas de una sola fila (vistas de largo 1)."""
+        self._validar(indice)
+        return self.columnas(indice, indice + 1)
+
+    def nombre(self, indice):
+        return self._datos["solucion"][indice]
+
+    def registro(self, indice):
+        """La fila como diccionario con las columnas de la tabla."""
+        self._validar(indice)
+        return {columna: self._datos[clave][indice] if clave in _TEXTOS else self._datos[clave][indice].item()
+                for clave, columna in COLUMNAS_TABLA.items()}
+
+    def a_dataframe(self):
+        """DataFrame con las columnas de la tabla, para mostrar o exportar."""
+        import pandas as pd
+
+        return pd.DataFrame({
+            columna: self._datos[clave][:self._n] for clave, columna in COLUMNAS_TABLA.items()
+        })
@@ -0,0 +1,313 @@
+# Archivo: snc/benchmark.py
+"""Banco de pruebas de rendimiento del núcleo del modelo, sin servidor Streamlit.
+
+Uso:
+    python -m snc.benchmark
+    python -m snc.benchmark --tamanos 10 1000 100000 --historial bench.jsonl
+    python -m snc.benchmark --etapas resultados escenarios --fallar-si-regresion
+    python -m snc.benchmark --tamanos --importacion
+
+Genera portafolios sintéticos reproducibles a partir de
+`SOLUCIONES_PREDETERMINADAS` y mide por separado cada etapa que recorre la app:
+preparación de la tabla, resultados, escenarios, mapa de calor, captura
+acumulada y exportación a Excel. Cada etapa registra el mejor tiempo de hasta
+`REPETICIONES_MAX` corridas y la memoria pico del proceso (RSS).
+
+Con `--importacion` mide además la importación en frío de los módulos de
+`MODULOS_IMPORTACION`, cada una en un proceso nuevo, y anota qué dependencias
+pesadas (pandas, plotly, matplotlib…) quedaron cargadas: el núcleo del modelo
+debe importar solo NumPy.
+
+Cada corrida agrega una línea JSON por (tamaño, etapa) al historial; una etapa
+se marca como regresión si tarda más de `UMBRAL_REGRESION` veces la mediana de
+sus últimas corridas en la misma máquina.
+"""
+
+import argparse
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from snc.escenarios import evaluar_escenarios
+from snc.motor import (
+    N_ANIOS_DEFAULT,
+    SOLUCIONES_PREDETERMINADAS,
+    Parametros,
+    calcular_portafolio,
+    captura_acumulada,
+    formato_largo,
+    preparar_soluciones,
+)
+from snc.perfil import memoria_actual, memoria_pico, reiniciar_pico
+from snc.sensibilidad import precio_equilibrio, superficie_vpn
+
+TAMANOS_DEFAULT = (10, 1_000, 100_000, 1_000_000)
+HISTORIAL_DEFAULT = "benchmark_snc.jsonl"
+
+# Mejor de hasta REPETICIONES_MAX corridas, sin repetir más allá de TIEMPO_REPETICIONES segundos
+REPETICIONES_MAX = 3
+TIEMPO_REPETICIONES = 1.0
+
+# Regresión: más lento que UMBRAL_REGRESION × la mediana de las últimas VENTANA_HISTORIAL corridas
+UMBRAL_REGRESION = 1.25
+VENTANA_HISTORIAL = 5
+TIEMPO_MINIMO_REGRESION = 0.01  # por debajo de 10 ms el ruido domina
+
+# Importación en frío: módulos medidos y dependencias que no deberían cargarse sin necesidad
+MODULOS_IMPORTACION = ("snc", "snc.incremental", "snc.montecarlo", "snc.cli", "snc.reporte")
+DEPENDENCIAS_PESADAS = ("pandas", "pyarrow", "scipy", "matplotlib", "plotly", "streamlit")
+_SCRIPT_IMPORTACION = (
+    "import json, sys, time\n"
+    "inicio = time.perf_counter()\n"
+    "import {modulo}\n"
+    "segundos = time.perf_counter() - inicio\n"
+    "print(json.dumps([segundos, [m for m in {pesadas!r} if m in sys.modules]]))\n"
+)
+
+
+# --- PORTAFOLIO SINTÉTICO ---
+def portafolio_sintetico(n, semilla=0):
+    """Tabla de `n` soluciones del catálogo con áreas, duraciones e inicios aleatorios."""
+    rng = np.random.default_rng(semilla)
+    catalogo = pd.DataFrame.from_dict(SOLUCIONES_PREDETERMINADAS, orient="index")
+    fila = rng.integers(0, len(catalogo), n)
+    base = catalogo.iloc[fila]
+    area = rng.uniform(10, 1_000, n)
+    return pd.DataFrame({
+        "Solución": pd.Categorical.from_codes(fila, catalogo.index),
+        "Área (ha)": area,
+        "Costo anual por ha (USD)": base["costo"].to_numpy(dtype=float),
+        "CAPEX Total (USD)": base["capex"].to_numpy(dtype=float) * area,
+        "Duración (años)": np.clip(base["duracion"].to_numpy() + rng.integers(-5, 6, n), 5, 40),
+        "Año de Inicio": rng.integers(0, 6, n),
+        "Salvaguardas (%)": rng.uniform(0, 20, n),
+        "Ingreso Encadenado (USD/año)": rng.uniform(0, 500, n),
+        "% Pérdida Evitada": np.where(base["tipo_sn"].to_numpy() == "degradacion", 3.5, 0.0),
+    })
+
+
+# --- ETAPAS ---
+@dataclass
+class Contexto:
+    """Insumos compartidos por las etapas de un tamaño de portafolio."""
+
+    df: pd.DataFrame
+    parametros: Parametros
+    n_anios: int
+    columnas: dict = None
+    portafolio: object = None
+
+
+def _preparacion(c):
+    c.columnas = preparar_soluciones(c.df)
+
+
+def _resultados(c):
+    c.portafolio = calcular_portafolio(c.df, c.parametros, c.n_anios, c.columnas)
+
+
+def _escenarios(c):
+    # El conjunto por defecto de la app: precio -20% / base / +20%
+    escenarios = [replace(c.parametros, precio_carbono=c.parametros.precio_carbono * f) for f in (0.8, 1.0, 1.2)]
+    evaluar_escenarios(c.df, escenarios, c.n_anios, c.columnas)
+
+
+def _mapa_calor(c):
+    # La grilla por defecto de la app: 10 precios × 21 tasas y la frontera de equilibrio
+    precios = np.linspace(5.0, 50.0, 10)
+    tasas = np.linspace(1.0, 21.0, 21) / 100
+    superficie_vpn(c.df, c.parametros, precios, tasas, c.n_anios, c.columnas)
+    precio_equilibrio(c.df, c.parametros, tasas, c.n_anios, c.columnas)
+
+
+def _captura_acumulada(c):
+    acumulada, _ = captura_acumulada(c.portafolio.captura_eje(), c.portafolio.horizonte)
+    formato_largo(acumulada, c.portafolio.resultados["Solución"], "Captura Acumulada")
+
+
+def _exportacion_excel(c):
+    salida = io.BytesIO()
+    with pd.ExcelWriter(salida, engine="xlsxwriter") as writer:
+        c.portafolio.resultados.to_excel(writer, index=False)
+
+
+# En orden: cada etapa puede usar lo que dejaron las anteriores en el contexto
+ETAPAS = {
+    "preparacion": _preparacion,
+    "resultados": _resultados,
+    "escenarios": _escenarios,
+    "mapa_calor": _mapa_calor,
+    "captura_acumulada": _captura_acumulada,
+    "exportacion_excel": _exportacion_excel,
+}
+
+
+def medir(funcion, contexto):
+    """Mejor tiempo (s), corridas y memoria pico / adicional (MB) de una etapa."""
+    pico_disponible = reiniciar_pico()
+    inicial = memoria_actual()
+    tiempos = []
+    while len(tiempos) < REPETICIONES_MAX and sum(tiempos) < TIEMPO_REPETICIONES:
+        inicio = time.perf_counter()
+        funcion(contexto)
+        tiempos.append(time.perf_counter() - inicio)
+    pico = memoria_pico()
+    return {
+        "segundos": min(tiempos),
+        "repeticiones": len(tiempos),
+        "memoria_pico_mb": round(pico, 1),
+        # Sin reinicio del pico, la diferencia incluye etapas anteriores
+        "memoria_adicional_mb": round(pico - inicial, 1) if pico_disponible else None,
+    }
+
+
+def ejecutar(tamanos=TAMANOS_DEFAULT, etapas=None, parametros=None, n_anios=N_ANIOS_DEFAULT, semilla=0):
+    """Corre las etapas para cada tamaño; devuelve una lista de registros."""
+    etapas = list(ETAPAS) if etapas is None else etapas
+    parametros = parametros or Parametros()
+    registros = []
+    for n in tamanos:
+        contexto = Contexto(portafolio_sintetico(n, semilla), parametros, n_anios)
+        for nombre, funcion in ETAPAS.items():
+            if nombre in etapas:
+                registros.append({"filas": n, "etapa": nombre, **medir(funcion, contexto)})
+                print(f"{n:>10,} filas  {nombre:<18} {registros[-1]['segundos']:.4f} s", file=sys.stderr)
+            elif nombre in ("preparacion", "resultados"):
+                # Las etapas base se corren igual: las demás dependen de su salida
+                funcion(contexto)
+    return registros
+
+
+def medir_importacion(modulo):
+    """Mejor tiempo (s) de `import modulo` en un intérprete nuevo y dependencias pesadas cargadas."""
+    script = _SCRIPT_IMPORTACION.format(modulo=modulo, pesadas=DEPENDENCIAS_PESADAS)
+    tiempos = []
+    while len(tiempos) < REPETICIONES_MAX and sum(tiempos) < TIEMPO_REPETICIONES:
+        salida = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+        segundos, cargadas = json.loads(salida.stdout.splitlines()[-1])
+        tiempos.append(segundos)
+    return {"segundos": min(tiempos), "repeticiones": len(tiempos), "dependencias": ",".join(cargadas)}
+
+
+def ejecutar_importacion(modulos=MODULOS_IMPORTACION):
+    registros = []
+    for modulo in modulos:
+        registros.append({"filas": 0, "etapa": f"importar {modulo}", **medir_importacion(modulo)})
+        print(f"{'importar':>15}  {modulo:<18} {registros[-1]['segundos']:.4f} s", file=sys.stderr)
+    return registros
+
+
+# --- HISTORIAL ---
+def _commit():
+    try:
+        salida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return salida.stdout.strip() or None
+
+
+def entorno():
+    """Metadatos de la corrida que viajan con cada registro del historial."""
+    return {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "maquina": platform.node(),
+        "plataforma": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def leer_historial(ruta):
+    ruta = Path(ruta)
+    if not ruta.exists():
+        return pd.DataFrame()
+    with open(ruta, encoding="utf-8") as f:
+        return pd.DataFrame([json.loads(linea) for linea in f if linea.strip()])
+
+
+def agregar_historial(ruta, registros, metadatos):
+    with open(ruta, "a", encoding="utf-8") as f:
+        for registro in registros:
+            f.write(json.dumps({**metadatos, **registro}, ensure_ascii=False) + "\n")
+
+
+def comparar(registros, historial, maquina):
+    """Tabla de la corrida con la referencia histórica y la marca de regresión."""
+    tabla = pd.DataFrame(registros)
+    if tabla.empty:
+        return tabla
+    referencia = pd.Series(np.nan, index=tabla.index)
+    if not historial.empty:
+        previas = historial[historial["maquina"] == maquina]
+        for i, fila in tabla.iterrows():
+            tiempos = previas.loc[
+                (previas["filas"] == fila["filas"]) & (previas["etapa"] == fila["etapa"]), "segundos"
+            ]
+            if len(tiempos):
+                referencia[i] = tiempos.tail(VENTANA_HISTORIAL).median()
+    tabla["referencia_s"] = referencia
+    tabla["relacion"] = tabla["segundos"] / referencia
+    tabla["regresion"] = (tabla["relacion"] > UMBRAL_REGRESION) & (tabla["segundos"] > TIEMPO_MINIMO_REGRESION)
+    return tabla
+
+
+# --- LÍNEA DE COMANDOS ---
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m snc.benchmark",
+        description="Tiempos y memoria pico del modelo SNC por etapa y tamaño de portafolio.",
+    )
+    parser.add_argument("-n", "--tamanos", nargs="*", type=int, default=list(TAMANOS_DEFAULT),
+                        help="Filas de los portafolios sintéticos (sin valores: ninguno)")
+    parser.add_argument("-e", "--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--historial", default=HISTORIAL_DEFAULT, help="Archivo JSON Lines del historial")
+    parser.add_argument("--sin-historial", action="store_true", help="No escribir la corrida en el historial")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--importacion", action="store_true",
+                        help="Medir también la importación en frío de los módulos del paquete")
+    parser.add_argument("--fallar-si-regresion", action="store_true",
+                        help="Código de salida 1 si alguna etapa es una regresión")
+    return parser
+
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+    metadatos = entorno()
+    historial = leer_historial(args.historial)
+    registros = ejecutar(args.tamanos, args.etapas, semilla=args.semilla)
+    if args.importacion:
+        registros += ejecutar_importacion()
+
+    tabla = comparar(registros, historial, metadatos["maquina"])
+    with pd.option_context("display.width", 160, "display.max_columns", None):
+        print(tabla.to_string(index=False, float_format=lambda x: f"{x:.4g}"))
+    if not args.sin_historial:
+        agregar_historial(args.historial, registros, metadatos)
+        print(f"{len(registros)} registros agregados a {args.historial}", file=sys.stderr)
+
+    regresiones = tabla[tabla["regresion"]] if not tabla.empty else tabla
+    for _, fila in regresiones.iterrows():
+        print(f"REGRESIÓN {fila['etapa']} con {fila['filas']:,} filas: "
+              f"{fila['segundos']:.3f} s vs {fila['referencia_s']:.3f} s", file=sys.stderr)
+    return 1 if args.fallar_si_regresion and len(regresiones) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+# Archivo: snc/cache.py
+"""Caché LRU en memoria y caché de arreglos en disco para los cálculos del modelo.
+
+Las claves son huellas SHA-256 estables de los parámetros y de la tabla de
+soluciones, así que una nueva ejecución del script con las mismas entradas
+reutiliza los resultados. El caché en memoria es compartido por todas las
+sesiones del proceso y tiene un número máximo de entradas y de bytes (el
+tamaño de cada valor se estima con `tamano_bytes`).
+
+`CacheDisco` guarda arreglos NumPy como archivos .npy bajo su clave y los
+devuelve mapeados en memoria (solo lectura): los procesos del servidor
+comparten las mismas páginas a través del sistema operativo y, tras un
+reinicio, un portafolio ya evaluado se lee en vez de recalcularse. Se desalojan
+las entradas usadas hace más tiempo cuando el directorio supera su tamaño máximo.
+"""
+
+import dataclasses
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+def _actualizar(h, parte):
+    if isinstance(parte, pd.DataFrame):
+        h.update(b"df")
+        h.update(repr([(str(c), str(t)) for c, t in parte.dtypes.items()]).encode())
+        h.update(pd.util.hash_pandas_object(parte, index=False).to_numpy().tobytes())
+    elif isinstance(parte, pd.Series):
+        h.update(b"serie")
+        h.update(pd.util.hash_pandas_object(parte, index=False).to_numpy().tobytes())
+    elif isinstance(parte, np.ndarray):
+        h.update(b"arr")
+        h.update(f"{parte.dtype.str}{parte.shape}".encode())
+        if parte.dtype == object:
+            h.update(repr(parte.tolist()).encode())
+        else:
+            h.update(np.ascontiguousarray(parte).tobytes())
+    elif dataclasses.is_dataclass(parte) and not isinstance(parte, type):
+        h.update(type(parte).__name__.encode())
+        _actualizar(h, dataclasses.asdict(parte))
+    elif isinstance(parte, dict):
+        h.update(b"dict")
+        for clave in sorted(parte, key=str):
+            _actualizar(h, clave)
+            _actualizar(h, parte[clave])
+    elif isinstance(parte, (list, tuple)):
+        h.update(b"seq%d" % len(parte))
+        for elemento in parte:
+            _actualizar(h, elemento)
+    else:
+        h.update(repr(parte).encode())
+    h.update(b"|")
+
+
+def huella(*partes):
+    """Huella hexadecimal estable de DataFrames, arreglos, dataclasses y escalares."""
+    h = hashlib.sha256()
+    for parte in partes:
+        _actualizar(h, parte)
+    return h.hexdigest()
+
+
+def _mapeado(arreglo):
+    while isinstance(arreglo, np.ndarray):
+        if isinstance(arreglo, np.memmap):
+            return True
+        arreglo = arreglo.base
+    return isinstance(arreglo, mmap.mmap)
+
+
+def tamano_bytes(valor, _vistos=None):
+    """Bytes aproximados que ocupa `valor` en memoria.
+
+    Suma `nbytes` de los arreglos (los mapeados desde el caché en disco no
+    cuentan: son páginas del sistema operativo), `memory_usage(deep=True)` de
+    DataFrames y Series, y recorre dataclasses, diccionarios y secuencias.
+    """
+    vistos = set() if _vistos is None else _vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if isinstance(valor, np.ndarray):
+        if _mapeado(valor):
+            return 0
+        if valor.dtype == object:
+            return valor.nbytes + sum(tamano_bytes(v, vistos) for v in valor.ravel())
+        return valor.nbytes
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, pd.Series):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v, vistos) for v in valor.values())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v, vistos) for v in valor)
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return sys.getsizeof(valor) + sum(tamano_bytes(v, vistos) for v in vars(valor).values())
+    return sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """Caché con desalojo del elemento usado hace más tiempo (seguro entre hilos).
+
+    Se desaloja mientras haya más de `max_entradas` entradas o los valores
+    sumen más de `max_bytes`; un valor que solo ya supera `max_bytes` se
+    devuelve sin guardarlo.
+    """
+
+    def __init__(self, max_entradas=128, max_bytes=np.inf):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self.nbytes = 0
+        self._datos = OrderedDict()
+        self._tamanos = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._datos)
+
+    def __contains__(self, clave):
+        return clave in self._datos
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor de `clave`, calculándolo con `calcular()` si falta."""
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+            self.fallos += 1
+
+        valor = calcular()
+        tamano = tamano_bytes(valor)
+        if tamano > self.max_bytes:
+            return valor
+
+        with self._lock:
+            self.nbytes += tamano - self._tamanos.get(clave, 0)
+            self._datos[clave] = valor
+            self._tamanos[clave] = tamano
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas or self.nbytes > self.max_bytes:
+                antigua, _ = self._datos.popitem(last=False)
+                self.nbytes -= self._tamanos.pop(antigua)
+        return valor
+
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self._tamanos.clear()
+            self.nbytes = 0
+
+
+class CacheDisco:
+    """Arreglos NumPy en `directorio/<clave[:2]>/<clave>/`, mapeados en memoria al leerlos.
+
+    El valor guardado es un arreglo, una tupla de arreglos o un dict nombre →
+    arreglo, siempre de tipos numéricos (los de tipo objeto no se pueden mapear
+    y se devuelven sin guardar). Cada entrada se escribe en un directorio
+    temporal y se publica con un `rename` atómico, así que varios procesos
+    pueden calcular la misma clave a la vez sin dejar entradas a medias.
+    """
+
+    INDICE = "indice.json"
+
+    def __init__(self, directorio, max_bytes):
+        self.directorio = Path(directorio)
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _ruta(self, clave):
+        return self.directorio / clave[:2] / clave
+
+    def __contains__(self, clave):
+        return (self._ruta(clave) / self.INDICE).exists()
+
+    def obtener(self, clave, calcular):
+        """Devuelve el valor de `clave` (arreglos de solo lectura), calculándolo con `calcular()` si falta."""
+        ruta = self._ruta(clave)
+        try:
+            valor = self._leer(ruta)
+        except (OSError, ValueError, KeyError):
+            pass  # sin entrada, directorio inutilizable o entrada dañada: se calcula
+        else:
+            self.aciertos += 1
+            try:
+                os.utime(ruta)  # la fecha de modificación marca el último uso
+            except OSError:
+                pass
+            return valor
+        self.fallos += 1
+
+        valor = calcular()
+        partes = self._partes(valor)
+        if partes is None:
+            return valor
+        if not self._escribir(ruta, valor, partes):
+            return valor  # disco de solo lectura o lleno: el caché en memoria sigue funcionando
+        try:
+            self._desalojar(conservar=ruta)
+            # Se devuelve la versión mapeada: el arreglo calculado puede liberarse
+            return self._leer(ruta)
+        except OSError:
+            return valor
+
+    # --- Formato en disco ---
+    @staticmethod
+    def _partes(valor):
+        if isinstance(valor, np.ndarray):
+            partes = {"0": valor}
+        elif isinstance(valor, tuple):
+            partes = {str(i): arreglo for i, arreglo in enumerate(valor)}
+        elif isinstance(valor, dict):
+            partes = dict(valor)
+        else:
+            return None
+        if not all(isinstance(a, np.ndarray) and a.dtype != object for a in partes.values()):
+            return None
+        return partes
+
+    def _escribir(self, ruta, valor, partes):
+        """Publica la entrada; True si quedó en disco (escrita aquí o por otro proceso)."""
+        temporal = None
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = Path(tempfile.mkdtemp(dir=ruta.parent, prefix=".tmp-"))
+            nombres = list(partes)
+            for i, arreglo in enumerate(partes.values()):
+                np.save(temporal / f"{i}.npy", np.ascontiguousarray(arreglo), allow_pickle=False)
+            tipo = type(valor).__name__ if isinstance(valor, (tuple, dict)) else "ndarray"
+            (temporal / self.INDICE).write_text(json.dumps({"tipo": tipo, "nombres": nombres}))
+            os.rename(temporal, ruta)
+            return True
+        except OSError:
+            # Otro proceso publicó la misma clave primero (vale la existente) o el disco falló
+            if temporal is not None:
+                shutil.rmtree(temporal, ignore_errors=True)
+            return (ruta / self.INDICE).exists()
+
+    def _leer(self, ruta):
+        indice = json.loads((ruta / self.INDICE).read_text())
+        arreglos = []
+        for i in range(len(indice["nombres"])):
+            try:
+                arreglos.append(np.asarray(np.load(ruta / f"{i}.npy", mmap_mode="r")))
+            except ValueError:
+                # Los arreglos vacíos no se pueden mapear
+                arreglos.append(np.load(ruta / f"{i}.npy"))
+        if indice["tipo"] == "ndarray":
+            return arreglos[0]
+        if indice["tipo"] == "tuple":
+            return tuple(arreglos)
+        return dict(zip(indice["nombres"], arreglos))
+
+    # --- Desalojo por tamaño ---
+    def entradas(self):
+        """(ruta, bytes, último uso) de cada entrada publicada."""
+        if not self.directorio.is_dir():
+            return []
+        salida = []
+        for prefijo in self.directorio.iterdir():
+            if not prefijo.is_dir():
+                continue
+            for ruta in prefijo.iterdir():
+                if ruta.name.startswith(".tmp-"):
+                    continue
+                try:
+                    archivos = list(ruta.iterdir())
+                    salida.append((ruta, sum(a.stat().st_size for a in archivos), ruta.stat().st_mtime))
+                except OSError:
+                    continue  # desalojada por otro proceso
+        return salida
+
+    @property
+    def nbytes(self):
+        return sum(tamano for _, tamano, _ in self.entradas())
+
+    def _desalojar(self, conservar=None):
+        entradas = sorted(self.entradas(), key=lambda e: e[2])
+        total = sum(tamano for _, tamano, _ in entradas)
+        for ruta, tamano, _ in entradas:
+            if total <= self.max_bytes:
+                break
+            if ruta == conservar:
+                continue
+            # Un proceso que ya la tenía mapeada conserva sus páginas hasta soltarla
+            shutil.rmtree(ruta, ignore_errors=True)
+            total -= tamano
+
+    def limpiar(self):
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+# Caché compartido por todas las sesiones del servidor
+CACHE_RESULTADOS = CacheLRU(
+    int(os.environ.get("SNC_CACHE_MAX_ENTRADAS", 128)),
+    int(os.environ.get("SNC_CACHE_MAX_MB", 1024)) * 2**20,
+)
+
+# Caché en disco compartido por los procesos del servidor y entre reinicios; SNC_CACHE_DISCO="" lo desactiva.
+# Por defecto en el directorio temporal del sistema, no en el directorio de trabajo
+_DIRECTORIO_DISCO = os.environ.get("SNC_CACHE_DISCO", os.path.join(tempfile.gettempdir(), "cache_snc"))
+CACHE_DISCO = (
+    CacheDisco(_DIRECTORIO_DISCO, int(os.environ.get("SNC_CACHE_DISCO_MAX_MB", 2048)) * 2**20)
+    if _DIRECTORIO_DISCO else None
+)
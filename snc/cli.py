@@ -0,0 +1,172 @@
+# Archivo: snc/cli.py
+"""Ejecución por lotes del modelo SNC, sin servidor Streamlit.
+
+Uso:
+    python -m snc soluciones.xlsx --parametros base.json alto.json --salida resultados/
+    python -m snc regiones/*.parquet --parametros escenarios/*.json --procesos 8
+    python -m snc soluciones.xlsx --parametros base.json --corridas corridas_snc.sqlite
+
+Cada combinación (tabla de soluciones, archivo de parámetros) se evalúa en un
+proceso del pool y escribe sus resultados y flujos anuales en `--salida`.
+Al final se escribe `resumen.csv` con una fila por combinación. Con
+`--corridas` cada valoración se guarda en el historial SQLite (`snc.corridas`)
+y una combinación ya valorada se lee de él en vez de recalcularse.
+"""
+
+import argparse
+import dataclasses
+import json
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from pathlib import Path
+
+import pandas as pd
+
+from snc.motor import CAMPOS_TRAYECTORIA, N_ANIOS_DEFAULT, Parametros, calcular_portafolio
+
+FORMATOS_SALIDA = ("xlsx", "parquet", "arrow", "csv")
+
+
+def cargar_parametros(ruta):
+    """Lee un JSON con los campos de `Parametros` (tasas y crecimientos como fracción).
+
+    `curva_precio` y `curva_descuento` son listas con un valor por año. Admite
+    además la clave `n_anios`. Las claves desconocidas son un error.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    n_anios = int(datos.pop("n_anios", N_ANIOS_DEFAULT))
+    campos = {campo.name for campo in dataclasses.fields(Parametros)}
+    desconocidas = sorted(set(datos) - campos)
+    if desconocidas:
+        raise ValueError(f"{ruta}: parámetros desconocidos: {', '.join(desconocidas)}")
+    return Parametros(**{
+        clave: valor if clave in CAMPOS_TRAYECTORIA else float(valor) for clave, valor in datos.items()
+    }), n_anios
+
+
+def escribir_salida(portafolio, destino, formato):
+    """Escribe resultados y flujos anuales en `destino` (sin extensión)."""
+    from snc.columnar import exportar, tabla_flujos
+
+    if formato == "xlsx":
+        flujos = tabla_flujos(portafolio).to_pandas()
+        with pd.ExcelWriter(destino.with_name(destino.name + ".xlsx"), engine="xlsxwriter") as writer:
+            portafolio.resultados.to_excel(writer, sheet_name="Resultados", index=False)
+            flujos.to_excel(writer, sheet_name="Flujos Anuales", index=False)
+    elif formato == "csv":
+        portafolio.resultados.to_csv(destino.with_name(destino.name + "_resultados.csv"), index=False)
+        tabla_flujos(portafolio).to_pandas().to_csv(destino.with_name(destino.name + "_flujos.csv"), index=False)
+    else:
+        destino.with_name(destino.name + f"_resultados.{formato}").write_bytes(
+            exportar(portafolio.resultados, formato)
+        )
+        destino.with_name(destino.name + f"_flujos.{formato}").write_bytes(
+            exportar(tabla_flujos(portafolio), formato)
+        )
+
+
+def nombres_salida(rutas):
+    """Nombre de salida único por archivo: su nombre sin extensión, o la ruta completa si ese nombre se repite.
+
+    `sol.xlsx` y `sol.parquet`, o `a/x.parquet` y `b/x.parquet`, no deben
+    escribir sobre los mismos archivos.
+    """
+    rutas = [Path(ruta) for ruta in rutas]
+    stems = [ruta.stem for ruta in rutas]
+    # Sin la raíz: una ruta absoluta no debe sacar la salida de su directorio
+    nombres = [
+        stem if stems.count(stem) == 1
+        else "_".join(ruta.parts[1 if ruta.anchor else 0:]).replace(".", "_").lstrip("_")
+        for ruta, stem in zip(rutas, stems)
+    ]
+    # Rutas distintas que aun así colapsan al mismo nombre: se antepone su posición
+    return [nombre if nombres.count(nombre) == 1 else f"{i}_{nombre}" for i, nombre in enumerate(nombres)]
+
+
+def evaluar(ruta_soluciones, ruta_parametros, directorio_salida, formato, ruta_corridas=None, nombre_salida=None):
+    """Evalúa una combinación; devuelve la fila de resumen.
+
+    `nombre_salida` es el prefijo de los archivos escritos (por defecto, los
+    nombres de ambos archivos sin extensión).
+    """
+    from snc.columnar import leer_soluciones
+
+    parametros, n_anios = cargar_parametros(ruta_parametros)
+    df_soluciones = leer_soluciones(ruta_soluciones)
+    if ruta_corridas is None:
+        portafolio = calcular_portafolio(df_soluciones, parametros, n_anios)
+    else:
+        from snc.cache import huella
+        from snc.corridas import almacen_corridas
+
+        portafolio = almacen_corridas(ruta_corridas).obtener(
+            huella(df_soluciones), parametros, n_anios,
+            lambda: calcular_portafolio(df_soluciones, parametros, n_anios), origen="cli",
+        )
+
+    if nombre_salida is None:
+        nombre_salida = f"{Path(ruta_soluciones).stem}__{Path(ruta_parametros).stem}"
+    destino = Path(directorio_salida) / nombre_salida
+    escribir_salida(portafolio, destino, formato)
+
+    return {
+        "Soluciones": str(ruta_soluciones),
+        "Parámetros": str(ruta_parametros),
+        "N Soluciones": len(df_soluciones),
+        "Carbono Total (tCO2e)": float(portafolio.carbono_total.sum()),
+        "Ingreso Total (USD)": float(portafolio.ingreso_total.sum()),
+        "VPN (USD)": float(portafolio.vpn.sum()),
+        **dataclasses.asdict(parametros),
+    }
+
+
+def _evaluar_tarea(tarea):
+    try:
+        return evaluar(*tarea), None
+    except Exception as error:
+        return None, f"{tarea[0]} × {tarea[1]}: {error}"
+
+
+def construir_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m snc",
+        description="Valoración por lotes de portafolios de Sumideros Naturales de Carbono.",
+    )
+    parser.add_argument("soluciones", nargs="+", help="Tablas de soluciones (.xlsx, .parquet, .arrow)")
+    parser.add_argument("-p", "--parametros", nargs="+", required=True, help="Archivos JSON de parámetros")
+    parser.add_argument("-o", "--salida", default="resultados_snc", help="Directorio de salida")
+    parser.add_argument("-f", "--formato", choices=FORMATOS_SALIDA, default="parquet")
+    parser.add_argument("-j", "--procesos", type=int, default=1, help="Procesos en paralelo")
+    parser.add_argument("--corridas", help="Base SQLite del historial de corridas (se crea si no existe)")
+    return parser
+
+
+def main(argv=None):
+    args = construir_parser().parse_args(argv)
+    Path(args.salida).mkdir(parents=True, exist_ok=True)
+    tareas = [
+        (sol, par, args.salida, args.formato, args.corridas, f"{nombre_sol}__{nombre_par}")
+        for (sol, nombre_sol), (par, nombre_par) in product(
+            zip(args.soluciones, nombres_salida(args.soluciones)),
+            zip(args.parametros, nombres_salida(args.parametros)),
+        )
+    ]
+
+    if args.procesos > 1 and len(tareas) > 1:
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=args.procesos, mp_context=contexto) as pool:
+            salidas = list(pool.map(_evaluar_tarea, tareas))
+    else:
+        salidas = [_evaluar_tarea(tarea) for tarea in tareas]
+    filas = [fila for fila, _ in salidas if fila is not None]
+    errores = [error for _, error in salidas if error is not None]
+
+    resumen = pd.DataFrame(filas)
+    resumen.to_csv(Path(args.salida) / "resumen.csv", index=False)
+    print(f"{len(filas)} valoraciones escritas en {args.salida}", file=sys.stderr)
+    for error in errores:
+        print(f"ERROR {error}", file=sys.stderr)
+    return 1 if errores else 0
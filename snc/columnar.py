@@ -0,0 +1,142 @@
+# Archivo: snc/columnar.py
+"""Entrada y salida columnar (Parquet y Arrow IPC) del modelo.
+
+La lectura proyecta solo las columnas que usa el modelo, así que los campos
+extra de un inventario grande no se cargan. La escritura arma tablas Arrow
+directamente desde los arreglos del motor, sin pasar por Excel.
+"""
+
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from snc.ingesta import (
+    CACHE_LECTURAS,
+    COLUMNAS_CATEGORICAS,
+    TIPOS_COLUMNAS,
+    compactar,
+    errores_lectura,
+    leer_bytes,
+    leer_soluciones_excel,
+    validar_encabezado,
+)
+
+# Columnas que el modelo sabe usar; el resto se omite al leer
+COLUMNAS_MODELO = list(dict.fromkeys(COLUMNAS_CATEGORICAS + list(TIPOS_COLUMNAS)))
+
+FORMATOS = {
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.feather  # noqa: F401
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as error:
+        raise ImportError("La entrada/salida Parquet y Arrow requiere el paquete 'pyarrow'") from error
+    return pyarrow
+
+
+def _a_dataframe(tabla):
+    validar_encabezado(tabla.column_names)
+    return compactar(tabla.to_pandas())
+
+
+def _proyeccion(disponibles, columnas):
+    return [c for c in (columnas or COLUMNAS_MODELO) if c in disponibles]
+
+
+def _clave_lectura(datos, proyeccion):
+    # Misma clave para Parquet y Arrow: huella del archivo y columnas efectivamente leídas
+    return hashlib.sha256(datos).hexdigest() + repr(proyeccion)
+
+
+def leer_soluciones_parquet(archivo, columnas=None):
+    """Lee una tabla de soluciones Parquet proyectando solo `columnas`."""
+    pa = _pyarrow()
+    datos = leer_bytes(archivo)
+    proyeccion = _proyeccion(pa.parquet.read_schema(pa.BufferReader(datos)).names, columnas)
+
+    def leer():
+        tabla = pa.parquet.read_table(pa.BufferReader(datos), columns=proyeccion)
+        return _a_dataframe(tabla)
+
+    return CACHE_LECTURAS.obtener(_clave_lectura(datos, proyeccion), leer)
+
+
+def leer_soluciones_arrow(archivo, columnas=None):
+    """Lee un archivo Arrow IPC (Feather v2) proyectando solo `columnas`.
+
+    El esquema se lee del pie del archivo y el lector IPC solo decodifica los
+    campos pedidos (con compresión, el resto no se descomprime).
+    """
+    pa = _pyarrow()
+    datos = leer_bytes(archivo)
+    proyeccion = _proyeccion(pa.ipc.open_file(pa.BufferReader(datos)).schema.names, columnas)
+
+    def leer():
+        tabla = pa.feather.read_table(pa.BufferReader(datos), columns=proyeccion, memory_map=False)
+        return _a_dataframe(tabla)
+
+    return CACHE_LECTURAS.obtener(_clave_lectura(datos, proyeccion), leer)
+
+
+# --- TABLAS DE SALIDA ---
+def tabla_flujos(portafolio):
+    """Flujo de caja anual por solución en el eje del portafolio: una columna por año."""
+    pa = _pyarrow()
+    # Transpuesta contigua: cada año queda como un bloque de memoria continuo
+    por_anio = np.ascontiguousarray(portafolio.flujos_eje().T)
+    columnas = {"Solución": pa.array(portafolio.resultados["Solución"].astype(str))}
+    for anio, flujo in enumerate(por_anio, start=1):
+        columnas[f"Año {anio}"] = pa.array(flujo)
+    return pa.table(columnas)
+
+
+def tabla_sensibilidad(matriz_vpn, precios, tasas):
+    """Superficie de sensibilidad en formato largo (tasa, precio, VPN)."""
+    pa = _pyarrow()
+    matriz_vpn = np.asarray(matriz_vpn, dtype=float)
+    tasas_largo, precios_largo = np.meshgrid(
+        np.asarray(tasas, dtype=float), np.asarray(precios, dtype=float), indexing="ij"
+    )
+    return pa.table({
+        "Tasa de Descuento (%)": tasas_largo.ravel(),
+        "Precio Carbono (USD/tCO2e)": precios_largo.ravel(),
+        "VPN (USD)": matriz_vpn.ravel(),
+    })
+
+
+def exportar(tabla, formato="parquet"):
+    """Serializa una tabla Arrow (o un DataFrame) a bytes Parquet o Arrow IPC."""
+    pa = _pyarrow()
+    if isinstance(tabla, pd.DataFrame):
+        tabla = pa.Table.from_pandas(tabla, preserve_index=False)
+    salida = pa.BufferOutputStream()
+    if formato == "parquet":
+        pa.parquet.write_table(tabla, salida, compression="zstd")
+    elif formato == "arrow":
+        with pa.ipc.new_file(salida, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return salida.getvalue().to_pybytes()
+
+
+def leer_soluciones(archivo, nombre=None):
+    """Despacha según la extensión: .xlsx, .parquet o .arrow/.feather.
+
+    Un archivo dañado o de otro formato da `ErrorIngesta`.
+    """
+    nombre = (nombre or getattr(archivo, "name", None) or str(archivo)).lower()
+    with errores_lectura(nombre):
+        if nombre.endswith(".parquet"):
+            return leer_soluciones_parquet(archivo)
+        if nombre.endswith((".arrow", ".feather", ".ipc")):
+            return leer_soluciones_arrow(archivo)
+        return leer_soluciones_excel(archivo)
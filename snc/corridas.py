@@ -0,0 +1,280 @@
+# Archivo: snc/corridas.py
+"""Historial persistente de valoraciones en una base SQLite local.
+
+Cada corrida guarda sus parámetros, la huella de la tabla de soluciones
+(el "portafolio"), los resultados por solución, los flujos y la captura anual
+del portafolio y, para portafolios de hasta `MAX_FILAS_MATRICES` soluciones, las
+matrices (soluciones × años) que permiten rearmar el `ResultadoPortafolio`
+completo. Con eso:
+
+- una corrida idéntica (mismo portafolio, parámetros y horizonte) se sirve
+  desde la base en vez de recalcularse (`AlmacenCorridas.obtener`);
+- consultas como la evolución del VPN de una solución en las últimas corridas
+  usan los índices por portafolio, fecha, parámetros y solución.
+
+La base usa WAL y una conexión por operación, así que la comparten las
+sesiones del servidor y los procesos de `python -m snc`.
+"""
+
+import dataclasses
+import io
+import json
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from snc.cache import huella
+from snc.motor import ResultadoPortafolio
+
+RUTA_CORRIDAS = os.environ.get("SNC_CORRIDAS_DB", "corridas_snc.sqlite")
+
+# Versión del motor y del esquema: se sube cuando cambian los resultados o las tablas, y las
+# corridas guardadas con otra versión dejan de servirse como idénticas
+VERSION_MODELO = 2
+
+# Por encima de este número de soluciones no se guardan las matrices por solución
+MAX_FILAS_MATRICES = 50_000
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY,
+    clave TEXT NOT NULL UNIQUE,
+    portafolio TEXT NOT NULL,
+    parametros TEXT NOT NULL,
+    parametros_json TEXT NOT NULL,
+    n_anios INTEGER NOT NULL,
+    horizonte INTEGER NOT NULL,
+    fecha TEXT NOT NULL,
+    origen TEXT,
+    n_soluciones INTEGER NOT NULL,
+    carbono_total REAL,
+    vpn REAL
+);
+CREATE INDEX IF NOT EXISTS corridas_portafolio ON corridas (portafolio, fecha);
+CREATE INDEX IF NOT EXISTS corridas_parametros ON corridas (parametros, fecha);
+CREATE INDEX IF NOT EXISTS corridas_fecha ON corridas (fecha);
+
+CREATE TABLE IF NOT EXISTS resultados (
+    corrida INTEGER NOT NULL REFERENCES corridas (id) ON DELETE CASCADE,
+    fila INTEGER NOT NULL,
+    solucion TEXT,
+    inicio INTEGER,
+    area REAL,
+    carbono_total REAL,
+    costo_total REAL,
+    capex REAL,
+    ingreso_total REAL,
+    vpn REAL,
+    PRIMARY KEY (corrida, fila)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resultados_solucion ON resultados (solucion, corrida);
+
+CREATE TABLE IF NOT EXISTS anual (
+    corrida INTEGER NOT NULL REFERENCES corridas (id) ON DELETE CASCADE,
+    anio INTEGER NOT NULL,
+    flujo REAL,
+    captura REAL,
+    PRIMARY KEY (corrida, anio)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS matrices (
+    corrida INTEGER PRIMARY KEY REFERENCES corridas (id) ON DELETE CASCADE,
+    captura BLOB NOT NULL,
+    flujos BLOB NOT NULL
+);
+"""
+
+# Columnas de `resultados` → atributo de `ResultadoPortafolio`
+COLUMNAS_RESULTADOS = ("area", "carbono_total", "costo_total", "capex", "ingreso_total", "vpn")
+
+# Nombres de las columnas en las tablas que devuelven las consultas
+ETIQUETAS = {
+    "id": "Corrida",
+    "fecha": "Fecha",
+    "origen": "Origen",
+    "portafolio": "Portafolio",
+    "n_soluciones": "Soluciones",
+    "carbono_total": "Carbono Total (tCO2e)",
+    "vpn": "VPN (USD)",
+    "area": "Área (ha)",
+}
+
+
+def clave_corrida(huella_soluciones, parametros, n_anios):
+    """Identidad de una corrida: el mismo portafolio con los mismos parámetros, horizonte y versión del modelo."""
+    return huella("corrida", VERSION_MODELO, huella_soluciones, parametros, n_anios)
+
+
+def clave_resultado(nombre, huella_soluciones, *claves):
+    """Clave de un resultado intermedio en los cachés: como las corridas, cambia con la versión del modelo.
+
+    El caché en disco sobrevive a los reinicios y a los despliegues; sin la
+    versión, un motor nuevo serviría los arreglos calculados por el anterior.
+    """
+    return huella(nombre, VERSION_MODELO, huella_soluciones, *claves)
+
+
+def _a_bytes(matriz):
+    salida = io.BytesIO()
+    np.save(salida, np.ascontiguousarray(matriz), allow_pickle=False)
+    return salida.getvalue()
+
+
+def _desde_bytes(datos):
+    return np.load(io.BytesIO(datos), allow_pickle=False)
+
+
+class AlmacenCorridas:
+    """Corridas guardadas en el archivo SQLite `ruta`."""
+
+    def __init__(self, ruta=RUTA_CORRIDAS):
+        self.ruta = str(ruta)
+        with self._conexion() as conexion:
+            conexion.executescript(ESQUEMA)
+
+    @contextmanager
+    def _conexion(self):
+        with closing(sqlite3.connect(self.ruta, timeout=30)) as conexion:
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA foreign_keys=ON")
+            with conexion:  # una transacción por operación
+                yield conexion
+
+    # --- Escritura ---
+    def guardar(self, portafolio, parametros, n_anios, huella_soluciones, origen=None):
+        """Guarda la corrida si no existe; devuelve su id."""
+        clave = clave_corrida(huella_soluciones, parametros, n_anios)
+        with self._conexion() as conexion:
+            existente = conexion.execute("SELECT id FROM corridas WHERE clave = ?", (clave,)).fetchone()
+            if existente is not None:
+                return existente[0]
+            corrida = conexion.execute(
+                "INSERT INTO corridas (clave, portafolio, parametros, parametros_json, n_anios, horizonte, "
+                "fecha, origen, n_soluciones, carbono_total, vpn) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    clave, huella_soluciones, huella(parametros),
+                    json.dumps(dataclasses.asdict(parametros)), int(n_anios), int(portafolio.horizonte),
+                    datetime.now(timezone.utc).isoformat(timespec="microseconds"), origen,
+                    len(portafolio.vpn), float(portafolio.carbono_total.sum()), float(portafolio.vpn.sum()),
+                ),
+            ).lastrowid
+            n = len(portafolio.vpn)
+            conexion.executemany(
+                "INSERT INTO resultados VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                zip(
+                    [corrida] * n, range(n), map(str, portafolio.solucion), map(int, portafolio.inicio),
+                    *(np.asarray(getattr(portafolio, c), dtype=float).tolist() for c in COLUMNAS_RESULTADOS),
+                ),
+            )
+            conexion.executemany(
+                "INSERT INTO anual VALUES (?, ?, ?, ?)",
+                zip(
+                    [corrida] * portafolio.horizonte, range(1, portafolio.horizonte + 1),
+                    portafolio.flujo_total.tolist(), portafolio.captura_total.tolist(),
+                ),
+            )
+            if n <= MAX_FILAS_MATRICES:
+                conexion.execute(
+                    "INSERT INTO matrices VALUES (?, ?, ?)",
+                    (corrida, _a_bytes(portafolio.captura), _a_bytes(portafolio.flujos)),
+                )
+            return corrida
+
+    def eliminar(self, corrida):
+        with self._conexion() as conexion:
+            conexion.execute("DELETE FROM corridas WHERE id = ?", (corrida,))
+
+    # --- Corridas idénticas ---
+    def buscar(self, huella_soluciones, parametros, n_anios):
+        """Id de la corrida idéntica guardada con matrices, o None."""
+        with self._conexion() as conexion:
+            fila = conexion.execute(
+                "SELECT c.id FROM corridas c JOIN matrices m ON m.corrida = c.id WHERE c.clave = ?",
+                (clave_corrida(huella_soluciones, parametros, n_anios),),
+            ).fetchone()
+        return None if fila is None else fila[0]
+
+    def cargar(self, corrida):
+        """`ResultadoPortafolio` guardado (requiere las matrices de la corrida)."""
+        with self._conexion() as conexion:
+            horizonte, = conexion.execute("SELECT horizonte FROM corridas WHERE id = ?", (corrida,)).fetchone()
+            filas = conexion.execute(
+                f"SELECT solucion, inicio, {', '.join(COLUMNAS_RESULTADOS)} FROM resultados "
+                "WHERE corrida = ? ORDER BY fila", (corrida,),
+            ).fetchall()
+            matrices = conexion.execute(
+                "SELECT captura, flujos FROM matrices WHERE corrida = ?", (corrida,)
+            ).fetchone()
+        if matrices is None:
+            raise KeyError(f"La corrida {corrida} no guardó sus matrices por solución")
+        columnas = list(zip(*filas)) if filas else [()] * (2 + len(COLUMNAS_RESULTADOS))
+        valores = {c: np.array(v, dtype=float) for c, v in zip(COLUMNAS_RESULTADOS, columnas[2:])}
+        return ResultadoPortafolio(
+            captura=_desde_bytes(matrices[0]),
+            flujos=_desde_bytes(matrices[1]),
+            solucion=np.array(columnas[0], dtype=object),
+            inicio=np.array(columnas[1], dtype=np.int64),
+            horizonte=horizonte,
+            **valores,
+        )
+
+    def obtener(self, huella_soluciones, parametros, n_anios, calcular, origen=None):
+        """Resultado de la corrida idéntica guardada o, si no existe, `calcular()` y guardarlo."""
+        corrida = self.buscar(huella_soluciones, parametros, n_anios)
+        if corrida is not None:
+            return self.cargar(corrida)
+        portafolio = calcular()
+        self.guardar(portafolio, parametros, n_anios, huella_soluciones, origen)
+        return portafolio
+
+    # --- Consultas ---
+    def _consulta(self, sql, parametros=()):
+        with self._conexion() as conexion:
+            tabla = pd.read_sql_query(sql, conexion, params=parametros)
+        return tabla.rename(columns=ETIQUETAS)
+
+    def corridas(self, portafolio=None, parametros=None, desde=None, hasta=None, limite=200):
+        """Últimas corridas (más reciente primero), filtradas por portafolio, parámetros y fechas ISO."""
+        condiciones, valores = [], []
+        for sql, valor in (
+            ("portafolio = ?", portafolio),
+            ("parametros = ?", None if parametros is None else huella(parametros)),
+            ("fecha >= ?", desde),
+            ("fecha < ?", hasta),
+        ):
+            if valor is not None:
+                condiciones.append(sql)
+                valores.append(valor)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        return self._consulta(
+            "SELECT id, fecha, origen, portafolio, n_soluciones, carbono_total, vpn, parametros_json "
+            f"FROM corridas {donde} ORDER BY fecha DESC LIMIT ?", (*valores, limite),
+        )
+
+    def evolucion(self, solucion, limite=200):
+        """Área, carbono y VPN de una solución (sumados por corrida) en sus últimas `limite` corridas."""
+        return self._consulta(
+            "SELECT c.id, c.fecha, SUM(r.area) AS area, SUM(r.carbono_total) AS carbono_total, SUM(r.vpn) AS vpn "
+            "FROM resultados r JOIN corridas c ON c.id = r.corrida "
+            # Los ids crecen con la fecha: el índice (solucion, corrida) se recorre hacia atrás y corta en `limite`
+            "WHERE r.solucion = ? GROUP BY r.corrida ORDER BY r.corrida DESC LIMIT ?",
+            (solucion, limite),
+        )
+
+    def anual(self, corrida):
+        """Flujo y captura del portafolio por año de una corrida."""
+        return self._consulta(
+            "SELECT anio AS 'Año', flujo AS 'Flujo (USD)', captura AS 'Captura (tCO2e)' "
+            "FROM anual WHERE corrida = ? ORDER BY anio", (corrida,),
+        )
+
+
+@lru_cache(maxsize=None)
+def almacen_corridas(ruta=RUTA_CORRIDAS):
+    """Almacén compartido por el proceso para `ruta` (el esquema se crea una sola vez)."""
+    return AlmacenCorridas(ruta)
@@ -0,0 +1,113 @@
+# Archivo: snc/curvas.py
+"""Biblioteca de curvas de captura por hectárea.
+
+Cada curva distinta (tipo, parámetros, duración, horizonte) se evalúa una sola
+vez y se guarda como arreglo de solo lectura compartido entre el cálculo de
+resultados, la captura acumulada y cualquier otro consumidor. Las filas de un
+portafolio se resuelven agrupándolas por clave y tomando la curva de su grupo.
+
+Los tipos nuevos se registran con `registrar_curva`:
+
+    @registrar_curva("mi_curva", ("captura_maxima", "velocidad"))
+    def _mi_curva(anios, duracion, captura_maxima, velocidad):
+        ...
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+# tipo -> (función, claves de parámetros en `columnas`)
+TIPOS_CURVA = {}
+
+
+def registrar_curva(tipo, parametros):
+    """Registra una curva `f(anios, duracion, *parametros) -> captura por ha`."""
+    def decorador(funcion):
+        TIPOS_CURVA[tipo] = (funcion, tuple(parametros))
+        return funcion
+    return decorador
+
+
+@registrar_curva("constante", ("captura",))
+def _constante(anios, duracion, captura):
+    return np.full(len(anios), captura)
+
+
+@registrar_curva("lineal", ("captura_inicial", "captura_final"))
+def _lineal(anios, duracion, captura_inicial, captura_final):
+    # Equivale a np.linspace(captura_inicial, captura_final, duracion)
+    paso = (captura_final - captura_inicial) / max(duracion - 1, 1)
+    return captura_inicial + paso * anios
+
+
+@registrar_curva("sigmoidal", ("captura_maxima", "velocidad", "punto_medio"))
+def _sigmoidal(anios, duracion, captura_maxima, velocidad, punto_medio):
+    return captura_maxima / (1 + np.exp(-velocidad * (anios - punto_medio)))
+
+
+@registrar_curva("chapman_richards", ("captura_maxima", "velocidad", "forma"))
+def _chapman_richards(anios, duracion, captura_maxima, velocidad, forma):
+    return captura_maxima * (1 - np.exp(-velocidad * (anios + 1))) ** forma
+
+
+@lru_cache(maxsize=4096)
+def curva_ha(tipo, parametros, duracion, n_anios):
+    """Curva de captura por ha (largo `n_anios`, cero desde `duracion`), solo lectura."""
+    funcion, _ = TIPOS_CURVA.get(tipo, TIPOS_CURVA["constante"])
+    anios = np.arange(n_anios, dtype=float)
+    curva = np.asarray(funcion(anios, duracion, *parametros), dtype=float).copy()
+    curva[max(duracion, 0):] = 0.0
+    curva.setflags(write=False)
+    return curva
+
+
+def claves_curva(columnas):
+    """Tipo efectivo y parámetros relevantes de cada fila (degradación incluida)."""
+    tipo = np.where(
+        np.isin(columnas["tipo_captura"], list(TIPOS_CURVA)),
+        columnas["tipo_captura"], "constante",
+    ).astype(object)
+    todas = dict.fromkeys(clave for _, claves in TIPOS_CURVA.values() for clave in claves)
+    parametros = {clave: np.zeros(len(tipo)) for clave in todas}
+    for nombre, (_, claves) in TIPOS_CURVA.items():
+        es_tipo = tipo == nombre
+        for clave in claves:
+            if clave in columnas:
+                parametros[clave][es_tipo] = columnas[clave][es_tipo]
+
+    # Degradación evitada: captura constante por el % de pérdida evitada
+    degradacion = (tipo == "constante") & (columnas["tipo_snc"] == "degradacion")
+    parametros["captura"] = np.where(
+        degradacion, parametros["captura"] * columnas["perdida_evitada"] / 100, parametros["captura"]
+    )
+    return tipo, parametros
+
+
+def curvas_por_fila(columnas, n_anios):
+    """Curvas distintas (K × n_anios) y el índice de curva de cada fila (n,)."""
+    import pandas as pd  # pd.factorize agrupa por hash; se carga al primer cálculo
+
+    tipo, parametros = claves_curva(columnas)
+    claves = {"tipo": tipo, "duracion": columnas["duracion"], **parametros}
+
+    # Código combinado de los códigos de cada columna: todo por hash, sin ordenar.
+    # Se re-factoriza en cada paso para que el código nunca supere el número de filas.
+    codigos = np.zeros(len(tipo), dtype=np.int64)
+    for valores in claves.values():
+        codigos_columna, unicos = pd.factorize(valores)
+        codigos, combinados = pd.factorize(codigos * max(len(unicos), 1) + codigos_columna)
+    primera_fila = np.zeros(len(combinados), dtype=np.int64)
+    primera_fila[codigos[::-1]] = np.arange(len(codigos))[::-1]
+
+    curvas = np.empty((len(primera_fila), n_anios))
+    for k, fila in enumerate(primera_fila):
+        tipo_k = tipo[fila]
+        _, claves_tipo = TIPOS_CURVA[tipo_k]
+        curvas[k] = curva_ha(
+            tipo_k,
+            tuple(float(parametros[c][fila]) for c in claves_tipo),
+            int(columnas["duracion"][fila]),
+            n_anios,
+        )
+    return curvas, codigos
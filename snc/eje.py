@@ -0,0 +1,84 @@
+# Archivo: snc/eje.py
+"""Eje temporal del portafolio: año de inicio por solución y horizonte variable.
+
+Cada solución guarda su captura y su flujo en una ventana local (la columna 0
+es su año de inicio). El portafolio vive en un eje compartido de `horizonte`
+años, el del proyecto que termina más tarde. Las matrices locales no se
+desplazan a una forma densa (soluciones × horizonte): los totales y las sumas
+ponderadas (precio, descuento) se calculan agrupando las filas por año de
+inicio, que toma pocos valores distintos, con un producto por grupo.
+"""
+
+import numpy as np
+
+
+def horizonte(inicio, duracion, n_anios):
+    """Años del eje del portafolio: al menos `n_anios`, y hasta el fin del último proyecto."""
+    if len(duracion) == 0:
+        return n_anios
+    return max(n_anios, int((np.asarray(inicio) + np.asarray(duracion)).max()))
+
+
+def grupos_inicio(inicio):
+    """Pares (año de inicio, filas) por año de inicio distinto."""
+    inicio = np.asarray(inicio)
+    if len(inicio) == 0 or not inicio.any():
+        return [(0, slice(None))]
+    valores, grupo = np.unique(inicio, return_inverse=True)
+    orden = np.argsort(grupo, kind="stable")
+    limites = np.searchsorted(grupo[orden], np.arange(len(valores) + 1))
+    return [(int(s), orden[a:b]) for s, a, b in zip(valores, limites[:-1], limites[1:])]
+
+
+def _extender(vector, largo):
+    # Los años fuera del vector solo multiplican flujos nulos (más allá del horizonte)
+    vector = np.asarray(vector, dtype=float)
+    if vector.shape[-1] >= largo:
+        return vector
+    return np.pad(vector, [(0, 0)] * (vector.ndim - 1) + [(0, largo - vector.shape[-1])])
+
+
+def ponderar(matriz, inicio, vector):
+    """Σ_t matriz[i, t] · vector[inicio_i + t] por fila (p. ej. VPN con factores de descuento del eje).
+
+    Con `vector` de forma (K × años), K trayectorias de precio o de descuento,
+    devuelve (K × filas): todas las trayectorias en un producto por grupo.
+    """
+    matriz = np.atleast_2d(matriz)
+    vector = np.asarray(vector, dtype=float)
+    ancho = matriz.shape[1]
+    if vector.ndim == 2:
+        resultado = np.zeros((vector.shape[0], matriz.shape[0]))
+        for s, filas in grupos_inicio(inicio):
+            resultado[:, filas] = _extender(vector, s + ancho)[:, s:s + ancho] @ matriz[filas].T
+        return resultado
+    resultado = np.zeros(matriz.shape[0])
+    for s, filas in grupos_inicio(inicio):
+        resultado[filas] = matriz[filas] @ _extender(vector, s + ancho)[s:s + ancho]
+    return resultado
+
+
+def total(matriz, inicio, largo):
+    """Suma de las filas en el eje compartido (largo `largo`), cada una desde su inicio."""
+    matriz = np.atleast_2d(matriz)
+    ancho = matriz.shape[1]
+    resultado = np.zeros(max(largo, 0))
+    for s, filas in grupos_inicio(inicio):
+        if s >= largo:
+            continue
+        tramo = min(ancho, largo - s)
+        resultado[s:s + tramo] += matriz[filas, :tramo].sum(axis=0)
+    return resultado
+
+
+def densa(matriz, inicio, largo):
+    """Matriz (soluciones × `largo`) en el eje compartido; solo para gráficos y exportaciones."""
+    matriz = np.atleast_2d(matriz)
+    ancho = matriz.shape[1]
+    resultado = np.zeros((matriz.shape[0], largo))
+    for s, filas in grupos_inicio(inicio):
+        if s >= largo:
+            continue
+        tramo = min(ancho, largo - s)
+        resultado[filas, s:s + tramo] = matriz[filas, :tramo]
+    return resultado
@@ -0,0 +1,242 @@
+# Archivo: snc/escenarios.py
+"""Conjuntos de escenarios evaluados en lote.
+
+Un escenario es una combinación cualquiera de precio del carbono, crecimiento
+del precio, tasa de descuento, multiplicador de área y crecimiento del ingreso
+encadenado (los campos de `Parametros`), con su curva anual de precios y su
+estructura de tasas si las tiene. Para N escenarios y n soluciones el VPN se
+obtiene como un tensor (N × n) sin repetir el motor por escenario:
+
+- la captura por solución se calcula una vez (con multiplicador de área 1);
+- los precios y los factores de descuento de los N escenarios son dos matrices
+  (N × años) en el eje del portafolio, compartidas por todas las soluciones;
+- el ingreso de carbono es `área · (precios @ captura)`, un producto matricial
+  (N × años) @ (años × n) por año de inicio distinto (`snc.eje.ponderar`);
+- el flujo medio se multiplica por la suma de los factores de descuento de los
+  años inicio+1 .. inicio+dur-1, tomada de la suma acumulada de la matriz de
+  descuento.
+"""
+
+from dataclasses import dataclass, fields, replace
+
+import numpy as np
+
+from snc import eje
+from snc.motor import (
+    CAMPOS_TRAYECTORIA,
+    N_ANIOS_DEFAULT,
+    matriz_captura_ha,
+    preparar_soluciones,
+    vector_descuento,
+    vector_precios,
+)
+
+# Columnas de la tabla de escenarios: (campo de `Parametros`, escala a fracción)
+COLUMNAS_ESCENARIO = {
+    "Precio Carbono (USD/t)": ("precio_carbono", 1.0),
+    "Crecimiento Precio (%)": ("crecimiento_precio_carbono", 0.01),
+    "Tasa Descuento (%)": ("tasa_descuento", 0.01),
+    "Multiplicador Área": ("multiplicador_area", 1.0),
+    "Crecimiento Encadenado (%)": ("crecimiento_ingreso_encadenado", 0.01),
+}
+
+# Columnas con el nombre de una curva cargada: (campo de `Parametros`)
+COLUMNAS_CURVA = {
+    "Curva de Precio": "curva_precio",
+    "Estructura de Tasas": "curva_descuento",
+}
+
+
+@dataclass
+class ResultadoEscenarios:
+    """Tensores (escenarios × soluciones) de un conjunto de escenarios."""
+
+    nombres: list
+    soluciones: np.ndarray
+    carbono_total: np.ndarray
+    ingreso_total: np.ndarray
+    vpn: np.ndarray
+
+    @property
+    def vpn_portafolio(self):
+        import pandas as pd
+
+        return pd.Series(self.vpn.sum(axis=1), index=pd.Index(self.nombres, name="Escenario"), name="VPN (USD)")
+
+    def formato_largo(self):
+        """Tabla larga Escenario / Solución / VPN, para graficar."""
+        import pandas as pd
+
+        n_escenarios, n_soluciones = self.vpn.shape
+        return pd.DataFrame({
+            "Escenario": np.repeat(np.asarray(self.nombres, dtype=object), n_soluciones),
+            "Solución": np.tile(self.soluciones, n_escenarios),
+            "Carbono Total (tCO2e)": self.carbono_total.ravel(),
+            "Ingreso Total (USD)": self.ingreso_total.ravel(),
+            "VPN": self.vpn.ravel(),
+        })
+
+
+def tabla_escenarios(escenarios, nombres=None):
+    """Tabla editable (una fila por escenario) a partir de una lista de `Parametros`."""
+    import pandas as pd
+
+    tabla = pd.DataFrame({
+        columna: [getattr(p, campo) / escala for p in escenarios]
+        for columna, (campo, escala) in COLUMNAS_ESCENARIO.items()
+    })
+    # Con curva de precios, la columna de precio es el primer año de la curva
+    tabla["Precio Carbono (USD/t)"] = [
+        p.curva_precio[0] if p.curva_precio else p.precio_carbono for p in escenarios
+    ]
+    tabla.insert(0, "Escenario", nombres if nombres is not None else [f"Escenario {i + 1}" for i in range(len(tabla))])
+    return tabla
+
+
+def tabla_curvas(base, curvas_precio=None, curvas_descuento=None):
+    """Tabla editable con un escenario por combinación de curva de precio y estructura de tasas.
+
+    Los valores escalares son los de `base`; sin curvas de un tipo, ese tipo
+    queda en blanco (el de `base`). En las filas con curva de precio la columna
+    de precio queda en blanco: la curva se usa tal como se cargó.
+    """
+    nombres_precio = list(curvas_precio or {}) or [None]
+    nombres_descuento = list(curvas_descuento or {}) or [None]
+    combinaciones = [(p, d) for p in nombres_precio for d in nombres_descuento]
+    tabla = tabla_escenarios(
+        [base] * len(combinaciones),
+        [" / ".join(nombre for nombre in par if nombre is not None) or "Base" for par in combinaciones],
+    )
+    tabla["Curva de Precio"] = [p for p, _ in combinaciones]
+    tabla.loc[tabla["Curva de Precio"].notna(), "Precio Carbono (USD/t)"] = np.nan
+    tabla["Estructura de Tasas"] = [d for _, d in combinaciones]
+    return tabla
+
+
+def curvas_desde_tabla(tabla, escala=1.0, precios=False):
+    """Curvas anuales de una tabla ancha: `{columna: tupla}` por columna numérica.
+
+    La columna "Año", si existe, ordena las filas y no es una curva. Los
+    valores vacíos al final de una columna la acortan (curvas de distinto largo).
+    Con `precios=True` cada curva debe empezar con un valor positivo, como pide
+    `Parametros.curva_precio` (el primer año es la base a la que se escala).
+    """
+    import pandas as pd
+
+    if "Año" in tabla:
+        tabla = tabla.sort_values("Año").drop(columns="Año")
+    curvas = {}
+    for columna in tabla.columns:
+        valores = pd.to_numeric(tabla[columna], errors="coerce").to_numpy(dtype=float)
+        validos = np.flatnonzero(~np.isnan(valores))
+        if len(validos) == 0:
+            continue
+        valores = valores[:validos[-1] + 1]
+        if np.isnan(valores).any():
+            raise ValueError(f"La curva '{columna}' tiene años vacíos")
+        if precios and valores[0] <= 0:
+            raise ValueError(f"La curva '{columna}' debe empezar con un precio positivo")
+        curvas[str(columna)] = tuple((valores * escala).tolist())
+    return curvas
+
+
+def escenarios_desde_tabla(tabla, base, curvas=None):
+    """Lista de `(nombre, Parametros)`; las columnas ausentes o vacías toman el valor de `base`.
+
+    `curvas` es `{campo: {nombre: curva}}` para las columnas de `COLUMNAS_CURVA`.
+    Si el escenario tiene curva de precios (la de `base` o una cargada), el
+    "Precio Carbono" de la fila es el del primer año y la curva se escala a ese
+    nivel, como en la grilla de sensibilidad.
+    """
+    import pandas as pd
+
+    curvas = curvas or {}
+    escenarios = []
+    for i, fila in enumerate(tabla.to_dict("records")):
+        cambios = {
+            campo: float(fila[columna]) * escala
+            for columna, (campo, escala) in COLUMNAS_ESCENARIO.items()
+            if columna in fila and pd.notna(fila[columna])
+        }
+        for columna, campo in COLUMNAS_CURVA.items():
+            nombre = fila.get(columna)
+            if nombre is None or pd.isna(nombre) or str(nombre) == "":
+                continue
+            if str(nombre) not in curvas.get(campo, {}):
+                raise ValueError(f"{columna}: la curva '{nombre}' no está cargada")
+            cambios[campo] = curvas[campo][str(nombre)]
+        nombre = fila.get("Escenario")
+        nombre = str(nombre) if pd.notna(nombre) else f"Escenario {i + 1}"
+        precio = cambios.pop("precio_carbono", None)
+        parametros = replace(base, **cambios)
+        if precio is not None:
+            if parametros.curva_precio and precio > 0:
+                escala = precio / parametros.curva_precio[0]
+                parametros = replace(parametros, curva_precio=[v * escala for v in parametros.curva_precio])
+            elif parametros.curva_precio and precio < 0:
+                raise ValueError(f"{nombre}: con curva de precios el precio del primer año debe ser positivo")
+            else:
+                # Con precio cero la curva escalada es cero todos los años: equivale a no tener curva
+                parametros = replace(parametros, precio_carbono=precio, curva_precio=())
+        escenarios.append((nombre, parametros))
+    return escenarios
+
+
+def _arreglo(escenarios, campo):
+    return np.array([getattr(p, campo) for p in escenarios], dtype=float)
+
+
+def evaluar_escenarios(df_soluciones, escenarios, n_anios=N_ANIOS_DEFAULT, columnas=None, nombres=None):
+    """Carbono, ingreso y VPN (escenarios × soluciones) para una lista de `Parametros`.
+
+    Equivale a `calcular_portafolio` con cada escenario, fila por fila del tensor.
+    """
+    if columnas is None:
+        columnas = preparar_soluciones(df_soluciones)
+    if nombres is None:
+        nombres = [f"Escenario {i + 1}" for i in range(len(escenarios))]
+    p = {
+        campo.name: _arreglo(escenarios, campo.name)[:, None]
+        for campo in fields(escenarios[0]) if campo.name not in CAMPOS_TRAYECTORIA
+    } if escenarios else {}
+
+    duracion = columnas["duracion"]
+    inicio = columnas["inicio"]
+    n = len(duracion)
+    if not escenarios or n == 0:
+        vacio = np.zeros((len(escenarios), n))
+        return ResultadoEscenarios(list(nombres), columnas["solucion"], vacio, vacio.copy(), vacio.copy())
+    n_anios_captura = max(n_anios, int(duracion.max()))
+    anios = np.arange(n_anios_captura)
+    largo = int(inicio.max()) + n_anios_captura
+
+    # Captura con multiplicador de área 1: el multiplicador de cada escenario escala el resultado
+    area_base = columnas["area"] * (1 - columnas["salvaguardas"] / 100)
+    captura = matriz_captura_ha(columnas, n_anios_captura) * area_base[:, None]
+    multiplicador_area = p["multiplicador_area"]
+    carbono_total = multiplicador_area * captura.sum(axis=1)[None, :]
+
+    # Ingreso de carbono: los precios de todos los escenarios en un producto por año de inicio
+    precios = np.array([vector_precios(parametros, largo) for parametros in escenarios])
+    ingreso_carbono = multiplicador_area * eje.ponderar(captura, inicio, precios)
+
+    crecimiento_acumulado = np.cumsum((1 + p["crecimiento_ingreso_encadenado"]) ** anios[None, :], axis=1)
+    ingreso_encadenado = columnas["ingreso_encadenado"][None, :] * np.where(
+        duracion > 0, crecimiento_acumulado[:, np.clip(duracion - 1, 0, None)], 0.0
+    )
+    ingreso_total = ingreso_carbono + ingreso_encadenado
+    costo_total = multiplicador_area * (columnas["costo"] * columnas["area"] * duracion)[None, :]
+
+    flujo_medio = np.divide(
+        ingreso_total - costo_total, duracion[None, :],
+        out=np.zeros_like(ingreso_total), where=duracion[None, :] > 0,
+    )
+
+    # Σ descuento de los años inicio+1 .. inicio+dur-1 por escenario y solución, en el eje del portafolio
+    descuento = np.array([vector_descuento(parametros, largo) for parametros in escenarios])
+    descuento_acumulado = np.cumsum(descuento, axis=1)
+    ultimo = inicio + np.clip(duracion - 1, 0, None)
+    descuento_operacion = descuento_acumulado[:, ultimo] - descuento_acumulado[:, inicio]
+    vpn = flujo_medio * descuento_operacion - columnas["capex"][None, :] * descuento[:, inicio]
+
+    return ResultadoEscenarios(list(nombres), columnas["solucion"], carbono_total, ingreso_total, vpn)
@@ -0,0 +1,85 @@
+# Archivo: snc/figuras.py
+"""Datos reducidos para los gráficos: el tamaño de la figura no crece con el portafolio.
+
+Por encima de `max_categorias` filas, cada gráfico agrega las soluciones por
+tipo (columna "Solución") y, si aun así hay más tipos que `max_categorias`,
+conserva los de mayor peso y junta el resto en "Otros". Los gráficos de
+dispersión toman una muestra fija de a lo sumo `MAX_PUNTOS` puntos. Así el
+JSON que viaja al navegador queda acotado por (categorías × años) y no por el
+número de soluciones.
+"""
+
+import numpy as np
+import pandas as pd
+
+from snc import eje
+
+MAX_CATEGORIAS = 12   # series / barras visibles por gráfico
+MAX_PUNTOS = 1_000    # puntos de los gráficos de dispersión
+OTROS = "Otros"
+COLUMNA_CATEGORIA = "Categoría"
+
+
+def categorias_principales(nombres, pesos, max_categorias=MAX_CATEGORIAS):
+    """Etiqueta por fila: su nombre si está entre los `max_categorias` de mayor peso, si no "Otros"."""
+    codigos, unicos = pd.factorize(np.asarray(nombres, dtype=object))
+    unicos = np.asarray(unicos, dtype=object)
+    if len(unicos) <= max_categorias:
+        return unicos[codigos]
+    peso = np.bincount(codigos, weights=np.abs(np.asarray(pesos, dtype=float)), minlength=len(unicos))
+    principales = np.zeros(len(unicos), dtype=bool)
+    principales[np.argsort(-peso, kind="stable")[:max_categorias - 1]] = True
+    return np.where(principales[codigos], unicos[codigos], OTROS)
+
+
+def agregar_tabla(df, valores, orden_por, columna="Solución", por=(), max_categorias=MAX_CATEGORIAS):
+    """Suma `valores` por tipo de solución (y por las columnas `por`) si hay más de `max_categorias` filas.
+
+    Las categorías quedan ordenadas por `orden_por` descendente, con "Otros" al final.
+    """
+    por = list(por)
+    n_grupos = df[por].drop_duplicates().shape[0] if por else 1
+    if len(df) <= max_categorias * n_grupos:
+        return df
+    etiquetas = categorias_principales(df[columna], df[orden_por], max_categorias)
+    agregada = (
+        df[por + valores].assign(**{columna: etiquetas})
+        .groupby(por + [columna], sort=False, observed=True)[valores].sum()
+        .reset_index()
+    )
+    total = agregada.groupby(columna)[orden_por].transform("sum")
+    clave = np.where(agregada[columna] == OTROS, -np.inf, total)
+    return agregada.iloc[np.lexsort((-clave,))].reset_index(drop=True)
+
+
+def agregar_matriz(matriz, nombres, max_categorias=MAX_CATEGORIAS, inicio=None, largo=None):
+    """Filas (soluciones × años) sumadas por tipo / "Otros"; devuelve (matriz, nombres).
+
+    Con `inicio` y `largo` las filas son ventanas locales (ver `snc.eje`) y el
+    resultado queda en el eje del portafolio.
+    """
+    matriz = np.asarray(matriz)
+    en_eje = inicio is not None
+    if matriz.shape[0] <= max_categorias:
+        return (eje.densa(matriz, inicio, largo) if en_eje else matriz), np.asarray(nombres, dtype=object)
+    etiquetas = categorias_principales(nombres, np.abs(matriz).sum(axis=1), max_categorias)
+    codigos, unicos = pd.factorize(etiquetas)
+    if en_eje:
+        inicio = np.asarray(inicio)
+        agregada = np.array([eje.total(matriz[codigos == k], inicio[codigos == k], largo) for k in range(len(unicos))])
+    else:
+        agregada = np.zeros((len(unicos), matriz.shape[1]))
+        np.add.at(agregada, codigos, matriz)
+    return agregada, np.asarray(unicos, dtype=object)
+
+
+def muestra_dispersion(df, peso, columna="Solución", max_puntos=MAX_PUNTOS,
+                       max_categorias=MAX_CATEGORIAS, semilla=0):
+    """A lo sumo `max_puntos` filas (muestra reproducible) y columna "Categoría" para el color.
+
+    La categoría es el tipo de solución, limitada a `max_categorias` colores.
+    """
+    if len(df) > max_puntos:
+        filas = np.sort(np.random.default_rng(semilla).choice(len(df), max_puntos, replace=False))
+        df = df.iloc[filas]
+    return df.assign(**{COLUMNA_CATEGORIA: categorias_principales(df[columna], df[peso], max_categorias)})
@@ -0,0 +1,212 @@
+# Archivo: snc/incremental.py
+"""Portafolio con recálculo incremental para la modelación interactiva.
+
+Las entradas viven en una `TablaSoluciones` (ver `snc.almacen`) que el motor
+lee como vistas sin copia; lo memorizado se copia de esas vistas. Guarda los resultados de cada solución (fila de
+resultados, captura anual, flujo de caja y su descomposición fija / por USD de
+precio) y los agregados del portafolio. Agregar, editar o eliminar una
+solución solo evalúa esa solución y ajusta los agregados por diferencia; los
+escenarios de precio y la superficie de sensibilidad se derivan de los
+agregados sin volver a recorrer las filas.
+Solo un cambio de parámetros obliga a recalcular todo (en una pasada vectorizada).
+"""
+
+import numpy as np
+
+from snc import eje
+from snc.almacen import TablaSoluciones
+from snc.motor import (
+    N_ANIOS_DEFAULT,
+    Parametros,
+    ResultadoPortafolio,
+    calcular_portafolio,
+    vector_descuento,
+)
+from snc.sensibilidad import equilibrio_desde_flujos, flujos_por_precio, superficie_desde_flujos
+
+# Columnas de la tabla de resultados y su clave interna (atributo de `ResultadoPortafolio`)
+COLUMNAS_RESULTADOS = {
+    "Área (ha)": "area",
+    "Carbono Total (tCO2e)": "carbono_total",
+    "Costo Total (USD)": "costo_total",
+    "CAPEX Total (USD)": "capex",
+    "Ingreso Total (USD)": "ingreso_total",
+    "VPN (USD)": "vpn",
+}
+
+# Matriz local por solución -> atributo con su total en el eje del portafolio
+TOTALES = {
+    "flujos": "flujo_total",
+    "flujo_fijo": "flujo_fijo_total",
+    "flujo_unitario": "flujo_unitario_total",
+    "captura": "captura_total",
+}
+
+
+def _ajustar_ancho(matriz, ancho):
+    if matriz.shape[1] >= ancho:
+        return matriz
+    return np.pad(matriz, ((0, 0), (0, ancho - matriz.shape[1])))
+
+
+class PortafolioIncremental:
+    """Resultados por solución memorizados y agregados del portafolio."""
+
+    def __init__(self, parametros=None, n_anios=N_ANIOS_DEFAULT, soluciones=None):
+        self.parametros = parametros or Parametros()
+        self.n_anios = n_anios
+        self.soluciones = TablaSoluciones() if soluciones is None else soluciones
+        self.evaluaciones = 0   # soluciones evaluadas por el motor (diagnóstico)
+        self._reconstruir()
+
+    # --- Cálculo por lote de soluciones ---
+    def _calcular(self, columnas):
+        n = len(columnas["solucion"])
+        self.evaluaciones += n
+        if n == 0:
+            vacio = np.zeros((0, self.n_anios))
+            datos = {clave: np.zeros(0) for clave in COLUMNAS_RESULTADOS.values()}
+            datos.update(
+                solucion=np.zeros(0, dtype=object), inicio=np.zeros(0, dtype=np.int64),
+                duracion=np.zeros(0, dtype=np.int64), captura=vacio, flujos=vacio,
+                flujo_fijo=vacio, flujo_unitario=vacio, vpn_fijo=np.zeros(0), vpn_unitario=np.zeros(0),
+            )
+            return datos
+
+        portafolio = calcular_portafolio(None, self.parametros, self.n_anios, columnas)
+        fijo, unitario = flujos_por_precio(None, self.parametros, self.n_anios, columnas)
+        descuento = vector_descuento(self.parametros, portafolio.horizonte)
+
+        # `np.array` copia: `capex` es una vista de la tabla de entrada
+        datos = {clave: np.array(getattr(portafolio, clave), dtype=float) for clave in COLUMNAS_RESULTADOS.values()}
+        datos.update(
+            # Copias: las columnas son vistas de la tabla de entrada
+            solucion=columnas["solucion"].copy(),
+            inicio=columnas["inicio"].copy(),
+            duracion=columnas["duracion"].copy(),
+            captura=portafolio.captura,
+            flujos=portafolio.flujos,
+            flujo_fijo=fijo,
+            flujo_unitario=unitario,
+            vpn_fijo=eje.ponderar(fijo, columnas["inicio"], descuento),
+            vpn_unitario=eje.ponderar(unitario, columnas["inicio"], descuento),
+        )
+        return datos
+
+    def _horizonte(self, datos=None):
+        datos = self._datos if datos is None else datos
+        return eje.horizonte(datos["inicio"], datos["duracion"], self.n_anios)
+
+    def _totales(self):
+        largo = self._horizonte()
+        for clave, atributo in TOTALES.items():
+            setattr(self, atributo, eje.total(self._datos[clave], self._datos["inicio"], largo))
+
+    def _sumar_totales(self, datos, signo):
+        # Los totales solo crecen: quitar el proyecto más largo deja ceros al final
+        largo = self._horizonte(datos)
+        for clave, atributo in TOTALES.items():
+            delta = eje.total(datos[clave], datos["inicio"], largo)
+            actual = getattr(self, atributo)
+            ancho = max(len(actual), len(delta))
+            setattr(self, atributo, np.pad(actual, (0, ancho - len(actual))) + signo * np.pad(delta, (0, ancho - len(delta))))
+
+    def _reconstruir(self):
+        self._datos = self._calcular(self.soluciones.columnas())
+        self._totales()
+        self._resultado = None
+
+    # --- Mutaciones ---
+    def actualizar_parametros(self, parametros, n_anios=None):
+        """Recalcula todo solo si cambiaron los parámetros o el horizonte."""
+        n_anios = self.n_anios if n_anios is None else n_anios
+        if parametros != self.parametros or n_anios != self.n_anios:
+            self.parametros = parametros
+            self.n_anios = n_anios
+            self._reconstruir()
+
+    def sincronizar(self, soluciones):
+        """Adopta otra tabla (o una modificada por fuera) y reconstruye los resultados."""
+        if soluciones is not self.soluciones or len(soluciones) != len(self._datos["vpn"]):
+            self.soluciones = soluciones
+            self._reconstruir()
+
+    def agregar(self, solucion):
+        """Agrega una solución (diccionario con las columnas de la tabla) a la tabla y a los agregados."""
+        indice = self.soluciones.agregar(solucion)
+        nueva = self._calcular(self.soluciones.fila(indice))
+        for clave, valores in nueva.items():
+            actuales = self._datos[clave]
+            if valores.ndim == 2:
+                ancho = max(actuales.shape[1], valores.shape[1])
+                actuales, valores = _ajustar_ancho(actuales, ancho), _ajustar_ancho(valores, ancho)
+            self._datos[clave] = np.concatenate([actuales, valores])
+        self._sumar_totales(nueva, +1)
+        self._resultado = None
+
+    def editar(self, indice, solucion):
+        anterior = {clave: valores[indice:indice + 1] for clave, valores in self._datos.items()}
+        self.soluciones.editar(indice, solucion)
+        nueva = self._calcular(self.soluciones.fila(indice))
+        self._sumar_totales(anterior, -1)
+        for clave, valores in nueva.items():
+            actuales = self._datos[clave]
+            if valores.ndim == 2:
+                ancho = max(actuales.shape[1], valores.shape[1])
+                actuales, valores = _ajustar_ancho(actuales, ancho), _ajustar_ancho(valores, ancho)
+            # Arreglos nuevos: un `resultado()` ya entregado no cambia
+            self._datos[clave] = np.concatenate([actuales[:indice], valores, actuales[indice + 1:]])
+        self._sumar_totales(nueva, +1)
+        self._resultado = None
+
+    def eliminar(self, indice):
+        """Quita la solución `indice`; como en la tabla, las siguientes suben un lugar."""
+        anterior = {clave: valores[indice:indice + 1] for clave, valores in self._datos.items()}
+        self._sumar_totales(anterior, -1)
+        self.soluciones.eliminar(indice)
+        for clave, valores in self._datos.items():
+            # `np.delete` devuelve arreglos nuevos: un `resultado()` ya entregado no cambia
+            self._datos[clave] = np.delete(valores, indice, axis=0)
+        self._resultado = None
+
+    def reiniciar(self):
+        self.soluciones.vaciar()
+        self._reconstruir()
+
+    # --- Consultas ---
+    def __len__(self):
+        return len(self.soluciones)
+
+    def resultado(self):
+        """`ResultadoPortafolio` equivalente a `calcular_portafolio` sobre todas las filas."""
+        if self._resultado is None:
+            d = self._datos
+            self._resultado = ResultadoPortafolio(
+                captura=d["captura"],
+                flujos=d["flujos"],
+                carbono_total=d["carbono_total"],
+                costo_total=d["costo_total"],
+                ingreso_total=d["ingreso_total"],
+                vpn=d["vpn"],
+                solucion=d["solucion"],
+                area=d["area"],
+                capex=d["capex"],
+                inicio=d["inicio"],
+                horizonte=self._horizonte(),
+            )
+        return self._resultado
+
+    def vpn_con_precio(self, precio_carbono):
+        """VPN por solución con otro `precio_carbono` del primer año (se aplica el multiplicador vigente)."""
+        precio = precio_carbono * self.parametros.multiplicador_precio_carbono
+        return self._datos["vpn_fijo"] + precio * self._datos["vpn_unitario"]
+
+    def flujos_por_precio(self):
+        """Flujos por solución separados en parte fija y parte por USD/tCO2e (ya memorizados)."""
+        return self._datos["flujo_fijo"], self._datos["flujo_unitario"]
+
+    def superficie_vpn(self, precios, tasas):
+        return superficie_desde_flujos(self.flujo_fijo_total, self.flujo_unitario_total, precios, tasas)
+
+    def precio_equilibrio(self, tasas):
+        return equilibrio_desde_flujos(self.flujo_fijo_total, self.flujo_unitario_total, tasas)
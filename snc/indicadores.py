@@ -0,0 +1,121 @@
+# Archivo: snc/indicadores.py
+"""TIR, precio de equilibrio y año de recuperación de todas las soluciones a la vez.
+
+La TIR se resuelve sobre la matriz de flujos (soluciones × años) con Newton
+acotado por bisección: cada iteración evalúa el VPN y su derivada de todas las
+filas con operaciones de arreglos, y las filas sin cambio de signo en el
+intervalo de búsqueda (sin raíz real) quedan en NaN.
+"""
+
+import numpy as np
+
+from snc import eje
+
+# Intervalo de búsqueda de la TIR y tolerancia de convergencia
+TIR_MINIMA = -0.9
+TIR_MAXIMA = 10.0   # extremo alto inicial; se amplía si hace falta
+TOLERANCIA_TIR = 1e-10
+MAX_ITERACIONES_TIR = 100
+# Ampliaciones del extremo alto (× 10 en 1 + r) para las filas con TIR por encima de TIR_MAXIMA
+AMPLIACIONES_TIR = 6
+
+
+def _vpn_y_derivada(flujos, tasa):
+    anios = np.arange(flujos.shape[1])
+    factor = (1.0 + tasa[:, None]) ** -anios
+    vpn = (flujos * factor).sum(axis=1)
+    derivada = -(flujos * anios * factor).sum(axis=1) / (1.0 + tasa)
+    return vpn, derivada
+
+
+def tir(flujos):
+    """Tasa interna de retorno por fila de `flujos` (soluciones × años); NaN sin raíz.
+
+    Con la convención del modelo (el año 0 también se descuenta) la raíz es la
+    misma que la de Σ flujo_t / (1 + r)^t.
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    n = flujos.shape[0]
+    bajo = np.full(n, TIR_MINIMA)
+    alto = np.full(n, TIR_MAXIMA)
+    vpn_bajo, _ = _vpn_y_derivada(flujos, bajo)
+    vpn_alto, _ = _vpn_y_derivada(flujos, alto)
+    # Filas baratas y muy rentables: la TIR supera TIR_MAXIMA y el intervalo se amplía hasta el cambio de signo
+    for _ in range(AMPLIACIONES_TIR):
+        sin_cambio = np.sign(vpn_bajo) == np.sign(vpn_alto)
+        if not sin_cambio.any():
+            break
+        alto[sin_cambio] = (1 + alto[sin_cambio]) * 10 - 1
+        vpn_alto[sin_cambio], _ = _vpn_y_derivada(flujos[sin_cambio], alto[sin_cambio])
+    con_raiz = np.sign(vpn_bajo) != np.sign(vpn_alto)
+    if not con_raiz.any():
+        return np.full(n, np.nan)
+
+    # Solo se itera sobre las filas con cambio de signo
+    flujos, bajo, alto, signo_bajo = flujos[con_raiz], bajo[con_raiz], alto[con_raiz], np.sign(vpn_bajo[con_raiz])
+    tasa = np.full(len(bajo), 0.1)
+    for _ in range(MAX_ITERACIONES_TIR):
+        vpn, derivada = _vpn_y_derivada(flujos, tasa)
+        mismo_signo = np.sign(vpn) == signo_bajo
+        bajo = np.where(mismo_signo, tasa, bajo)
+        alto = np.where(mismo_signo, alto, tasa)
+        newton = tasa - np.divide(vpn, derivada, out=np.full(len(tasa), np.inf), where=derivada != 0)
+        nueva = np.where((newton > bajo) & (newton < alto), newton, (bajo + alto) / 2)
+        convergido = np.abs(nueva - tasa) < TOLERANCIA_TIR
+        tasa = nueva
+        if convergido.all():
+            break
+
+    resultado = np.full(n, np.nan)
+    resultado[con_raiz] = tasa
+    return resultado
+
+
+def precio_equilibrio_soluciones(flujo_fijo, flujo_unitario, tasa, inicio=None, descuento=None):
+    """Precio del carbono con VPN = 0 por solución; 0 si es rentable sin ingreso de carbono.
+
+    Con `descuento` (factores del eje del portafolio, p. ej. una estructura de
+    tasas) e `inicio`, cada solución se descuenta desde su año de inicio; si no,
+    con la tasa única `tasa`. NaN cuando el VPN no aumenta con el precio (sin
+    captura dentro del horizonte).
+    """
+    if descuento is not None:
+        vpn_fijo = eje.ponderar(flujo_fijo, inicio, descuento)
+        vpn_unitario = eje.ponderar(flujo_unitario, inicio, descuento)
+    else:
+        descuento = 1.0 / (1.0 + tasa) ** np.arange(1, flujo_fijo.shape[1] + 1)
+        vpn_fijo = flujo_fijo @ descuento
+        vpn_unitario = flujo_unitario @ descuento
+    precio = np.divide(-vpn_fijo, vpn_unitario, out=np.full(len(vpn_fijo), np.nan), where=vpn_unitario > 0)
+    return np.where(np.isnan(precio), np.nan, np.maximum(precio, 0.0))
+
+
+def anio_recuperacion(flujos, inicio=None):
+    """Año del portafolio (desde 1) a partir del cual el flujo acumulado sin descontar ya no es negativo.
+
+    `flujos` son locales a cada solución (columna 0 = su año de inicio); con
+    `inicio` el año se ubica en el eje del portafolio, con la misma numeración
+    que los gráficos de flujo. NaN si nunca se recupera.
+    """
+    acumulado = np.cumsum(flujos, axis=1)
+    no_negativo = acumulado >= -1e-9 * np.maximum(np.abs(flujos).max(axis=1, initial=0.0), 1.0)[:, None]
+    # Verdadero en t si el acumulado es no negativo de t en adelante
+    se_mantiene = np.logical_and.accumulate(no_negativo[:, ::-1], axis=1)[:, ::-1]
+    recuperado = se_mantiene.any(axis=1)
+    anio = se_mantiene.argmax(axis=1) + 1
+    if inicio is not None:
+        anio = anio + np.asarray(inicio)
+    return np.where(recuperado, anio, np.nan)
+
+
+def indicadores_financieros(flujos, flujo_fijo, flujo_unitario, tasa, inicio=None, descuento=None):
+    """Tabla con TIR (%), precio de equilibrio y año de recuperación por solución."""
+    import pandas as pd
+
+    return pd.DataFrame({
+        "TIR (%)": tir(flujos) * 100,
+        "Precio de Equilibrio (USD/tCO2e)": precio_equilibrio_soluciones(
+            flujo_fijo, flujo_unitario, tasa, inicio, descuento
+        ),
+        "Año de Recuperación": anio_recuperacion(flujos, inicio),
+    })
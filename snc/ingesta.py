@@ -0,0 +1,171 @@
+# Archivo: snc/ingesta.py
+"""Lectura por bloques de libros Excel con tablas de soluciones.
+
+El libro se recorre en modo `read_only` de openpyxl, fila a fila, y cada
+bloque se convierte de inmediato a tipos compactos (float32 donde la precisión
+alcanza, categóricos para los textos repetidos). El resultado se guarda en
+caché por la huella SHA-256 del archivo, así que volver a subir el mismo libro
+no vuelve a pagar el costo de openpyxl.
+"""
+
+import hashlib
+import io
+from contextlib import contextmanager
+
+import pandas as pd
+
+from snc.cache import CacheLRU
+
+TAMANO_BLOQUE = 50_000
+
+COLUMNAS_REQUERIDAS = [
+    "Solución",
+    "Área (ha)",
+    "Costo anual por ha (USD)",
+    "CAPEX Total (USD)",
+    "Duración (años)",
+]
+
+COLUMNAS_CATEGORICAS = ["Solución", "Tipo Captura", "Tipo SNC"]
+
+# Columnas enteras opcionales: una celda vacía toma este valor (las demás enteras son obligatorias)
+ENTEROS_OPCIONALES = {"Año de Inicio": 0}
+
+# Tipos compactos: los montos en USD se mantienen en float64
+TIPOS_COLUMNAS = {
+    "Área (ha)": "float32",
+    "Costo anual por ha (USD)": "float64",
+    "CAPEX Total (USD)": "float64",
+    "Duración (años)": "int16",
+    "Año de Inicio": "int16",
+    "Salvaguardas (%)": "float32",
+    "Ingreso Encadenado (USD/año)": "float64",
+    "% Pérdida Evitada": "float32",
+    "Captura por ha (tCO2e)": "float32",
+    "Captura Inicial": "float32",
+    "Captura Final": "float32",
+    "Captura Máxima": "float32",
+    "Velocidad": "float32",
+    "Punto Medio": "float32",
+    "Forma": "float32",
+}
+
+# Libros ya leídos, por huella del archivo
+CACHE_LECTURAS = CacheLRU(8)
+
+
+class ErrorIngesta(ValueError):
+    """La tabla de soluciones no tiene las columnas o los tipos esperados."""
+
+
+def validar_encabezado(encabezado, requeridas=COLUMNAS_REQUERIDAS):
+    """Verifica nombres de columna antes de leer el cuerpo del libro."""
+    columnas = [str(c).strip() if c is not None else "" for c in encabezado]
+    faltantes = [c for c in requeridas if c not in columnas]
+    if faltantes:
+        raise ErrorIngesta(f"Faltan columnas requeridas: {', '.join(faltantes)}")
+    repetidas = sorted({c for c in columnas if c and columnas.count(c) > 1})
+    if repetidas:
+        raise ErrorIngesta(f"Columnas repetidas: {', '.join(repetidas)}")
+    return columnas
+
+
+@contextmanager
+def errores_lectura(nombre):
+    """Convierte los errores de lectura de un archivo dañado o de otro formato en `ErrorIngesta`."""
+    try:
+        yield
+    except (ErrorIngesta, ImportError, MemoryError):
+        raise
+    except Exception as error:  # openpyxl, pyarrow y sqlite3 usan excepciones propias
+        raise ErrorIngesta(f"No se pudo leer '{nombre}' ({type(error).__name__}): {error}") from error
+
+
+def compactar(df, fila_inicial=0, tipos=TIPOS_COLUMNAS, categoricas=COLUMNAS_CATEGORICAS):
+    """Convierte un bloque a tipos compactos, validando las columnas numéricas."""
+    df = df.loc[:, [c for c in df.columns if c]]
+    for columna, tipo in tipos.items():
+        if columna not in df:
+            continue
+        valores = pd.to_numeric(df[columna], errors="coerce")
+        invalidos = valores.isna() & df[columna].notna()
+        if invalidos.any():
+            fila = fila_inicial + int(invalidos.to_numpy().argmax()) + 2
+            raise ErrorIngesta(
+                f"Valor no numérico en '{columna}' (fila {fila} del libro): {df[columna][invalidos].iloc[0]!r}"
+            )
+        if tipo.startswith("int"):
+            if columna in ENTEROS_OPCIONALES:
+                valores = valores.fillna(ENTEROS_OPCIONALES[columna])
+            vacias = valores.isna()
+            if vacias.any():
+                fila = fila_inicial + int(vacias.to_numpy().argmax()) + 2
+                raise ErrorIngesta(f"Celda vacía en '{columna}' (fila {fila} del libro)")
+            valores = valores.round()
+        df[columna] = valores.astype(tipo)
+    for columna in categoricas:
+        if columna in df:
+            df[columna] = df[columna].astype("category")
+    return df
+
+
+def _unir_bloques(bloques, categoricas=COLUMNAS_CATEGORICAS):
+    df = pd.concat(bloques, ignore_index=True)
+    # Los categóricos de bloques distintos se unen como objeto: se re-categorizan
+    for columna in categoricas:
+        if columna in df:
+            df[columna] = df[columna].astype("category")
+    return df
+
+
+def iterar_bloques_excel(datos, tamano_bloque=TAMANO_BLOQUE):
+    """Genera DataFrames compactos de hasta `tamano_bloque` filas."""
+    from openpyxl import load_workbook
+
+    libro = load_workbook(io.BytesIO(datos), read_only=True, data_only=True)
+    try:
+        filas = libro.worksheets[0].iter_rows(values_only=True)
+        try:
+            columnas = validar_encabezado(next(filas))
+        except StopIteration:
+            raise ErrorIngesta("El libro está vacío") from None
+
+        n_columnas = len(columnas)
+        buffer = []
+        leidas = 0
+        for fila in filas:
+            if all(v is None for v in fila):
+                continue
+            buffer.append(tuple(fila[:n_columnas]) + (None,) * (n_columnas - len(fila)))
+            if len(buffer) >= tamano_bloque:
+                yield compactar(pd.DataFrame(buffer, columns=columnas), leidas)
+                leidas += len(buffer)
+                buffer = []
+        if buffer or not leidas:
+            yield compactar(pd.DataFrame(buffer, columns=columnas), leidas)
+    finally:
+        libro.close()
+
+
+def leer_bytes(archivo):
+    if isinstance(archivo, (bytes, bytearray)):
+        return bytes(archivo)
+    if hasattr(archivo, "getvalue"):
+        return archivo.getvalue()
+    with open(archivo, "rb") as f:
+        return f.read()
+
+
+def leer_soluciones_excel(archivo, tamano_bloque=TAMANO_BLOQUE):
+    """Lee un .xlsx (ruta, bytes o archivo subido) con caché por huella.
+
+    El DataFrame devuelto se comparte entre ejecuciones: no modificarlo en sitio.
+    """
+    datos = leer_bytes(archivo)
+    digest = hashlib.sha256(datos).hexdigest()
+
+    def leer():
+        bloques = list(iterar_bloques_excel(datos, tamano_bloque))
+        return _unir_bloques(bloques)
+
+    return CACHE_LECTURAS.obtener(digest, leer)
@@ -0,0 +1,234 @@
+# Archivo: snc/montecarlo.py
+"""Motor Monte Carlo para el VPN y el carbono del portafolio.
+
+Cada simulación muestrea una trayectoria de precio del carbono, una tasa de
+descuento, un factor de captura y (opcionalmente) el % de salvaguardas. Como
+el flujo de cada solución solo depende de su duración y su año de inicio, las
+soluciones se agregan por (duración, inicio) una sola vez; cada lote de
+simulaciones se resuelve luego con un producto (simulaciones × años) @
+(años × grupos) por año de inicio, sin recorrer las soluciones. Los lotes
+pueden repartirse en un pool de procesos, arrancados con `spawn` para no
+bifurcar un proceso con hilos (el servidor de Streamlit).
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from snc import eje
+from snc.motor import N_ANIOS_DEFAULT, extender_curva, matriz_captura_ha, preparar_soluciones
+
+
+@dataclass(frozen=True)
+class Distribucion:
+    """Distribución de un insumo: fija, normal, lognormal, uniforme o triangular.
+
+    - fija: `valor`
+    - normal: `media`, `desviacion` (truncada en `minimo`/`maximo` si se dan)
+    - lognormal: `media` (mediana de la variable) y `desviacion` del logaritmo
+    - uniforme: `minimo`, `maximo`
+    - triangular: `minimo`, `moda`, `maximo` (con `minimo == maximo`, ese valor fijo)
+    """
+
+    tipo: str = "fija"
+    valor: float = 0.0
+    media: float = 0.0
+    desviacion: float = 0.0
+    minimo: float = -np.inf
+    maximo: float = np.inf
+    moda: float = 0.0
+
+    def muestrear(self, rng, n):
+        if self.tipo == "fija":
+            return np.full(n, float(self.valor))
+        if self.tipo == "normal":
+            valores = rng.normal(self.media, self.desviacion, n)
+        elif self.tipo == "lognormal":
+            valores = self.media * np.exp(rng.normal(0.0, self.desviacion, n))
+        elif self.tipo == "uniforme":
+            return rng.uniform(self.minimo, self.maximo, n)
+        elif self.tipo == "triangular":
+            if self.maximo <= self.minimo:
+                return np.full(n, float(self.minimo))  # rango degenerado (p. ej. un slider con ambos extremos iguales)
+            return rng.triangular(self.minimo, self.moda, self.maximo, n)
+        else:
+            raise ValueError(f"Distribución no soportada: {self.tipo}")
+        return np.clip(valores, self.minimo, self.maximo)
+
+
+@dataclass(frozen=True)
+class ConfiguracionMonteCarlo:
+    """Distribuciones de los insumos y tamaño de la simulación."""
+
+    precio_inicial: Distribucion = Distribucion("fija", valor=15.0)
+    volatilidad_precio: float = 0.2     # desviación anual del log-retorno del precio
+    crecimiento_precio: float = 0.0
+    tendencia_precio: tuple = ()        # precio por año relativo al primero (vacía: crecimiento constante)
+    tasa_descuento: Distribucion = Distribucion("fija", valor=0.05)
+    factor_captura: Distribucion = Distribucion("fija", valor=1.0)
+    salvaguardas: Distribucion = None   # None: se usan las salvaguardas de cada fila
+    n_simulaciones: int = 100_000
+    tamano_lote: int = 10_000
+    procesos: int = 1
+    semilla: int = 0
+
+
+@dataclass
+class InsumosMonteCarlo:
+    """Agregados del portafolio por (duración, año de inicio) distintos (solo arreglos pequeños)."""
+
+    duraciones: np.ndarray            # (U,)
+    inicios: np.ndarray               # (U,)
+    captura_ha_area: np.ndarray       # (U × años) captura × área, sin salvaguardas, desde el inicio
+    captura_salvaguardada: np.ndarray # (U × años) captura × área × (1 - salvaguardas)
+    neto_fijo: np.ndarray             # (U,) ingreso encadenado - costo total
+    capex: np.ndarray                 # (U,) CAPEX del grupo, pagado en su año de inicio
+    n_anios: int                      # años del eje del portafolio
+
+
+@dataclass
+class ResultadoMonteCarlo:
+    vpn: np.ndarray
+    carbono: np.ndarray
+    percentiles_reporte: tuple = field(default=(5, 25, 50, 75, 95))
+
+    @property
+    def prob_vpn_negativo(self):
+        return float(np.mean(self.vpn < 0))
+
+    def valor_en_riesgo(self, nivel=0.95):
+        """Pérdida de VPN que no se supera con probabilidad `nivel` (0 si no hay pérdida)."""
+        return float(max(0.0, -np.percentile(self.vpn, 100 * (1 - nivel))))
+
+    def resumen(self):
+        import pandas as pd
+
+        filas = {"Media": (self.vpn.mean(), self.carbono.mean())}
+        for q in self.percentiles_reporte:
+            filas[f"P{q}"] = (np.percentile(self.vpn, q), np.percentile(self.carbono, q))
+        return pd.DataFrame.from_dict(
+            filas, orient="index", columns=["VPN (USD)", "Carbono Total (tCO2e)"]
+        )
+
+
+def preparar_insumos(df_soluciones, parametros, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """Agrega el portafolio por duración y año de inicio; es lo único que viaja a los procesos."""
+    if columnas is None:
+        columnas = preparar_soluciones(df_soluciones)
+    duracion = columnas["duracion"]
+    n_anios_captura = max(n_anios, int(duracion.max()) if len(duracion) else 0)
+    anios = np.arange(n_anios_captura)
+
+    area_ajustada = columnas["area"] * parametros.multiplicador_area
+    captura_area = matriz_captura_ha(columnas, n_anios_captura) * area_ajustada[:, None]
+    factor_salvaguarda = 1 - columnas["salvaguardas"] / 100
+
+    crecimiento_acumulado = np.cumsum((1 + parametros.crecimiento_ingreso_encadenado) ** anios)
+    ingreso_encadenado = columnas["ingreso_encadenado"] * np.where(
+        duracion > 0, crecimiento_acumulado[np.clip(duracion - 1, 0, None)], 0.0
+    )
+    neto = ingreso_encadenado - columnas["costo"] * area_ajustada * duracion
+
+    pares, grupo = np.unique(np.stack([duracion, columnas["inicio"]], axis=1), axis=0, return_inverse=True)
+    grupo = grupo.reshape(-1)
+    n_grupos = len(pares)
+    por_grupo = np.zeros((n_grupos, n_anios_captura))
+    np.add.at(por_grupo, grupo, captura_area)
+    salvaguardada = np.zeros((n_grupos, n_anios_captura))
+    np.add.at(salvaguardada, grupo, captura_area * factor_salvaguarda[:, None])
+
+    return InsumosMonteCarlo(
+        duraciones=pares[:, 0],
+        inicios=pares[:, 1],
+        captura_ha_area=por_grupo,
+        captura_salvaguardada=salvaguardada,
+        neto_fijo=np.bincount(grupo, weights=neto, minlength=n_grupos),
+        capex=np.bincount(grupo, weights=columnas["capex"], minlength=n_grupos),
+        n_anios=eje.horizonte(columnas["inicio"], duracion, n_anios),
+    )
+
+
+def trayectorias_precio(rng, config, n, n_anios):
+    """Trayectorias (n × años) de precio: movimiento browniano geométrico."""
+    precio_inicial = np.maximum(config.precio_inicial.muestrear(rng, n), 0.0)
+    anios = np.arange(n_anios)
+    if len(config.tendencia_precio):
+        # Forma de una curva de precios; después de su último año crece a `crecimiento_precio`
+        tendencia = extender_curva(config.tendencia_precio, n_anios, config.crecimiento_precio)
+    else:
+        tendencia = (1 + config.crecimiento_precio) ** anios
+    sigma = config.volatilidad_precio
+    if sigma <= 0:
+        return precio_inicial[:, None] * tendencia
+    choques = rng.normal(0.0, sigma, (n, n_anios))
+    choques[:, 0] = 0.0
+    log_ruido = np.cumsum(choques, axis=1) - 0.5 * sigma ** 2 * anios
+    return precio_inicial[:, None] * tendencia * np.exp(log_ruido)
+
+
+def simular_lote(insumos, config, semilla, n):
+    """Evalúa `n` simulaciones; devuelve (vpn, carbono)."""
+    rng = np.random.default_rng(semilla)
+    ancho = insumos.captura_ha_area.shape[1]
+    largo = int(insumos.inicios.max(initial=0)) + ancho
+
+    precios = trayectorias_precio(rng, config, n, largo)
+    tasa = config.tasa_descuento.muestrear(rng, n)
+    factor_captura = np.maximum(config.factor_captura.muestrear(rng, n), 0.0)
+
+    if config.salvaguardas is None:
+        base = insumos.captura_salvaguardada
+        factor = factor_captura
+    else:
+        base = insumos.captura_ha_area
+        salvaguardas = np.clip(config.salvaguardas.muestrear(rng, n), 0.0, 100.0)
+        factor = factor_captura * (1 - salvaguardas / 100)
+
+    # Ingreso de carbono por grupo: (n × años) @ (años × U), con el precio desde el año de inicio
+    ingreso_carbono = np.empty((n, len(insumos.duraciones)))
+    for inicio, grupos in eje.grupos_inicio(insumos.inicios):
+        ingreso_carbono[:, grupos] = precios[:, inicio:inicio + ancho] @ base[grupos].T
+    ingreso_carbono *= factor[:, None]
+    carbono = factor * base.sum()
+
+    # Suma de factores de descuento de los años inicio+1 .. inicio+dur-1 de cada grupo
+    descuento = 1.0 / (1.0 + tasa[:, None]) ** np.arange(1, largo + 1)
+    acumulado = np.cumsum(descuento, axis=1)
+    inicios, duraciones = insumos.inicios, insumos.duraciones
+    suma_descuento = np.where(
+        duraciones >= 2,
+        acumulado[:, inicios + np.maximum(duraciones - 1, 0)] - acumulado[:, inicios],
+        0.0,
+    )
+    peso = suma_descuento / np.maximum(duraciones, 1)
+
+    vpn = ((ingreso_carbono + insumos.neto_fijo) * peso).sum(axis=1)
+    vpn -= descuento[:, inicios] @ insumos.capex
+    return vpn, carbono
+
+
+def simular(df_soluciones, parametros, config, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """Corre `config.n_simulaciones` simulaciones en lotes (y procesos) independientes."""
+    insumos = preparar_insumos(df_soluciones, parametros, n_anios, columnas)
+    tamanos = [config.tamano_lote] * (config.n_simulaciones // config.tamano_lote)
+    if config.n_simulaciones % config.tamano_lote:
+        tamanos.append(config.n_simulaciones % config.tamano_lote)
+    semillas = np.random.SeedSequence(config.semilla).spawn(len(tamanos))
+
+    if config.procesos > 1 and len(tamanos) > 1:
+        # `spawn`: un fork del servidor copiaría candados tomados por otros hilos
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=config.procesos, mp_context=contexto) as pool:
+            lotes = list(pool.map(
+                simular_lote,
+                [insumos] * len(tamanos), [config] * len(tamanos), semillas, tamanos,
+            ))
+    else:
+        lotes = [simular_lote(insumos, config, s, n) for s, n in zip(semillas, tamanos)]
+
+    return ResultadoMonteCarlo(
+        vpn=np.concatenate([vpn for vpn, _ in lotes]),
+        carbono=np.concatenate([carbono for _, carbono in lotes]),
+    )
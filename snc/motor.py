@@ -0,0 +1,398 @@
+# Archivo: snc/motor.py
+"""Motor vectorizado del modelo financiero de Sumideros Naturales de Carbono.
+
+Convierte la tabla de soluciones en matrices (soluciones × años) de captura y
+de flujo de caja, y calcula carbono total, ingresos y VPN con operaciones de
+arreglos. No depende de Streamlit.
+
+Las matrices son locales a cada solución (columna 0 = su año de inicio) y se
+ubican en el eje del portafolio con `snc.eje`; el precio del carbono y el
+descuento corren en el eje compartido, como vectores por año
+(`vector_precios`, `vector_descuento`) calculados una vez para todas las
+soluciones. Por defecto el precio crece a tasa constante y el descuento usa una
+tasa única; `Parametros.curva_precio` y `Parametros.curva_descuento` admiten en
+su lugar una curva anual de precios y una estructura temporal de tasas.
+
+El cálculo solo necesita NumPy: pandas se importa al leer una tabla de
+soluciones (`preparar_soluciones`) o al pedir una tabla de salida.
+"""
+
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+
+from snc import eje
+from snc.curvas import curvas_por_fila
+
+N_ANIOS_DEFAULT = 30
+
+# % de pérdida evitada por defecto para degradación (el del formulario)
+PERDIDA_EVITADA_DEFAULT = 3.5
+
+# --- CATÁLOGO DE SOLUCIONES ---
+SOLUCIONES_PREDETERMINADAS = {
+    # Restauración (captura constante o especial)
+    "Pastos Marinos": {"captura": 7.5, "costo": 70, "duracion": 30, "capex": 500, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+    "Manglares": {"captura": 10, "costo": 90, "duracion": 30, "capex": 800, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+    "Bosque Seco Tropical": {"captura": 6, "costo": 55, "duracion": 25, "capex": 400, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+    "Corales": {"captura": 3, "costo": 100, "duracion": 20, "capex": 1500, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+    "Agroforestería con Cacao": {"captura": 5, "costo": 50, "duracion": 20, "capex": 300, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+    "Bosque de Galería": {"captura": 8, "costo": 65, "duracion": 30, "capex": 600, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+    "Turberas Andinas": {"captura": 5, "costo": 70, "duracion": 30, "capex": 750, "tipo_captura": "constante", "tipo_sn": "restauracion"},
+
+    # Restauración especial
+    "Restauración de Pastos Degradados": {
+        "tipo_captura": "lineal", "captura_inicial": 2.0, "captura_final": 6.0,
+        "costo": 40, "duracion": 30, "capex": 300, "tipo_sn": "restauracion"
+    },
+    "Reforestación Productiva Zonas ECP": {
+        "tipo_captura": "lineal", "captura_inicial": 1.5, "captura_final": 5.5,
+        "costo": 60, "duracion": 30, "capex": 350, "tipo_sn": "restauracion"
+    },
+    "Restauración de Manglares Caribe (Esp.)": {
+        "tipo_captura": "sigmoidal", "captura_max": 8.0, "velocidad": 0.3, "punto_medio": 15,
+        "costo": 80, "duracion": 30, "capex": 900, "tipo_sn": "restauracion"
+    },
+
+    # Degradación Evitada
+    "Manglar Degradación Evitada": {"captura": 8.0, "costo": 60, "duracion": 30, "capex": 400, "tipo_captura": "constante", "tipo_sn": "degradacion"},
+    "Bosque Húmedo Degradación Evitada": {"captura": 7.0, "costo": 50, "duracion": 30, "capex": 350, "tipo_captura": "constante", "tipo_sn": "degradacion"},
+    "Páramo Degradación Evitada": {"captura": 5.5, "costo": 55, "duracion": 30, "capex": 370, "tipo_captura": "constante", "tipo_sn": "degradacion"},
+    "Humedal Degradación Evitada": {"captura": 6.5, "costo": 60, "duracion": 30, "capex": 390, "tipo_captura": "constante", "tipo_sn": "degradacion"},
+    "Pastos Degradación Evitada": {"captura": 4.5, "costo": 40, "duracion": 30, "capex": 310, "tipo_captura": "constante", "tipo_sn": "degradacion"}
+}
+
+# Columnas numéricas de la tabla de soluciones: (clave interna, valor por defecto)
+COLUMNAS_NUMERICAS = {
+    "Área (ha)": ("area", 0.0),
+    "Costo anual por ha (USD)": ("costo", 0.0),
+    "CAPEX Total (USD)": ("capex", 0.0),
+    "Duración (años)": ("duracion", N_ANIOS_DEFAULT),
+    "Salvaguardas (%)": ("salvaguardas", 0.0),
+    "Ingreso Encadenado (USD/año)": ("ingreso_encadenado", 0.0),
+    "% Pérdida Evitada": ("perdida_evitada", 0.0),
+    "Año de Inicio": ("inicio", 0.0),
+}
+
+# Arreglos numéricos de `ResultadoPortafolio` (los que se pueden guardar en el caché en disco)
+ARREGLOS_RESULTADO = (
+    "captura", "flujos", "carbono_total", "costo_total", "ingreso_total", "vpn", "area", "capex", "inicio",
+)
+
+# Parámetros de curva: (columna de la tabla, clave interna, clave del catálogo)
+PARAMETROS_CURVA = [
+    ("Captura por ha (tCO2e)", "captura", "captura"),
+    ("Captura Inicial", "captura_inicial", "captura_inicial"),
+    ("Captura Final", "captura_final", "captura_final"),
+    ("Captura Máxima", "captura_maxima", "captura_max"),
+    ("Velocidad", "velocidad", "velocidad"),
+    ("Punto Medio", "punto_medio", "punto_medio"),
+    ("Forma", "forma", "forma"),
+]
+
+# Campos de `Parametros` que son trayectorias anuales (tuplas) y no escalares
+CAMPOS_TRAYECTORIA = ("curva_precio", "curva_descuento")
+
+
+@dataclass(frozen=True)
+class Parametros:
+    """Parámetros generales del proyecto (los de la barra lateral)."""
+
+    precio_carbono: float = 15.0
+    crecimiento_precio_carbono: float = 0.0
+    tasa_descuento: float = 0.05
+    crecimiento_ingreso_encadenado: float = 0.0
+    multiplicador_area: float = 1.0
+    multiplicador_precio_carbono: float = 1.0
+    multiplicador_tasa_descuento: float = 1.0
+    # Trayectorias anuales opcionales (año 1 primero); vacías = precio con crecimiento constante y tasa única
+    curva_precio: tuple = ()     # USD/tCO2e por año; después del último año crece a `crecimiento_precio_carbono`
+    curva_descuento: tuple = ()  # tasa spot por año (fracción): factor 1 / (1 + r_t)^t; después, la última tasa
+
+    def __post_init__(self):
+        # Admite listas y arreglos; las tuplas mantienen los parámetros inmutables y con huella estable
+        for campo in CAMPOS_TRAYECTORIA:
+            object.__setattr__(self, campo, tuple(float(v) for v in getattr(self, campo)))
+        if self.curva_precio and self.curva_precio[0] <= 0:
+            raise ValueError("La curva de precios debe empezar con un precio positivo")
+
+    @property
+    def precio_base(self):
+        """Precio del primer año, con multiplicador (el primero de la curva si hay curva de precios)."""
+        precio = self.curva_precio[0] if self.curva_precio else self.precio_carbono
+        return precio * self.multiplicador_precio_carbono
+
+    @property
+    def tasa_ajustada(self):
+        return self.tasa_descuento * self.multiplicador_tasa_descuento
+
+    def con_precio_base(self, precio):
+        """Los mismos parámetros con `precio` (> 0, ya multiplicado) en el primer año y la misma trayectoria."""
+        if not self.curva_precio:
+            return replace(self, precio_carbono=precio, multiplicador_precio_carbono=1.0)
+        escala = precio / self.curva_precio[0]
+        return replace(self, multiplicador_precio_carbono=1.0, curva_precio=[v * escala for v in self.curva_precio])
+
+
+@dataclass
+class ResultadoPortafolio:
+    """Matrices y totales del portafolio calculados por `calcular_portafolio`.
+
+    La tabla `resultados` (DataFrame) se arma la primera vez que se pide.
+    """
+
+    captura: np.ndarray        # (soluciones × años) tCO2e por año desde su inicio, ajustada por área y salvaguardas
+    flujos: np.ndarray         # (soluciones × años) flujo de caja por año desde su inicio
+    carbono_total: np.ndarray
+    costo_total: np.ndarray
+    ingreso_total: np.ndarray
+    vpn: np.ndarray
+    solucion: np.ndarray       # (soluciones,) nombre de cada solución
+    area: np.ndarray           # (soluciones,) área ajustada por el multiplicador
+    capex: np.ndarray
+    inicio: np.ndarray = None  # (soluciones,) año de inicio en el eje del portafolio
+    horizonte: int = None      # años del eje del portafolio
+    _resultados: object = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.inicio is None:
+            self.inicio = np.zeros(len(self.vpn), dtype=np.int64)
+        if self.horizonte is None:
+            self.horizonte = self.flujos.shape[1]
+
+    @property
+    def flujo_total(self):
+        """Flujo del portafolio por año del eje compartido."""
+        return eje.total(self.flujos, self.inicio, self.horizonte)
+
+    @property
+    def captura_total(self):
+        return eje.total(self.captura, self.inicio, self.horizonte)
+
+    def flujos_eje(self):
+        """Flujos (soluciones × horizonte) ubicados en el eje del portafolio."""
+        return eje.densa(self.flujos, self.inicio, self.horizonte)
+
+    def captura_eje(self):
+        return eje.densa(self.captura, self.inicio, self.horizonte)
+
+    def arreglos(self):
+        """Los arreglos numéricos y el horizonte (sin los nombres), para `snc.cache.CacheDisco`."""
+        return {**{campo: getattr(self, campo) for campo in ARREGLOS_RESULTADO},
+                "horizonte": np.array([self.horizonte])}
+
+    @classmethod
+    def desde_arreglos(cls, arreglos, solucion):
+        """Inversa de `arreglos`; `solucion` son los nombres de las filas."""
+        return cls(solucion=solucion, horizonte=int(arreglos["horizonte"][0]),
+                   **{campo: arreglos[campo] for campo in ARREGLOS_RESULTADO})
+
+    @property
+    def resultados(self):
+        """Tabla por solución: área, carbono, costo, CAPEX, ingreso y VPN."""
+        if self._resultados is None:
+            import pandas as pd
+
+            self._resultados = pd.DataFrame({
+                "Solución": self.solucion,
+                "Área (ha)": self.area,
+                "Carbono Total (tCO2e)": self.carbono_total,
+                "Costo Total (USD)": self.costo_total,
+                "CAPEX Total (USD)": self.capex,
+                "Ingreso Total (USD)": self.ingreso_total,
+                "VPN (USD)": self.vpn,
+            })
+        return self._resultados
+
+
+def _columna_texto(df, columna, n):
+    if columna in df:
+        return df[columna].astype(object).where(df[columna].notna(), None).to_numpy(copy=True)
+    return np.full(n, None, dtype=object)
+
+
+def _desde_catalogo(unicos, codigos, clave):
+    # Una búsqueda por nombre distinto, no por fila
+    valores = np.array([
+        SOLUCIONES_PREDETERMINADAS.get(nombre, {}).get(clave, np.nan)
+        for nombre in unicos
+    ], dtype=object)
+    return valores[codigos]
+
+
+def preparar_soluciones(df_soluciones):
+    """Normaliza la tabla de soluciones a un diccionario de arreglos NumPy.
+
+    Los parámetros de curva que falten en la tabla se toman del catálogo
+    `SOLUCIONES_PREDETERMINADAS` según el nombre de la solución.
+    """
+    import pandas as pd
+
+    n = len(df_soluciones)
+    if "Solución" in df_soluciones:
+        nombres = df_soluciones["Solución"].astype(str).where(df_soluciones["Solución"].notna(), "")
+        nombres = nombres.to_numpy(dtype=object)
+    else:
+        nombres = np.full(n, "", dtype=object)
+    columnas = {"solucion": nombres}
+    codigos, unicos = pd.factorize(nombres)
+
+    for columna_tabla, clave, catalogo in (
+        ("Tipo Captura", "tipo_captura", "tipo_captura"),
+        ("Tipo SNC", "tipo_snc", "tipo_sn"),
+    ):
+        valores = _columna_texto(df_soluciones, columna_tabla, n)
+        faltantes = pd.isna(valores)
+        if faltantes.any():
+            valores[faltantes] = _desde_catalogo(unicos, codigos[faltantes], catalogo)
+        defecto = "constante" if clave == "tipo_captura" else "restauracion"
+        columnas[clave] = pd.Series(valores, dtype=object).fillna(defecto).astype(str).to_numpy(dtype=object)
+
+    for columna_tabla, (clave, defecto) in COLUMNAS_NUMERICAS.items():
+        if columna_tabla in df_soluciones:
+            valores = pd.to_numeric(df_soluciones[columna_tabla], errors="coerce").to_numpy(dtype=float, copy=True)
+            columnas[clave] = np.where(np.isnan(valores), defecto, valores)
+        else:
+            columnas[clave] = np.full(n, defecto, dtype=float)
+    columnas["duracion"] = columnas["duracion"].astype(np.int64)
+    columnas["inicio"] = np.clip(columnas["inicio"], 0, None).astype(np.int64)
+
+    for columna_tabla, clave, catalogo in PARAMETROS_CURVA:
+        if columna_tabla in df_soluciones:
+            valores = pd.to_numeric(df_soluciones[columna_tabla], errors="coerce").to_numpy(dtype=float, copy=True)
+        else:
+            valores = np.full(n, np.nan)
+        faltantes = np.isnan(valores)
+        if faltantes.any():
+            valores[faltantes] = _desde_catalogo(unicos, codigos[faltantes], catalogo).astype(float)
+        columnas[clave] = np.nan_to_num(valores, nan=0.0)
+
+    return columnas
+
+
+def matriz_captura_ha(columnas, n_anios):
+    """Captura por hectárea (soluciones × años) desde la biblioteca de curvas."""
+    curvas, codigos = curvas_por_fila(columnas, n_anios)
+    return curvas[codigos]
+
+
+def factores_descuento(tasa, n_anios=N_ANIOS_DEFAULT):
+    """Factores 1 / (1 + tasa)^(año + 1); `tasa` escalar o arreglo (… × 1)."""
+    return 1.0 / (1.0 + np.asarray(tasa, dtype=float)) ** np.arange(1, n_anios + 1)
+
+
+# --- TRAYECTORIAS DE PRECIO Y DESCUENTO ---
+def extender_curva(curva, n_anios, crecimiento=0.0):
+    """Los primeros `n_anios` valores de `curva`; después del último, crece a `crecimiento` anual."""
+    curva = np.asarray(curva, dtype=float)
+    if len(curva) >= n_anios:
+        return curva[:n_anios].copy()
+    extension = curva[-1] * (1 + crecimiento) ** np.arange(1, n_anios - len(curva) + 1)
+    return np.concatenate([curva, extension])
+
+
+def trayectoria_precio(parametros, n_anios):
+    """Precio por USD de precio del primer año, en cada año del eje (el primero vale 1)."""
+    if parametros.curva_precio:
+        curva = extender_curva(parametros.curva_precio, n_anios, parametros.crecimiento_precio_carbono)
+        return curva / parametros.curva_precio[0]
+    return (1 + parametros.crecimiento_precio_carbono) ** np.arange(n_anios)
+
+
+def vector_precios(parametros, n_anios):
+    """Precio del carbono (USD/tCO2e, con multiplicador) en cada año del eje del portafolio."""
+    if parametros.curva_precio:
+        curva = extender_curva(parametros.curva_precio, n_anios, parametros.crecimiento_precio_carbono)
+        return parametros.multiplicador_precio_carbono * curva
+    return parametros.precio_base * trayectoria_precio(parametros, n_anios)
+
+
+def tasas_anuales(parametros, n_anios):
+    """Tasa de descuento spot (con multiplicador) de cada año del eje."""
+    if parametros.curva_descuento:
+        return parametros.multiplicador_tasa_descuento * extender_curva(parametros.curva_descuento, n_anios)
+    return np.full(n_anios, parametros.tasa_ajustada)
+
+
+def vector_descuento(parametros, n_anios):
+    """Factores 1 / (1 + r_t)^t de los años t = 1..`n_anios` del eje (tasa única o estructura de tasas)."""
+    if parametros.curva_descuento:
+        return 1.0 / (1.0 + tasas_anuales(parametros, n_anios)) ** np.arange(1, n_anios + 1)
+    return factores_descuento(parametros.tasa_ajustada, n_anios)
+
+
+def calcular_portafolio(df_soluciones, parametros, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """Calcula captura, flujos, ingresos y VPN de todas las soluciones a la vez.
+
+    `n_anios` es el horizonte mínimo: el eje se alarga hasta el fin del último
+    proyecto (año de inicio + duración), sin truncar duraciones largas.
+    """
+    if columnas is None:
+        columnas = preparar_soluciones(df_soluciones)
+    duracion = columnas["duracion"]
+    inicio = columnas["inicio"]
+    n = len(duracion)
+    n_anios_captura = max(n_anios, int(duracion.max()) if n else 0)
+    anios = np.arange(n_anios_captura)
+    horizonte = eje.horizonte(inicio, duracion, n_anios)
+
+    # === Cálculo de captura ===
+    area_ajustada = columnas["area"] * parametros.multiplicador_area
+    factor_salvaguarda = 1 - columnas["salvaguardas"] / 100
+    captura = matriz_captura_ha(columnas, n_anios_captura)
+    captura *= (area_ajustada * factor_salvaguarda)[:, None]
+    carbono_total = captura.sum(axis=1)
+
+    # === Cálculo financiero ===
+    costo_total = columnas["costo"] * area_ajustada * duracion
+    # El precio corre en el eje del portafolio: un proyecto tardío recibe el precio de su año
+    ingreso_carbono = eje.ponderar(captura, inicio, vector_precios(parametros, horizonte))
+    crecimiento_acumulado = np.cumsum((1 + parametros.crecimiento_ingreso_encadenado) ** anios)
+    ingreso_encadenado = columnas["ingreso_encadenado"] * np.where(
+        duracion > 0, crecimiento_acumulado[np.clip(duracion - 1, 0, None)], 0.0
+    )
+    ingreso_total = ingreso_carbono + ingreso_encadenado
+
+    # El flujo neto se reparte en partes iguales entre los años 1..dur-1
+    flujo_medio = np.divide(
+        ingreso_total - costo_total, duracion,
+        out=np.zeros(n), where=duracion > 0,
+    )
+    flujos = np.where(
+        (anios[None, :] >= 1) & (anios[None, :] < duracion[:, None]),
+        flujo_medio[:, None], 0.0,
+    )
+    flujos[:, 0] = -columnas["capex"]
+    vpn = eje.ponderar(flujos, inicio, vector_descuento(parametros, horizonte))
+
+    return ResultadoPortafolio(
+        captura=captura,
+        flujos=flujos,
+        carbono_total=carbono_total,
+        costo_total=costo_total,
+        ingreso_total=ingreso_total,
+        vpn=vpn,
+        solucion=columnas["solucion"],
+        area=area_ajustada,
+        capex=columnas["capex"],
+        inicio=inicio,
+        horizonte=horizonte,
+    )
+
+
+def captura_acumulada(captura, n_anios=N_ANIOS_DEFAULT):
+    """Captura acumulada por solución (soluciones × años) y total del portafolio por año."""
+    ventana = captura[:, :n_anios]
+    return np.cumsum(ventana, axis=1), np.cumsum(ventana.sum(axis=0))
+
+
+def formato_largo(matriz, nombres, columna_valor):
+    """Matriz (soluciones × años) a tabla larga Año / Solución / valor, para graficar."""
+    import pandas as pd
+
+    n_filas, n_anios = matriz.shape
+    return pd.DataFrame({
+        "Año": np.tile(np.arange(1, n_anios + 1), n_filas),
+        "Solución": np.repeat(np.asarray(nombres, dtype=object), n_anios),
+        columna_valor: np.asarray(matriz).ravel(),
+    })
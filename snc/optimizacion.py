@@ -0,0 +1,160 @@
+# Archivo: snc/optimizacion.py
+"""Optimización de la asignación de hectáreas entre tipos de SNC.
+
+El VPN, el carbono, el CAPEX y el costo de cada tipo del catálogo son lineales
+en el área, así que se calculan una sola vez por hectárea con el motor y el
+problema se resuelve como un programa lineal (HiGHS vía `scipy.optimize`):
+
+    max  Σ vpn_ha · x      (o Σ carbono_ha · x)
+    s.a. Σ x ≤ área total,  Σ capex_ha · x ≤ presupuesto CAPEX,
+         Σ carbono_ha · x ≥ carbono mínimo,  mín_j ≤ x_j ≤ máx_j
+
+La frontera VPN-carbono se traza resolviendo el mismo programa con metas de
+carbono crecientes. En el optimizador el CAPEX del catálogo se interpreta por
+hectárea, como en el glosario del modelo; el motor, en cambio, toma el "CAPEX
+Total (USD)" de cada fila como un monto por solución (el valor por defecto del
+formulario es el CAPEX del catálogo). `vpn_motor` da el VPN que el bloque de
+resultados reportaría para la misma asignación, para mostrarlo junto al óptimo.
+"""
+
+from dataclasses import dataclass, field, replace
+
+import numpy as np
+import pandas as pd
+
+from snc.motor import N_ANIOS_DEFAULT, PERDIDA_EVITADA_DEFAULT, SOLUCIONES_PREDETERMINADAS, calcular_portafolio
+
+# Hectáreas por debajo de esta cota se tratan como no asignadas (ruido del solver)
+AREA_MINIMA_ASIGNADA = 1e-6
+
+
+@dataclass(frozen=True)
+class Restricciones:
+    area_total: float
+    capex_total: float = np.inf
+    carbono_minimo: float = 0.0
+    area_minima: dict = field(default_factory=dict)   # Solución -> ha
+    area_maxima: dict = field(default_factory=dict)   # Solución -> ha
+
+
+@dataclass
+class ResultadoOptimizacion:
+    exito: bool
+    mensaje: str
+    asignacion: pd.Series        # ha por solución
+    vpn: float = np.nan
+    carbono: float = np.nan
+    capex: float = np.nan
+
+
+def tabla_asignacion(asignacion, capex_por_ha=False, salvaguardas=0.0, perdida_evitada=PERDIDA_EVITADA_DEFAULT):
+    """Tabla de soluciones con `asignacion` (Solución -> ha) y los valores del catálogo.
+
+    Con `capex_por_ha` el CAPEX del catálogo se multiplica por el área (convención
+    del optimizador); si no, es el total de la fila, como lo carga el formulario.
+    """
+    filas = []
+    for nombre, area in asignacion.items():
+        base = SOLUCIONES_PREDETERMINADAS[nombre]
+        filas.append({
+            "Solución": nombre,
+            "Área (ha)": float(area),
+            "Costo anual por ha (USD)": base["costo"],
+            "CAPEX Total (USD)": base["capex"] * (area if capex_por_ha else 1.0),
+            "Duración (años)": base["duracion"],
+            "Salvaguardas (%)": salvaguardas,
+            "Ingreso Encadenado (USD/año)": 0.0,
+            "% Pérdida Evitada": perdida_evitada if base.get("tipo_sn") == "degradacion" else 0.0,
+        })
+    return pd.DataFrame(filas)
+
+
+def coeficientes_por_ha(parametros, n_anios=N_ANIOS_DEFAULT, soluciones=None, salvaguardas=0.0,
+                        perdida_evitada=PERDIDA_EVITADA_DEFAULT):
+    """VPN, carbono, CAPEX y costo por hectárea de cada solución del catálogo (CAPEX por ha)."""
+    nombres = list(soluciones or SOLUCIONES_PREDETERMINADAS)
+    tabla = tabla_asignacion(dict.fromkeys(nombres, 1.0), True, salvaguardas, perdida_evitada)
+    # El optimizador decide el área: sin multiplicador de área
+    resultado = calcular_portafolio(tabla, replace(parametros, multiplicador_area=1.0), n_anios)
+    return pd.DataFrame({
+        "VPN/ha": resultado.vpn,
+        "Carbono/ha": resultado.carbono_total,
+        "CAPEX/ha": [SOLUCIONES_PREDETERMINADAS[n]["capex"] for n in nombres],
+        "Costo/ha": resultado.costo_total,
+    }, index=pd.Index(nombres, name="Solución"))
+
+
+def vpn_motor(asignacion, parametros, n_anios=N_ANIOS_DEFAULT, salvaguardas=0.0,
+              perdida_evitada=PERDIDA_EVITADA_DEFAULT):
+    """VPN del motor para `asignacion`, con el CAPEX del catálogo como total por solución.
+
+    Es el VPN que reportaría el bloque de resultados si cada solución asignada se
+    agregara con los valores por defecto del formulario.
+    """
+    asignacion = asignacion[asignacion > AREA_MINIMA_ASIGNADA]
+    if asignacion.empty:
+        return 0.0
+    tabla = tabla_asignacion(asignacion, False, salvaguardas, perdida_evitada)
+    return float(calcular_portafolio(tabla, replace(parametros, multiplicador_area=1.0), n_anios).vpn.sum())
+
+
+def _limites(coeficientes, restricciones):
+    return [
+        (restricciones.area_minima.get(nombre, 0.0), restricciones.area_maxima.get(nombre, None))
+        for nombre in coeficientes.index
+    ]
+
+
+def _resolver(coeficientes, restricciones, objetivo, carbono_minimo):
+    from scipy.optimize import linprog
+
+    vpn = coeficientes["VPN/ha"].to_numpy()
+    carbono = coeficientes["Carbono/ha"].to_numpy()
+    capex = coeficientes["CAPEX/ha"].to_numpy()
+
+    filas = [np.ones(len(vpn)), -carbono]
+    cotas = [restricciones.area_total, -carbono_minimo]
+    if np.isfinite(restricciones.capex_total):
+        filas.append(capex)
+        cotas.append(restricciones.capex_total)
+
+    c = -vpn if objetivo == "vpn" else -carbono
+    solucion = linprog(
+        c, A_ub=np.vstack(filas), b_ub=np.array(cotas),
+        bounds=_limites(coeficientes, restricciones), method="highs",
+    )
+    if not solucion.success:
+        return ResultadoOptimizacion(False, solucion.message, pd.Series(0.0, index=coeficientes.index))
+    x = solucion.x
+    return ResultadoOptimizacion(
+        exito=True,
+        mensaje=solucion.message,
+        asignacion=pd.Series(x, index=coeficientes.index, name="Área (ha)"),
+        vpn=float(vpn @ x),
+        carbono=float(carbono @ x),
+        capex=float(capex @ x),
+    )
+
+
+def optimizar(coeficientes, restricciones, objetivo="vpn"):
+    """Asignación de hectáreas que maximiza el VPN (`"vpn"`) o el carbono (`"carbono"`)."""
+    return _resolver(coeficientes, restricciones, objetivo, restricciones.carbono_minimo)
+
+
+def frontera_pareto(coeficientes, restricciones, n_puntos=50):
+    """Máximo VPN para `n_puntos` metas de carbono entre el mínimo exigido y el máximo alcanzable."""
+    maximo = _resolver(coeficientes, restricciones, "carbono", restricciones.carbono_minimo)
+    if not maximo.exito:
+        return pd.DataFrame(columns=["Carbono Meta (tCO2e)", "Carbono (tCO2e)", "VPN (USD)"])
+
+    filas = []
+    for meta in np.linspace(restricciones.carbono_minimo, maximo.carbono, n_puntos):
+        punto = _resolver(coeficientes, restricciones, "vpn", meta)
+        if punto.exito:
+            filas.append({
+                "Carbono Meta (tCO2e)": meta,
+                "Carbono (tCO2e)": punto.carbono,
+                "VPN (USD)": punto.vpn,
+                **punto.asignacion.to_dict(),
+            })
+    return pd.DataFrame(filas)
@@ -0,0 +1,380 @@
+# Archivo: snc/parcelas.py
+"""Modo parcela: inventarios de miles de parcelas con atributos propios.
+
+Cada parcela tiene su solución, área, factor de captura, costos, año de inicio
+y región; los atributos ausentes se toman del catálogo de soluciones. Se leen
+tablas CSV, Parquet, Arrow o la tabla de atributos de un GeoPackage (SQLite,
+sin servicio GIS) en bloques con tipos compactos.
+
+El cálculo no arma matrices (parcelas × años): las parcelas comparten unas pocas
+curvas de captura distintas, así que cada parcela se reduce a escalares (peso
+de captura, flujo medio, VPN) y las series anuales por grupo se acumulan con
+`np.bincount` sobre combinaciones (grupo, curva, año de inicio). El año de
+inicio desplaza la parcela en el eje del portafolio y su VPN se descuenta al
+año 0. Se procesa por bloques para acotar la memoria de los temporales.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from snc.curvas import curvas_por_fila
+from snc.ingesta import (
+    CACHE_LECTURAS,
+    TIPOS_COLUMNAS,
+    ErrorIngesta,
+    _unir_bloques,
+    compactar,
+    errores_lectura,
+    leer_bytes,
+    validar_encabezado,
+)
+from snc.motor import (
+    N_ANIOS_DEFAULT,
+    PERDIDA_EVITADA_DEFAULT,
+    SOLUCIONES_PREDETERMINADAS,
+    preparar_soluciones,
+    vector_descuento,
+    vector_precios,
+)
+
+TAMANO_BLOQUE_PARCELAS = 250_000
+
+COLUMNAS_REQUERIDAS_PARCELAS = ["Solución", "Área (ha)"]
+
+COLUMNAS_CATEGORICAS_PARCELAS = ["Solución", "Región", "Tipo Captura", "Tipo SNC"]
+
+# Duración y año de inicio admiten celdas vacías (catálogo / año 0)
+TIPOS_PARCELAS = {
+    **TIPOS_COLUMNAS,
+    "Duración (años)": "float32",
+    "Factor de Captura": "float32",
+    "CAPEX por ha (USD)": "float64",
+    "Año de Inicio": "float32",
+}
+
+COLUMNAS_PARCELAS = list(dict.fromkeys(["ID Parcela", *COLUMNAS_CATEGORICAS_PARCELAS, *TIPOS_PARCELAS]))
+
+SIN_REGION = "Sin región"
+
+
+# --- LECTURA ---
+def _compactar_parcelas(df, fila_inicial=0):
+    return compactar(df, fila_inicial, TIPOS_PARCELAS, COLUMNAS_CATEGORICAS_PARCELAS)
+
+
+def _bloques_csv(datos, tamano_bloque):
+    import io
+
+    encabezado = pd.read_csv(io.BytesIO(datos), nrows=0).columns
+    validar_encabezado(encabezado, COLUMNAS_REQUERIDAS_PARCELAS)
+    leidas = 0
+    for bloque in pd.read_csv(
+        io.BytesIO(datos), usecols=lambda c: c in COLUMNAS_PARCELAS, chunksize=tamano_bloque,
+    ):
+        yield _compactar_parcelas(bloque, leidas)
+        leidas += len(bloque)
+
+
+def _bloques_arrow(datos, tamano_bloque, parquet):
+    from snc.columnar import _pyarrow
+
+    pa = _pyarrow()
+    if parquet:
+        archivo = pa.parquet.ParquetFile(pa.BufferReader(datos))
+        nombres = archivo.schema_arrow.names
+        validar_encabezado(nombres, COLUMNAS_REQUERIDAS_PARCELAS)
+        lotes = archivo.iter_batches(tamano_bloque, columns=[c for c in COLUMNAS_PARCELAS if c in nombres])
+    else:
+        lector = pa.ipc.open_file(pa.BufferReader(datos))
+        nombres = lector.schema.names
+        validar_encabezado(nombres, COLUMNAS_REQUERIDAS_PARCELAS)
+        proyeccion = [c for c in COLUMNAS_PARCELAS if c in nombres]
+        lotes = (lector.get_batch(i).select(proyeccion) for i in range(lector.num_record_batches))
+    leidas = 0
+    for lote in lotes:
+        yield _compactar_parcelas(lote.to_pandas(), leidas)
+        leidas += lote.num_rows
+
+
+def _identificador(nombre):
+    """Nombre de tabla o columna citado para SQLite (las comillas internas se duplican)."""
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+
+def _bloques_geopackage(datos, tamano_bloque):
+    # sqlite3 necesita un archivo: el GeoPackage subido se copia a un temporal
+    descriptor, ruta = tempfile.mkstemp(suffix=".gpkg")
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            f.write(datos)
+        conexion = sqlite3.connect(ruta)
+        try:
+            fila = conexion.execute(
+                "SELECT table_name FROM gpkg_contents WHERE data_type IN ('features', 'attributes') "
+                "ORDER BY data_type = 'features' DESC LIMIT 1"
+            ).fetchone()
+            if fila is None:
+                raise ErrorIngesta("El GeoPackage no tiene tablas de atributos")
+            tabla = fila[0]
+            # gpkg_contents es texto del archivo subido: la tabla debe existir y se cita como identificador
+            existe = conexion.execute(
+                "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (tabla,)
+            ).fetchone()
+            if existe is None:
+                raise ErrorIngesta(f"El GeoPackage declara la tabla {tabla!r}, que no existe")
+            nombres = [c[1] for c in conexion.execute(f"PRAGMA table_info({_identificador(tabla)})")]
+            validar_encabezado(nombres, COLUMNAS_REQUERIDAS_PARCELAS)
+            # Solo las columnas del modelo: la geometría (BLOB) no se lee
+            proyeccion = ", ".join(_identificador(c) for c in COLUMNAS_PARCELAS if c in nombres)
+            leidas = 0
+            for bloque in pd.read_sql_query(f"SELECT {proyeccion} FROM {_identificador(tabla)}", conexion, chunksize=tamano_bloque):
+                yield _compactar_parcelas(bloque, leidas)
+                leidas += len(bloque)
+        except sqlite3.DatabaseError as error:
+            raise ErrorIngesta(f"GeoPackage no válido: {error}") from None
+        finally:
+            conexion.close()
+    finally:
+        os.remove(ruta)
+
+
+def leer_parcelas(archivo, nombre=None, tamano_bloque=TAMANO_BLOQUE_PARCELAS):
+    """Lee un inventario .csv, .parquet, .arrow/.feather o .gpkg con caché por huella.
+
+    El DataFrame devuelto se comparte entre ejecuciones: no modificarlo en sitio.
+    """
+    nombre = (nombre or getattr(archivo, "name", None) or str(archivo)).lower()
+    datos = leer_bytes(archivo)
+
+    def leer():
+        if nombre.endswith(".gpkg"):
+            bloques = _bloques_geopackage(datos, tamano_bloque)
+        elif nombre.endswith(".parquet"):
+            bloques = _bloques_arrow(datos, tamano_bloque, parquet=True)
+        elif nombre.endswith((".arrow", ".feather", ".ipc")):
+            bloques = _bloques_arrow(datos, tamano_bloque, parquet=False)
+        else:
+            bloques = _bloques_csv(datos, tamano_bloque)
+        bloques = list(bloques)
+        if not bloques:
+            raise ErrorIngesta("El inventario está vacío")
+        return _unir_bloques(bloques, COLUMNAS_CATEGORICAS_PARCELAS)
+
+    with errores_lectura(nombre):
+        return CACHE_LECTURAS.obtener(hashlib.sha256(datos).hexdigest() + "parcelas", leer)
+
+
+# --- CÁLCULO ---
+@dataclass
+class ResultadoParcelas:
+    """Resultados por parcela y series anuales por grupo (grupos × años del portafolio)."""
+
+    parcelas: pd.DataFrame
+    grupos: pd.Index
+    captura_anual: np.ndarray
+    flujo_anual: np.ndarray
+
+    def resumen(self, por=("Región", "Solución")):
+        """Totales por grupo con reducciones de `groupby`."""
+        return self.parcelas.groupby(list(por), observed=True, sort=True).agg(**{
+            "N Parcelas": ("Área (ha)", "size"),
+            "Área (ha)": ("Área (ha)", "sum"),
+            "Carbono Total (tCO2e)": ("Carbono Total (tCO2e)", "sum"),
+            "Costo Total (USD)": ("Costo Total (USD)", "sum"),
+            "CAPEX Total (USD)": ("CAPEX Total (USD)", "sum"),
+            "Ingreso Total (USD)": ("Ingreso Total (USD)", "sum"),
+            "VPN (USD)": ("VPN (USD)", "sum"),
+        }).reset_index()
+
+    def series_largo(self, serie="flujo"):
+        """Serie anual por grupo en formato largo Año / Grupo / valor, para graficar."""
+        matriz, columna = (self.flujo_anual, "Flujo (USD)") if serie == "flujo" else (self.captura_anual, "Captura (tCO2e)")
+        n_grupos, n_anios = matriz.shape
+        return pd.DataFrame({
+            "Año": np.tile(np.arange(1, n_anios + 1), n_grupos),
+            "Grupo": np.repeat(np.asarray(self.grupos, dtype=object), n_anios),
+            columna: matriz.ravel(),
+        })
+
+
+def _numerica(bloque, columna, n):
+    if columna in bloque:
+        return pd.to_numeric(bloque[columna], errors="coerce").to_numpy(dtype=float, copy=True)
+    return np.full(n, np.nan)
+
+
+def _textos(serie):
+    # Los categóricos se expanden desde sus categorías, sin convertir fila a fila
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = np.append(np.asarray(serie.cat.categories, dtype=object), None)
+        return categorias[serie.cat.codes.to_numpy()]
+    return serie.astype(object).where(serie.notna(), None).to_numpy(dtype=object, copy=True)
+
+
+def _desde_catalogo(nombres, clave):
+    codigos, unicos = pd.factorize(nombres)
+    valores = np.array([SOLUCIONES_PREDETERMINADAS.get(u, {}).get(clave, np.nan) for u in unicos], dtype=object)
+    return valores[codigos]
+
+
+def _tabla_motor(bloque):
+    """Traduce un bloque de parcelas a la tabla de soluciones del motor (catálogo de respaldo)."""
+    n = len(bloque)
+    nombres = _textos(bloque["Solución"])
+    nombres[pd.isna(nombres)] = ""
+    area = _numerica(bloque, "Área (ha)", n)
+
+    def con_catalogo(columna, clave):
+        valores = _numerica(bloque, columna, n)
+        faltantes = np.isnan(valores)
+        if faltantes.any():
+            valores[faltantes] = _desde_catalogo(nombres[faltantes], clave).astype(float)
+        return valores
+
+    capex_ha = con_catalogo("CAPEX por ha (USD)", "capex")
+    capex_total = _numerica(bloque, "CAPEX Total (USD)", n)
+    capex_total = np.where(np.isnan(capex_total), capex_ha * area, capex_total)
+
+    perdida = _numerica(bloque, "% Pérdida Evitada", n)
+    tipo_sn = _textos(bloque["Tipo SNC"]) if "Tipo SNC" in bloque else np.full(n, None, dtype=object)
+    tipo_sn = np.where(pd.isna(tipo_sn), _desde_catalogo(nombres, "tipo_sn"), tipo_sn)
+    perdida = np.where(np.isnan(perdida) & (tipo_sn == "degradacion"), PERDIDA_EVITADA_DEFAULT, perdida)
+
+    tabla = {
+        "Solución": nombres,
+        "Área (ha)": area,
+        "Costo anual por ha (USD)": con_catalogo("Costo anual por ha (USD)", "costo"),
+        "CAPEX Total (USD)": capex_total,
+        "Duración (años)": con_catalogo("Duración (años)", "duracion"),
+        "Salvaguardas (%)": _numerica(bloque, "Salvaguardas (%)", n),
+        "Ingreso Encadenado (USD/año)": _numerica(bloque, "Ingreso Encadenado (USD/año)", n),
+        "% Pérdida Evitada": perdida,
+        "Tipo SNC": tipo_sn,
+    }
+    for columna in bloque.columns:
+        if columna not in tabla and (columna in TIPOS_COLUMNAS or columna == "Tipo Captura"):
+            tabla[columna] = bloque[columna].to_numpy()
+    return pd.DataFrame(tabla)
+
+
+def calcular_parcelas(df_parcelas, parametros, n_anios=N_ANIOS_DEFAULT, agrupar_por="Región",
+                      tamano_bloque=TAMANO_BLOQUE_PARCELAS):
+    """Carbono, ingresos y VPN por parcela, y series anuales agregadas por `agrupar_por`.
+
+    Con año de inicio 0 y factor de captura 1, cada parcela da lo mismo que
+    `calcular_portafolio` sobre la fila equivalente.
+    """
+    n = len(df_parcelas)
+    if agrupar_por in df_parcelas:
+        grupos_parcela = df_parcelas[agrupar_por].astype("category")
+        if grupos_parcela.isna().any():
+            if SIN_REGION not in grupos_parcela.cat.categories:
+                grupos_parcela = grupos_parcela.cat.add_categories([SIN_REGION])
+            grupos_parcela = grupos_parcela.fillna(SIN_REGION)
+        grupos = grupos_parcela.cat.categories
+        codigos_grupo = grupos_parcela.cat.codes.to_numpy(dtype=np.int64)
+    else:
+        grupos = pd.Index([SIN_REGION])
+        codigos_grupo = np.zeros(n, dtype=np.int64)
+    n_grupos = len(grupos)
+
+    partes = []
+    captura_anual = np.zeros((n_grupos, 0))
+    flujo_anual = np.zeros((n_grupos, 0))
+
+    for inicio_bloque in range(0, max(n, 1), tamano_bloque):
+        bloque = df_parcelas.iloc[inicio_bloque:inicio_bloque + tamano_bloque]
+        m = len(bloque)
+        if m == 0:
+            break
+        grupo = codigos_grupo[inicio_bloque:inicio_bloque + m]
+        columnas = preparar_soluciones(_tabla_motor(bloque))
+        duracion = columnas["duracion"]
+        inicio = columnas["inicio"]
+        factor = np.nan_to_num(_numerica(bloque, "Factor de Captura", m), nan=1.0)
+
+        # Curvas distintas del bloque: la captura de cada parcela es peso × curva
+        n_anios_captura = max(n_anios, int(duracion.max()))
+        anios = np.arange(n_anios_captura)
+        curvas, codigos = curvas_por_fila(columnas, n_anios_captura)
+        # Precio y descuento en el eje del portafolio, hasta el fin de la parcela más tardía
+        largo = int(inicio.max()) + n_anios_captura
+        precios = vector_precios(parametros, largo)
+        descuento = vector_descuento(parametros, largo)
+        descuento_acumulado = np.cumsum(descuento)
+
+        area_ajustada = columnas["area"] * parametros.multiplicador_area
+        peso = area_ajustada * (1 - columnas["salvaguardas"] / 100) * factor
+        carbono_total = peso * curvas.sum(axis=1)[codigos]
+        # El precio corre en el eje del portafolio: la parcela tardía recibe el precio de su año.
+        # Valor de cada curva a los precios de cada año de inicio distinto: (curvas × años) @ (años × inicios)
+        inicios, indice_inicio = np.unique(inicio, return_inverse=True)
+        ventanas = np.lib.stride_tricks.sliding_window_view(precios, n_anios_captura)[inicios]
+        ingreso_carbono = peso * (curvas @ ventanas.T)[codigos, indice_inicio]
+        crecimiento_acumulado = np.cumsum((1 + parametros.crecimiento_ingreso_encadenado) ** anios)
+        ingreso_total = ingreso_carbono + columnas["ingreso_encadenado"] * np.where(
+            duracion > 0, crecimiento_acumulado[np.clip(duracion - 1, 0, None)], 0.0
+        )
+        costo_total = columnas["costo"] * area_ajustada * duracion
+        flujo_medio = np.divide(ingreso_total - costo_total, duracion, out=np.zeros(m), where=duracion > 0)
+        ultimo = np.clip(duracion - 1, 0, None)
+        vpn = flujo_medio * (descuento_acumulado[inicio + ultimo] - descuento_acumulado[inicio]) \
+            - columnas["capex"] * descuento[inicio]
+
+        parte = pd.DataFrame({
+            "Región": bloque["Región"].to_numpy() if "Región" in bloque else SIN_REGION,
+            "Solución": bloque["Solución"].to_numpy(),
+            "Año de Inicio": inicio.astype(np.int16),
+            "Área (ha)": area_ajustada.astype(np.float32),
+            "Carbono Total (tCO2e)": carbono_total.astype(np.float32),
+            "Costo Total (USD)": costo_total,
+            "CAPEX Total (USD)": columnas["capex"],
+            "Ingreso Total (USD)": ingreso_total,
+            "VPN (USD)": vpn,
+        }, index=bloque.index)
+        if "ID Parcela" in bloque:
+            parte.insert(0, "ID Parcela", bloque["ID Parcela"].to_numpy())
+        partes.append(parte)
+
+        # Series anuales por grupo en el eje del portafolio (desplazadas por el inicio)
+        ancho = max(captura_anual.shape[1], int(inicio.max()) + n_anios_captura + 1)
+        captura_anual = np.pad(captura_anual, ((0, 0), (0, ancho - captura_anual.shape[1])))
+        flujo_anual = np.pad(flujo_anual, ((0, 0), (0, ancho - flujo_anual.shape[1])))
+
+        # Captura: suma de pesos por (grupo, curva, inicio) y una fila de curva por combinación
+        clave = (grupo * len(curvas) + codigos) * (int(inicio.max()) + 1) + inicio
+        unicas, inversa = np.unique(clave, return_inverse=True)
+        peso_combinado = np.bincount(inversa, weights=peso)
+        inicio_c = unicas % (int(inicio.max()) + 1)
+        curva_c = (unicas // (int(inicio.max()) + 1)) % len(curvas)
+        grupo_c = unicas // (int(inicio.max()) + 1) // len(curvas)
+        np.add.at(
+            captura_anual,
+            (grupo_c[:, None], inicio_c[:, None] + anios[None, :]),
+            peso_combinado[:, None] * curvas[curva_c],
+        )
+
+        # Flujo: CAPEX en el año de inicio y flujo medio en inicio+1 .. inicio+dur-1 (diferencias)
+        celdas = n_grupos * ancho
+        diferencias = np.bincount(grupo * ancho + inicio + 1, weights=flujo_medio, minlength=celdas)
+        diferencias -= np.bincount(grupo * ancho + inicio + ultimo + 1, weights=flujo_medio, minlength=celdas)
+        flujo_anual += np.cumsum(diferencias.reshape(n_grupos, ancho), axis=1)
+        flujo_anual -= np.bincount(grupo * ancho + inicio, weights=columnas["capex"], minlength=celdas).reshape(
+            n_grupos, ancho
+        )
+
+    parcelas = pd.concat(partes) if partes else pd.DataFrame(columns=["Región", "Solución", "VPN (USD)"])
+    for columna in ("Región", "Solución"):
+        if columna in parcelas:
+            parcelas[columna] = parcelas[columna].astype("category")
+    if "Región" in parcelas and parcelas["Región"].isna().any():
+        if SIN_REGION not in parcelas["Región"].cat.categories:
+            parcelas["Región"] = parcelas["Región"].cat.add_categories([SIN_REGION])
+        parcelas["Región"] = parcelas["Región"].fillna(SIN_REGION)
+    return ResultadoParcelas(parcelas, pd.Index(grupos), captura_anual, flujo_anual)
@@ -0,0 +1,183 @@
+# Archivo: snc/perfil.py
+"""Perfil de rendimiento por etapa, para el panel de diagnóstico de la app.
+
+`Perfilador.etapa(nombre)` es un contexto que acumula, por etapa y por
+ejecución del script: llamadas, filas procesadas, tiempo, memoria pico por
+encima de la inicial y aciertos / fallos del caché de resultados. El contexto
+entrega un dict donde el bloque puede anotar `filas` cuando solo las conoce al
+final. Inactivo, el contexto no mide nada.
+
+Con `registrar=True` cada etapa emite además una línea JSON en el logger
+`snc.perfil`, para seguir en producción qué etapa es la lenta.
+
+Las etapas no se anidan: la memoria pico se mide reiniciando el pico de RSS
+del proceso al entrar en cada una. El pico es del proceso entero (todas las
+sesiones del servidor), así que las etapas perfiladas de sesiones distintas se
+ejecutan de a una (`_BLOQUEO_MEMORIA`) para no reiniciarse el pico entre sí; lo
+que asignen a la vez las sesiones sin perfil sigue contando en la cifra.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows: sin getrusage, la memoria pico queda en NaN
+    resource = None
+
+# Etapas de la app, en el orden del panel
+ETAPAS_PERFIL = (
+    "ingesta", "calculo", "escenarios", "sensibilidad", "montecarlo", "optimizacion", "graficos", "historial",
+    "exportacion",
+)
+
+REGISTRO = logging.getLogger("snc.perfil")
+
+# El pico de RSS es del proceso: una sola etapa perfilada a la vez lo reinicia y lo lee
+_BLOQUEO_MEMORIA = threading.RLock()
+
+
+# --- MEMORIA DEL PROCESO ---
+_CLEAR_REFS = Path("/proc/self/clear_refs")
+_STATUS = Path("/proc/self/status")
+
+
+def _leer_status(campo):
+    for linea in _STATUS.read_text().splitlines():
+        if linea.startswith(campo + ":"):
+            return int(linea.split()[1]) / 1024  # kB → MB
+    raise KeyError(campo)
+
+
+def reiniciar_pico():
+    """Reinicia el pico de RSS del proceso; False si el sistema no lo permite."""
+    try:
+        _CLEAR_REFS.write_text("5")
+        return True
+    except OSError:
+        return False
+
+
+def memoria_actual():
+    """RSS actual del proceso en MB (NaN fuera de Linux)."""
+    try:
+        return _leer_status("VmRSS")
+    except (OSError, KeyError):
+        return float("nan")
+
+
+def memoria_pico():
+    """Pico de RSS en MB desde el último `reiniciar_pico` (o desde el arranque); NaN sin `resource`."""
+    try:
+        return _leer_status("VmHWM")
+    except (OSError, KeyError):
+        if resource is None:
+            return float("nan")
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --- PERFILADOR ---
+def configurar_registro(nivel=logging.INFO):
+    """Envía el logger `snc.perfil` a la salida de error si no tiene destino."""
+    if not REGISTRO.handlers:
+        manejador = logging.StreamHandler()
+        manejador.setFormatter(logging.Formatter("%(message)s"))
+        REGISTRO.addHandler(manejador)
+        REGISTRO.propagate = False
+    REGISTRO.setLevel(nivel)
+
+
+class Perfilador:
+    """Mediciones por etapa de una ejecución del script."""
+
+    def __init__(self, activo=False, registrar=False, cache=None, sesion=None):
+        self.activo = activo
+        self.registrar = activo and registrar
+        self.cache = cache
+        self.sesion = sesion or uuid.uuid4().hex[:8]
+        self.mediciones = {}
+        if self.registrar:
+            configurar_registro()
+
+    def _contadores_cache(self):
+        if self.cache is None:
+            return 0, 0
+        return self.cache.aciertos, self.cache.fallos
+
+    @contextmanager
+    def etapa(self, nombre, filas=None):
+        """Mide el bloque como parte de la etapa `nombre`; `filas` suma a las filas procesadas."""
+        registro = {"filas": filas}
+        if not self.activo:
+            yield registro
+            return
+
+        with _BLOQUEO_MEMORIA:
+            pico_disponible = reiniciar_pico()
+            memoria_inicial = memoria_actual()
+            aciertos, fallos = self._contadores_cache()
+            inicio = time.perf_counter()
+            try:
+                yield registro
+            finally:
+                segundos = time.perf_counter() - inicio
+                memoria = memoria_pico() - memoria_inicial if pico_disponible else float("nan")
+                aciertos_fin, fallos_fin = self._contadores_cache()
+                self._acumular(
+                    nombre, segundos, registro["filas"], memoria, aciertos_fin - aciertos, fallos_fin - fallos
+                )
+
+    def _acumular(self, nombre, segundos, filas, memoria, aciertos, fallos):
+        m = self.mediciones.setdefault(nombre, {
+            "llamadas": 0, "filas": 0, "segundos": 0.0, "memoria_mb": 0.0, "aciertos_cache": 0, "fallos_cache": 0,
+        })
+        m["llamadas"] += 1
+        m["filas"] += int(filas or 0)
+        m["segundos"] += segundos
+        if not math.isnan(memoria):
+            m["memoria_mb"] = max(m["memoria_mb"], memoria)
+        m["aciertos_cache"] += aciertos
+        m["fallos_cache"] += fallos
+        if self.registrar:
+            REGISTRO.info(json.dumps({
+                "evento": "etapa", "sesion": self.sesion, "etapa": nombre, "segundos": round(segundos, 6),
+                "filas": int(filas or 0), "memoria_mb": None if math.isnan(memoria) else round(memoria, 1),
+                "aciertos_cache": aciertos, "fallos_cache": fallos,
+            }, ensure_ascii=False))
+
+    @property
+    def total(self):
+        return sum(m["segundos"] for m in self.mediciones.values())
+
+    def tabla(self):
+        """Una fila por etapa (en el orden de `ETAPAS_PERFIL`, luego las demás)."""
+        orden = [e for e in ETAPAS_PERFIL if e in self.mediciones] + \
+                [e for e in self.mediciones if e not in ETAPAS_PERFIL]
+        total = self.total or 1.0
+        return pd.DataFrame({
+            "Etapa": orden,
+            "Llamadas": [self.mediciones[e]["llamadas"] for e in orden],
+            "Filas": [self.mediciones[e]["filas"] for e in orden],
+            "Tiempo (ms)": [self.mediciones[e]["segundos"] * 1000 for e in orden],
+            "% del total": [self.mediciones[e]["segundos"] / total * 100 for e in orden],
+            "Memoria pico del proceso (MB)": [self.mediciones[e]["memoria_mb"] for e in orden],
+            "Aciertos caché": [self.mediciones[e]["aciertos_cache"] for e in orden],
+            "Fallos caché": [self.mediciones[e]["fallos_cache"] for e in orden],
+        })
+
+    def cerrar(self):
+        """Registra el resumen de la ejecución (si el registro está activo)."""
+        if self.registrar:
+            REGISTRO.info(json.dumps({
+                "evento": "ejecucion", "sesion": self.sesion, "segundos": round(self.total, 6),
+                "etapas": {e: round(m["segundos"], 6) for e, m in self.mediciones.items()},
+                "memoria_mb": round(memoria_actual(), 1),
+            }, ensure_ascii=False))
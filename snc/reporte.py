@@ -0,0 +1,192 @@
+# Archivo: snc/reporte.py
+"""Reportes descargables del modelo (Excel de varias hojas y PDF), generados en el servidor.
+
+Los reportes se arman solo cuando se piden y no dependen de recursos externos:
+el Excel se escribe con xlsxwriter y el PDF con matplotlib (sin pyplot),
+importado dentro de `reporte_pdf` para no cargarlo con la app ni con el núcleo.
+`DatosReporte` solo guarda referencias a resultados ya calculados; las tablas
+de cada hoja se derivan al generar el reporte.
+"""
+
+import io
+from dataclasses import dataclass, fields
+
+import numpy as np
+import pandas as pd
+
+from snc.columnar import tabla_flujos
+from snc.motor import tasas_anuales, vector_descuento, vector_precios
+
+# Filas de la tabla de resultados que caben en la página del PDF
+FILAS_TABLA_PDF = 30
+TAMANO_PAGINA_PDF = (11.69, 8.27)  # A4 apaisado, pulgadas
+
+
+@dataclass
+class DatosReporte:
+    """Resultados ya calculados que alimentan los reportes."""
+
+    resultados: pd.DataFrame       # resultados e indicadores por solución
+    portafolio: object             # ResultadoPortafolio (flujos por solución)
+    escenarios: object             # ResultadoEscenarios
+    matriz_vpn: np.ndarray         # (tasas × precios)
+    precios: np.ndarray            # USD/tCO2e
+    tasas: np.ndarray              # en %
+    frontera_precio: np.ndarray    # precio de equilibrio por tasa
+    parametros: object             # Parametros
+
+
+# --- TABLAS DE LAS HOJAS ---
+def _valor_parametro(valor):
+    # Las curvas anuales van como texto (una celda por parámetro)
+    if isinstance(valor, tuple):
+        return ", ".join(f"{v:g}" for v in valor)
+    return valor
+
+
+def tabla_parametros(parametros):
+    return pd.DataFrame({
+        "Parámetro": [campo.name for campo in fields(parametros)],
+        "Valor": [_valor_parametro(getattr(parametros, campo.name)) for campo in fields(parametros)],
+    })
+
+
+def tabla_trayectorias(parametros, horizonte):
+    """Precio del carbono, tasa spot y factor de descuento de cada año del eje del portafolio."""
+    return pd.DataFrame({
+        "Año": np.arange(1, horizonte + 1),
+        "Precio del Carbono (USD/tCO2e)": vector_precios(parametros, horizonte),
+        "Tasa de Descuento (%)": tasas_anuales(parametros, horizonte) * 100,
+        "Factor de Descuento": vector_descuento(parametros, horizonte),
+    })
+
+
+def tabla_escenarios_reporte(escenarios):
+    """VPN por solución (filas) y escenario (columnas), con el total del portafolio."""
+    tabla = pd.DataFrame(escenarios.vpn.T, columns=list(escenarios.nombres))
+    tabla.insert(0, "Solución", escenarios.soluciones)
+    total = pd.DataFrame([["Total Portafolio", *escenarios.vpn.sum(axis=1)]], columns=tabla.columns)
+    return pd.concat([tabla, total], ignore_index=True)
+
+
+def tabla_sensibilidad_reporte(matriz_vpn, precios, tasas):
+    """Grilla de VPN: una fila por tasa de descuento y una columna por precio."""
+    tabla = pd.DataFrame(
+        np.asarray(matriz_vpn, dtype=float),
+        columns=[f"{p:,.2f} USD/t" for p in precios],
+    )
+    tabla.insert(0, "Tasa de Descuento (%)", np.asarray(tasas, dtype=float))
+    return tabla
+
+
+def hojas_reporte(datos):
+    """Hojas del reporte: nombre → DataFrame."""
+    return {
+        "Resultados": datos.resultados,
+        "Flujos Anuales": tabla_flujos(datos.portafolio).to_pandas(),
+        "Escenarios": tabla_escenarios_reporte(datos.escenarios),
+        "Sensibilidad VPN": tabla_sensibilidad_reporte(datos.matriz_vpn, datos.precios, datos.tasas),
+        "Parámetros": tabla_parametros(datos.parametros),
+        "Precio y Descuento": tabla_trayectorias(datos.parametros, datos.portafolio.horizonte),
+    }
+
+
+# --- EXCEL ---
+def libro_excel(hojas):
+    """Libro .xlsx (bytes) con una hoja por DataFrame; encabezados fijos y anchos ajustados."""
+    salida = io.BytesIO()
+    with pd.ExcelWriter(salida, engine="xlsxwriter") as writer:
+        for nombre, tabla in hojas.items():
+            tabla.to_excel(writer, sheet_name=nombre[:31], index=False)
+            hoja = writer.sheets[nombre[:31]]
+            hoja.freeze_panes(1, 1)
+            for i, columna in enumerate(tabla.columns):
+                hoja.set_column(i, i, min(max(len(str(columna)), 10) + 2, 40))
+    return salida.getvalue()
+
+
+def reporte_excel(datos):
+    """Resultados, flujos anuales, escenarios, grilla de sensibilidad, parámetros y trayectorias en un .xlsx."""
+    return libro_excel(hojas_reporte(datos))
+
+
+# --- PDF ---
+def _pagina_resumen(figura, datos):
+    resultados = datos.resultados
+    figura.text(0.05, 0.93, "Sumideros Naturales de Carbono — Reporte del Modelo", fontsize=16, weight="bold")
+    metricas = [
+        ("Soluciones", f"{len(resultados):,}"),
+        ("Área (ha)", f"{resultados['Área (ha)'].sum():,.0f}"),
+        ("Carbono Total (tCO2e)", f"{resultados['Carbono Total (tCO2e)'].sum():,.0f}"),
+        ("VPN del Portafolio (USD)", f"{resultados['VPN (USD)'].sum():,.0f}"),
+    ]
+    for i, (nombre, valor) in enumerate(metricas):
+        figura.text(0.05 + 0.23 * i, 0.84, nombre, fontsize=9, color="#666666")
+        figura.text(0.05 + 0.23 * i, 0.80, valor, fontsize=14, weight="bold", color="#003366")
+
+    eje = figura.add_axes([0.05, 0.05, 0.9, 0.68])
+    eje.axis("off")
+    columnas = ["Solución", "Área (ha)", "Carbono Total (tCO2e)", "VPN (USD)", "TIR (%)", "Año de Recuperación"]
+    columnas = [c for c in columnas if c in resultados.columns]
+    vista = resultados[columnas].head(FILAS_TABLA_PDF)
+    celdas = [
+        [str(v) if c == "Solución" else ("—" if pd.isna(v) else f"{v:,.1f}") for c, v in zip(columnas, fila)]
+        for fila in vista.itertuples(index=False)
+    ]
+    if celdas:
+        tabla = eje.table(cellText=celdas, colLabels=columnas, loc="upper center", cellLoc="right")
+        tabla.auto_set_font_size(False)
+        tabla.set_fontsize(7)
+        tabla.auto_set_column_width(list(range(len(columnas))))
+    if len(resultados) > FILAS_TABLA_PDF:
+        eje.set_title(f"Primeras {FILAS_TABLA_PDF} de {len(resultados):,} soluciones (detalle completo en el Excel)",
+                      fontsize=8, loc="left")
+
+
+def _pagina_flujos(figura, datos):
+    flujo_total = datos.portafolio.flujo_total
+    anios = np.arange(1, len(flujo_total) + 1)
+    eje = figura.add_subplot(1, 1, 1)
+    eje.bar(anios, flujo_total, color="#9ecae1", label="Flujo anual")
+    eje.plot(anios, np.cumsum(flujo_total), color="#003366", marker="o", markersize=3, label="Flujo acumulado")
+    eje.axhline(0, color="black", linewidth=0.8)
+    eje.set_title("Flujo de Caja del Portafolio")
+    eje.set_xlabel("Año del Proyecto")
+    eje.set_ylabel("USD")
+    eje.legend()
+
+
+def _pagina_escenarios(figura, datos):
+    vpn = datos.escenarios.vpn_portafolio
+    eje = figura.add_subplot(1, 1, 1)
+    eje.bar(np.arange(len(vpn)), vpn.to_numpy(), color="#3182bd")
+    eje.set_xticks(np.arange(len(vpn)), vpn.index, rotation=30, ha="right")
+    eje.axhline(0, color="black", linewidth=0.8)
+    eje.set_title("VPN del Portafolio por Escenario")
+    eje.set_ylabel("VPN (USD)")
+
+
+def _pagina_sensibilidad(figura, datos):
+    eje = figura.add_subplot(1, 1, 1)
+    malla = eje.pcolormesh(datos.precios, datos.tasas, datos.matriz_vpn, cmap="viridis", shading="nearest")
+    figura.colorbar(malla, ax=eje, label="VPN (USD)")
+    eje.plot(datos.frontera_precio, datos.tasas, color="white", linestyle="--", label="VPN = 0")
+    eje.set_xlim(datos.precios[0], datos.precios[-1])
+    eje.set_title("Sensibilidad VPN – Precio del Carbono vs Tasa de Descuento")
+    eje.set_xlabel("Precio del Carbono (USD/tCO₂e)")
+    eje.set_ylabel("Tasa de Descuento (%)")
+    eje.legend(loc="upper right")
+
+
+def reporte_pdf(datos):
+    """PDF (bytes): resumen con tabla de resultados, flujo de caja, escenarios y sensibilidad."""
+    from matplotlib.backends.backend_pdf import PdfPages
+    from matplotlib.figure import Figure
+
+    salida = io.BytesIO()
+    with PdfPages(salida) as pdf:
+        for pagina in (_pagina_resumen, _pagina_flujos, _pagina_escenarios, _pagina_sensibilidad):
+            figura = Figure(figsize=TAMANO_PAGINA_PDF)
+            pagina(figura, datos)
+            pdf.savefig(figura)
+    return salida.getvalue()
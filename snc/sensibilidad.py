@@ -0,0 +1,88 @@
+# Archivo: snc/sensibilidad.py
+"""Superficie de sensibilidad del VPN: Precio del Carbono × Tasa de Descuento.
+
+El flujo de caja es lineal en el precio del carbono, así que basta con dos
+evaluaciones del motor (precio 0 y precio 1) para obtener el flujo fijo y el
+flujo por USD de precio. La grilla completa se resuelve luego con una matriz
+de factores de descuento y un producto matricial.
+
+Con una curva de precios, el eje de precios de la grilla es el precio del
+primer año y la curva se escala con él. Las tasas de la grilla son tasas
+únicas: reemplazan la estructura de tasas de los parámetros.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+
+from snc.motor import N_ANIOS_DEFAULT, calcular_portafolio, preparar_soluciones
+
+
+def _portafolios_precio(df_soluciones, parametros, n_anios, columnas):
+    if columnas is None:
+        columnas = preparar_soluciones(df_soluciones)
+    # Precio 0 en todos los años y precio 1 en el primero, con la trayectoria de `parametros`
+    cero = calcular_portafolio(df_soluciones, replace(parametros, multiplicador_precio_carbono=0.0), n_anios, columnas)
+    uno = calcular_portafolio(df_soluciones, parametros.con_precio_base(1.0), n_anios, columnas)
+    return cero, uno
+
+
+def flujos_por_precio(df_soluciones, parametros, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """Flujos por solución (soluciones × años, desde su inicio) separados en parte fija y parte por USD/tCO2e.
+
+    El flujo a precio `p` (del primer año, ya multiplicado) es `fijo + p * unitario`.
+    """
+    cero, uno = _portafolios_precio(df_soluciones, parametros, n_anios, columnas)
+    return cero.flujos, uno.flujos - cero.flujos
+
+
+def componentes_precio(df_soluciones, parametros, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """Flujos del portafolio separados en parte fija y parte por USD/tCO2e.
+
+    Retorna `(flujo_fijo, flujo_unitario)`, ambos del largo del eje del
+    portafolio, tales que el flujo total a precio `p` es
+    `flujo_fijo + p * flujo_unitario`.
+    """
+    cero, uno = _portafolios_precio(df_soluciones, parametros, n_anios, columnas)
+    return cero.flujo_total, uno.flujo_total - cero.flujo_total
+
+
+def matriz_descuento(tasas, n_anios=N_ANIOS_DEFAULT):
+    """Matriz (tasas × años) de factores 1 / (1 + tasa)^(año + 1)."""
+    tasas = np.asarray(tasas, dtype=float)
+    return 1.0 / (1.0 + tasas[:, None]) ** np.arange(1, n_anios + 1)
+
+
+def superficie_desde_flujos(flujo_fijo, flujo_unitario, precios, tasas):
+    """VPN (tasas × precios) a partir de los flujos fijo y por USD del portafolio."""
+    descuento = matriz_descuento(tasas, len(flujo_fijo))
+    vpn_fijo = descuento @ flujo_fijo
+    vpn_unitario = descuento @ flujo_unitario
+    return vpn_fijo[:, None] + vpn_unitario[:, None] * np.asarray(precios, dtype=float)[None, :]
+
+
+def equilibrio_desde_flujos(flujo_fijo, flujo_unitario, tasas):
+    """Precio con VPN = 0 para cada tasa; NaN donde el VPN no depende del precio."""
+    descuento = matriz_descuento(tasas, len(flujo_fijo))
+    vpn_fijo = descuento @ flujo_fijo
+    vpn_unitario = descuento @ flujo_unitario
+    return np.divide(
+        -vpn_fijo, vpn_unitario,
+        out=np.full(len(vpn_fijo), np.nan), where=vpn_unitario != 0,
+    )
+
+
+def superficie_vpn(df_soluciones, parametros, precios, tasas, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """VPN del portafolio para cada combinación de tasa y precio.
+
+    `precios` en USD/tCO2e y `tasas` como fracción (0.05 = 5%). Retorna una
+    matriz de forma (len(tasas), len(precios)).
+    """
+    flujo_fijo, flujo_unitario = componentes_precio(df_soluciones, parametros, n_anios, columnas)
+    return superficie_desde_flujos(flujo_fijo, flujo_unitario, precios, tasas)
+
+
+def precio_equilibrio(df_soluciones, parametros, tasas, n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """Precio del carbono con VPN del portafolio = 0 para cada tasa."""
+    flujo_fijo, flujo_unitario = componentes_precio(df_soluciones, parametros, n_anios, columnas)
+    return equilibrio_desde_flujos(flujo_fijo, flujo_unitario, tasas)
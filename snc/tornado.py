@@ -0,0 +1,191 @@
+# Archivo: snc/tornado.py
+"""Análisis tornado: sensibilidad del VPN a un insumo a la vez.
+
+Cada insumo (precio, crecimiento del precio, captura, OPEX, CAPEX, duración,
+salvaguardas, pérdida evitada y tasa de descuento) se mueve hacia abajo y hacia
+arriba en todas las soluciones a la vez. Como las soluciones son independientes,
+la misma evaluación da el delta por solución y, sumado, el del portafolio.
+
+Las curvas de captura, su valor a los precios del eje y los factores de descuento
+se calculan una vez y se reutilizan: solo los insumos que cambian la forma de la
+curva (duración) o el crecimiento del precio piden un producto matricial nuevo.
+Con una curva de precios, el crecimiento solo mueve los años posteriores a la
+curva; la tasa de descuento escala todas las tasas de la estructura.
+"""
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from snc import eje
+from snc.curvas import claves_curva
+from snc.motor import N_ANIOS_DEFAULT, matriz_captura_ha, preparar_soluciones, vector_descuento, vector_precios
+
+# Variables del tornado: cambio relativo (±variación) o en puntos (±puntos)
+VARIABLES_TORNADO = {
+    "Precio del carbono": "relativo",
+    "Crecimiento del precio": "puntos",
+    "Captura por ha": "relativo",
+    "Costo anual (OPEX)": "relativo",
+    "CAPEX": "relativo",
+    "Duración": "relativo",
+    "Salvaguardas": "puntos",
+    "% Pérdida evitada": "relativo",
+    "Tasa de descuento": "relativo",
+}
+
+
+@dataclass
+class ResultadoTornado:
+    """VPN base y VPN con cada insumo abajo / arriba (variables × soluciones)."""
+
+    variables: list
+    soluciones: np.ndarray
+    vpn_base: np.ndarray
+    vpn_bajo: np.ndarray
+    vpn_alto: np.ndarray
+
+    def tabla(self, indice=None):
+        """Tornado del portafolio (o de la solución `indice`) ordenado por rango."""
+        import pandas as pd
+
+        if indice is None:
+            base, bajo, alto = self.vpn_base.sum(), self.vpn_bajo.sum(axis=1), self.vpn_alto.sum(axis=1)
+        else:
+            base, bajo, alto = self.vpn_base[indice], self.vpn_bajo[:, indice], self.vpn_alto[:, indice]
+        tabla = pd.DataFrame({
+            "Variable": self.variables,
+            "VPN Bajo (USD)": bajo,
+            "VPN Alto (USD)": alto,
+            "Δ Bajo (USD)": bajo - base,
+            "Δ Alto (USD)": alto - base,
+            "Rango (USD)": np.abs(alto - bajo),
+        })
+        return tabla.sort_values("Rango (USD)", ascending=False, ignore_index=True)
+
+    def tabla_soluciones(self):
+        """Delta de VPN por solución y variable, en formato largo."""
+        import pandas as pd
+
+        n_variables, n_soluciones = self.vpn_bajo.shape
+        return pd.DataFrame({
+            "Variable": np.repeat(np.asarray(self.variables, dtype=object), n_soluciones),
+            "Solución": np.tile(self.soluciones, n_variables),
+            "Δ Bajo (USD)": (self.vpn_bajo - self.vpn_base).ravel(),
+            "Δ Alto (USD)": (self.vpn_alto - self.vpn_base).ravel(),
+        })
+
+
+class _Precalculo:
+    """Curvas, valor de la captura a los precios del eje y descuentos, memorizados."""
+
+    def __init__(self, columnas, n_anios, parametros):
+        self.columnas = columnas
+        self.n_anios = n_anios
+        self.parametros = parametros
+        self._curvas = {}
+        self._valor = {}
+        self._descuento = {}
+
+    def curvas(self, duracion):
+        clave = duracion.tobytes()
+        if clave not in self._curvas:
+            n_anios_captura = max(self.n_anios, int(duracion.max()))
+            self._curvas[clave] = matriz_captura_ha({**self.columnas, "duracion": duracion}, n_anios_captura)
+        return self._curvas[clave]
+
+    def valor_captura(self, duracion, crecimiento):
+        """Σ captura_ha(t) · precio(inicio + t) por solución, con el crecimiento del precio indicado."""
+        clave = (duracion.tobytes(), crecimiento)
+        if clave not in self._valor:
+            curvas = self.curvas(duracion)
+            inicio = self.columnas["inicio"]
+            largo = int(inicio.max(initial=0)) + curvas.shape[1]
+            precios = vector_precios(replace(self.parametros, crecimiento_precio_carbono=crecimiento), largo)
+            self._valor[clave] = eje.ponderar(curvas, inicio, precios)
+        return self._valor[clave]
+
+    def descuento(self, factor_tasa, largo):
+        """Factores de descuento del eje (tasas × `factor_tasa`) y su suma acumulada."""
+        if (factor_tasa, largo) not in self._descuento:
+            multiplicador = self.parametros.multiplicador_tasa_descuento * factor_tasa
+            factores = vector_descuento(replace(self.parametros, multiplicador_tasa_descuento=multiplicador), largo)
+            self._descuento[factor_tasa, largo] = (factores, np.cumsum(factores))
+        return self._descuento[factor_tasa, largo]
+
+
+def _vpn(pre, parametros, duracion=None, factor_precio=1.0, crecimiento=None, factor_captura=1.0,
+         factor_costo=1.0, factor_capex=1.0, salvaguardas=None, factor_tasa=1.0):
+    """VPN por solución con los insumos indicados; equivale a `calcular_portafolio`."""
+    c = pre.columnas
+    duracion = c["duracion"] if duracion is None else duracion
+    crecimiento = parametros.crecimiento_precio_carbono if crecimiento is None else crecimiento
+    salvaguardas = c["salvaguardas"] if salvaguardas is None else salvaguardas
+
+    area_ajustada = c["area"] * parametros.multiplicador_area
+    captura = area_ajustada * (1 - salvaguardas / 100) * factor_captura
+    ingreso_carbono = factor_precio * captura * pre.valor_captura(duracion, crecimiento)
+
+    anios = np.arange(max(pre.n_anios, int(duracion.max())))
+    crecimiento_acumulado = np.cumsum((1 + parametros.crecimiento_ingreso_encadenado) ** anios)
+    ingreso_encadenado = c["ingreso_encadenado"] * np.where(
+        duracion > 0, crecimiento_acumulado[np.clip(duracion - 1, 0, None)], 0.0
+    )
+    costo_total = c["costo"] * factor_costo * area_ajustada * duracion
+    flujo_medio = np.divide(
+        ingreso_carbono + ingreso_encadenado - costo_total, duracion,
+        out=np.zeros(len(duracion)), where=duracion > 0,
+    )
+
+    # Σ descuento de los años inicio+1 .. inicio+dur-1, en el eje del portafolio
+    inicio = c["inicio"]
+    factores, acumulado = pre.descuento(factor_tasa, int(inicio.max(initial=0)) + len(anios))
+    ultimo = inicio + np.clip(duracion - 1, 0, None)
+    return flujo_medio * (acumulado[ultimo] - acumulado[inicio]) - c["capex"] * factor_capex * factores[inicio]
+
+
+def analisis_tornado(df_soluciones, parametros, variacion=0.2, puntos=0.01,
+                     n_anios=N_ANIOS_DEFAULT, columnas=None):
+    """VPN con cada insumo de `VARIABLES_TORNADO` movido ±`variacion` (relativa) o ±`puntos`.
+
+    `puntos` es una fracción: 0.01 mueve el crecimiento del precio ±1 punto y
+    las salvaguardas ±1 punto porcentual.
+    """
+    if columnas is None:
+        columnas = preparar_soluciones(df_soluciones)
+    pre = _Precalculo(columnas, n_anios, parametros)
+    base = _vpn(pre, parametros)
+    if len(base) == 0:
+        vacio = np.zeros((len(VARIABLES_TORNADO), 0))
+        return ResultadoTornado(list(VARIABLES_TORNADO), columnas["solucion"], base, vacio, vacio.copy())
+
+    # La pérdida evitada solo escala la captura constante de las soluciones de degradación
+    tipo, _ = claves_curva(columnas)
+    degradacion = (tipo == "constante") & (columnas["tipo_snc"] == "degradacion")
+    duracion = columnas["duracion"]
+    salvaguardas = columnas["salvaguardas"]
+
+    def cambios(signo):
+        relativo = 1 + signo * variacion
+        return {
+            "Precio del carbono": dict(factor_precio=relativo),
+            "Crecimiento del precio": dict(
+                crecimiento=max(parametros.crecimiento_precio_carbono + signo * puntos, -0.99)
+            ),
+            "Captura por ha": dict(factor_captura=relativo),
+            "Costo anual (OPEX)": dict(factor_costo=relativo),
+            "CAPEX": dict(factor_capex=relativo),
+            "Duración": dict(duracion=np.maximum(np.rint(duracion * relativo).astype(np.int64), 1)),
+            "Salvaguardas": dict(salvaguardas=np.clip(salvaguardas + signo * puntos * 100, 0, 100)),
+            "% Pérdida evitada": dict(factor_captura=np.where(degradacion, relativo, 1.0)),
+            "Tasa de descuento": dict(factor_tasa=relativo),
+        }
+
+    bajo, alto = cambios(-1), cambios(+1)
+    return ResultadoTornado(
+        variables=list(VARIABLES_TORNADO),
+        soluciones=columnas["solucion"],
+        vpn_base=base,
+        vpn_bajo=np.array([_vpn(pre, parametros, **bajo[v]) for v in VARIABLES_TORNADO]),
+        vpn_alto=np.array([_vpn(pre, parametros, **alto[v]) for v in VARIABLES_TORNADO]),
+    )
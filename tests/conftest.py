@@ -0,0 +1,39 @@
+# Archivo: tests/conftest.py
+"""Pone la raíz del repositorio en `sys.path` e incluye la tabla de soluciones de las pruebas."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snc.motor import SOLUCIONES_PREDETERMINADAS  # noqa: E402
+
+
+def tabla_soluciones(n, semilla=0):
+    """`n` soluciones del catálogo con áreas, duraciones e inicios aleatorios (nombres como texto)."""
+    rng = np.random.default_rng(semilla)
+    nombres = list(SOLUCIONES_PREDETERMINADAS)
+    fila = rng.integers(0, len(nombres), n)
+    catalogo = [SOLUCIONES_PREDETERMINADAS[nombres[i]] for i in fila]
+    area = rng.uniform(10, 1_000, n)
+    return pd.DataFrame({
+        "Solución": [nombres[i] for i in fila],
+        "Área (ha)": area,
+        "Costo anual por ha (USD)": [float(c["costo"]) for c in catalogo],
+        "CAPEX Total (USD)": np.array([c["capex"] for c in catalogo], dtype=float) * area,
+        "Duración (años)": np.clip(np.array([c["duracion"] for c in catalogo]) + rng.integers(-5, 6, n), 5, 40),
+        "Año de Inicio": rng.integers(0, 6, n),
+        "Salvaguardas (%)": rng.uniform(0, 20, n),
+        "Ingreso Encadenado (USD/año)": rng.uniform(0, 500, n),
+        "% Pérdida Evitada": [3.5 if c["tipo_sn"] == "degradacion" else 0.0 for c in catalogo],
+    })
+
+
+@pytest.fixture
+def soluciones_aleatorias():
+    """Fábrica `tabla_soluciones(n, semilla)` para las pruebas."""
+    return tabla_soluciones
@@ -0,0 +1,55 @@
+# Archivo: tests/test_almacen.py
+"""Tabla de soluciones por columnas: escrituras en sitio, orden al eliminar y copias."""
+
+import numpy as np
+import pytest
+
+from snc.almacen import TablaSoluciones
+
+
+@pytest.fixture
+def registros(soluciones_aleatorias):
+    return soluciones_aleatorias(40, semilla=13).to_dict("records")
+
+
+def test_ediciones_repetidas_no_reservan(registros):
+    tabla = TablaSoluciones.desde_registros(registros[:30])
+    inicial = tabla.columnas()
+    nbytes = tabla.nbytes
+    # Como en la app: cada ejecución pide las columnas y luego edita o elimina una fila
+    for i in range(25):
+        tabla.columnas()
+        tabla.editar(i % len(tabla), registros[30 + i % 10])
+        if i % 5 == 4:
+            tabla.columnas()
+            tabla.eliminar(0)
+    actuales = tabla.columnas()
+    for clave, valores in actuales.items():
+        assert np.shares_memory(valores, inicial[clave]), clave
+    assert tabla.nbytes == nbytes
+    assert len(tabla) == 25
+
+
+def test_eliminar_conserva_el_orden(registros):
+    tabla = TablaSoluciones.desde_registros(registros[:6])
+    nombres = [r["Solución"] for r in registros[:6]]
+    areas = [r["Área (ha)"] for r in registros[:6]]
+    tabla.eliminar(1)
+    tabla.eliminar(len(tabla) - 1)
+    tabla.eliminar(0)
+    assert [tabla.nombre(i) for i in range(len(tabla))] == [nombres[2], nombres[3], nombres[4]]
+    np.testing.assert_array_equal(tabla.columnas()["area"], [areas[2], areas[3], areas[4]])
+    assert tabla.a_dataframe()["Solución"].tolist() == [nombres[2], nombres[3], nombres[4]]
+
+
+def test_copia_no_cambia_al_escribir(registros):
+    tabla = TablaSoluciones.desde_registros(registros[:5])
+    copia = tabla.columnas(copia=True)
+    area = copia["area"].copy()
+    solucion = copia["solucion"].copy()
+    tabla.editar(0, registros[10])
+    tabla.eliminar(2)
+    for _ in range(20):
+        tabla.agregar(registros[11])
+    np.testing.assert_array_equal(copia["area"], area)
+    np.testing.assert_array_equal(copia["solucion"], solucion)
@@ -0,0 +1,131 @@
+# Archivo: tests/test_cache.py
+"""Cachés de resultados: límites del LRU en memoria y arreglos en disco (ida y vuelta
+mapeada, desalojo y disco sin escritura)."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.cache import CacheDisco, CacheLRU, huella, tamano_bytes
+
+
+class Contador:
+    def __init__(self, valor):
+        self.valor, self.llamadas = valor, 0
+
+    def __call__(self):
+        self.llamadas += 1
+        return self.valor
+
+
+def _mapeado(arreglo):
+    while arreglo is not None and not isinstance(arreglo, np.memmap):
+        arreglo = arreglo.base
+    return arreglo is not None
+
+
+@pytest.mark.parametrize("valor", [
+    np.arange(12.0).reshape(3, 4),
+    (np.arange(5), np.ones((2, 2))),
+    {"vpn": np.linspace(0, 1, 7), "horizonte": np.array([30]), "vacio": np.zeros((0, 30))},
+], ids=["arreglo", "tupla", "dict"])
+def test_ida_y_vuelta_mapeada(tmp_path, valor):
+    cache = CacheDisco(tmp_path, 2**20)
+    calcular = Contador(valor)
+    clave = huella("prueba", valor)
+    primero = cache.obtener(clave, calcular)
+    # Otra instancia sobre el mismo directorio: como tras un reinicio del servidor
+    segundo = CacheDisco(tmp_path, 2**20).obtener(clave, calcular)
+    assert calcular.llamadas == 1
+    assert type(segundo) is type(valor)
+
+    partes = {"0": valor} if isinstance(valor, np.ndarray) else (
+        dict(enumerate(valor)) if isinstance(valor, tuple) else valor)
+    leidas = {"0": segundo} if isinstance(segundo, np.ndarray) else (
+        dict(enumerate(segundo)) if isinstance(segundo, tuple) else segundo)
+    for nombre, esperado in partes.items():
+        np.testing.assert_array_equal(leidas[nombre], esperado)
+        np.testing.assert_array_equal(primero[nombre] if isinstance(primero, dict) else leidas[nombre], esperado)
+        if esperado.size:
+            assert _mapeado(leidas[nombre]), nombre
+            assert not leidas[nombre].flags.writeable
+
+
+def test_tipo_objeto_no_se_guarda(tmp_path):
+    cache = CacheDisco(tmp_path, 2**20)
+    calcular = Contador(np.array(["a", None], dtype=object))
+    cache.obtener("ab" * 32, calcular)
+    cache.obtener("ab" * 32, calcular)
+    assert calcular.llamadas == 2
+    assert cache.entradas() == []
+
+
+def test_desalojo_por_tamano(tmp_path):
+    cache = CacheDisco(tmp_path, 20_000)   # caben dos entradas de ~8 KB
+    claves = [huella("entrada", i) for i in range(3)]
+    for i, clave in enumerate(claves[:2]):
+        cache.obtener(clave, lambda: np.zeros(1_000))
+        os.utime(cache._ruta(clave), (1_000 + i, 1_000 + i))
+    # Usar la primera la vuelve la más reciente: se desaloja la segunda
+    cache.obtener(claves[0], lambda: pytest.fail("debía leerse del disco"))
+    cache.obtener(claves[2], lambda: np.zeros(1_000))
+    assert claves[0] in cache and claves[2] in cache
+    assert claves[1] not in cache
+    assert cache.nbytes <= 20_000
+
+
+def test_sin_escritura_devuelve_lo_calculado(tmp_path):
+    # El directorio del caché es un archivo: no se puede crear nada debajo
+    bloqueado = tmp_path / "cache_snc"
+    bloqueado.write_text("")
+    cache = CacheDisco(bloqueado, 2**20)
+    valor = {"vpn": np.arange(3.0)}
+    calcular = Contador(valor)
+    assert cache.obtener(huella("x"), calcular) is valor
+    assert cache.obtener(huella("x"), calcular) is valor
+    assert calcular.llamadas == 2
+    assert cache.entradas() == []
+
+
+def test_lru_desaloja_por_numero_de_entradas():
+    cache = CacheLRU(max_entradas=2)
+    for clave in "abc":
+        cache.obtener(clave, lambda: 1)
+    assert "a" not in cache and len(cache) == 2
+    cache.obtener("b", lambda: 1)
+    cache.obtener("d", lambda: 1)
+    assert "c" not in cache and "b" in cache
+
+
+def test_lru_desaloja_por_bytes():
+    cache = CacheLRU(max_entradas=100, max_bytes=2000)
+    for clave in "abc":
+        cache.obtener(clave, lambda: np.zeros(100))
+    assert "a" not in cache and len(cache) == 2
+    assert cache.nbytes == 1600
+
+    # un valor más grande que el límite se devuelve sin desalojar nada
+    grande = cache.obtener("g", lambda: np.zeros(1000))
+    assert grande.shape == (1000,) and "g" not in cache and len(cache) == 2
+
+    cache.limpiar()
+    assert cache.nbytes == 0 and len(cache) == 0
+
+
+def test_tamano_bytes():
+    arreglo = np.zeros(10)
+    tabla = pd.DataFrame({"x": ["abc"] * 10})
+    assert tamano_bytes(arreglo) == 80
+    assert tamano_bytes(tabla) == tabla.memory_usage(deep=True).sum()
+    # un arreglo compartido se cuenta una sola vez
+    assert tamano_bytes((arreglo, arreglo)) == sys.getsizeof((arreglo, arreglo)) + 80
+
+
+def test_arreglo_mapeado_no_cuenta(tmp_path):
+    disco = CacheDisco(tmp_path, 10**7)
+    disco.obtener(huella("m"), lambda: np.zeros(1000))
+    mapeado = disco.obtener(huella("m"), lambda: None)
+    assert tamano_bytes(mapeado) == 0
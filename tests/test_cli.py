@@ -0,0 +1,124 @@
+# Archivo: tests/test_cli.py
+"""Ejecución por lotes: resumen y archivos escritos, nombres únicos, errores y corridas guardadas."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.cli import cargar_parametros, main, nombres_salida
+from snc.corridas import AlmacenCorridas
+from snc.motor import Parametros, calcular_portafolio
+
+
+@pytest.fixture
+def entradas(tmp_path, soluciones_aleatorias):
+    """Dos tablas de soluciones en Parquet y dos archivos de parámetros."""
+    tablas = []
+    for i, semilla in enumerate((3, 4)):
+        ruta = tmp_path / f"region{i}.parquet"
+        soluciones_aleatorias(6, semilla=semilla).to_parquet(ruta, index=False)
+        tablas.append(str(ruta))
+    parametros = []
+    for nombre, datos in (("base", {}), ("alto", {"precio_carbono": 40, "n_anios": 25})):
+        ruta = tmp_path / f"{nombre}.json"
+        ruta.write_text(json.dumps(datos), encoding="utf-8")
+        parametros.append(str(ruta))
+    return tablas, parametros
+
+
+def test_resumen_y_archivos(tmp_path, entradas):
+    tablas, parametros = entradas
+    salida = tmp_path / "salida"
+    assert main([*tablas, "-p", *parametros, "-o", str(salida), "-f", "csv"]) == 0
+
+    resumen = pd.read_csv(salida / "resumen.csv")
+    assert len(resumen) == 4
+    for tabla in tablas:
+        for ruta_par in parametros:
+            nombre = f"{tabla.rsplit('/', 1)[-1][:-8]}__{ruta_par.rsplit('/', 1)[-1][:-5]}"
+            assert (salida / f"{nombre}_resultados.csv").exists()
+            assert (salida / f"{nombre}_flujos.csv").exists()
+
+    # La fila coincide con el motor
+    par, n_anios = cargar_parametros(parametros[1])
+    esperado = calcular_portafolio(pd.read_parquet(tablas[0]), par, n_anios)
+    fila = resumen[(resumen["Soluciones"] == tablas[0]) & (resumen["Parámetros"] == parametros[1])].iloc[0]
+    assert fila["VPN (USD)"] == pytest.approx(esperado.vpn.sum())
+    assert fila["Carbono Total (tCO2e)"] == pytest.approx(esperado.carbono_total.sum())
+    assert fila["precio_carbono"] == 40
+
+
+def test_procesos_en_paralelo_igual_que_en_serie(tmp_path, entradas):
+    tablas, parametros = entradas
+    serie, paralelo = tmp_path / "serie", tmp_path / "paralelo"
+    assert main([*tablas, "-p", *parametros, "-o", str(serie)]) == 0
+    assert main([*tablas, "-p", *parametros, "-o", str(paralelo), "-j", "2"]) == 0
+    pd.testing.assert_frame_equal(pd.read_csv(serie / "resumen.csv"), pd.read_csv(paralelo / "resumen.csv"))
+    assert sorted(p.name for p in serie.iterdir()) == sorted(p.name for p in paralelo.iterdir())
+
+
+def test_corridas_reutilizadas(tmp_path, entradas):
+    tablas, parametros = entradas
+    base = tmp_path / "corridas.sqlite"
+    argumentos = [tablas[0], "-p", parametros[0], "-o", str(tmp_path / "salida"), "--corridas", str(base)]
+    assert main(argumentos) == 0
+    primero = pd.read_csv(tmp_path / "salida" / "resumen.csv")
+    assert main(argumentos) == 0
+    segundo = pd.read_csv(tmp_path / "salida" / "resumen.csv")
+
+    historial = AlmacenCorridas(base).corridas()
+    assert len(historial) == 1 and historial["Origen"].iloc[0] == "cli"
+    pd.testing.assert_frame_equal(primero, segundo)
+
+
+def test_parametros_desconocidos(tmp_path, entradas, capsys):
+    tablas, parametros = entradas
+    malo = tmp_path / "malo.json"
+    malo.write_text(json.dumps({"precio_carbon": 30}), encoding="utf-8")
+    with pytest.raises(ValueError, match="precio_carbon"):
+        cargar_parametros(malo)
+
+    salida = tmp_path / "salida"
+    assert main([tablas[0], "-p", parametros[0], str(malo), "-o", str(salida)]) == 1
+    assert "precio_carbon" in capsys.readouterr().err
+    # Las combinaciones válidas se escriben igual
+    assert len(pd.read_csv(salida / "resumen.csv")) == 1
+
+
+def test_cargar_parametros_con_curvas(tmp_path):
+    ruta = tmp_path / "curvas.json"
+    ruta.write_text(json.dumps({"curva_precio": [10, 12, 14], "tasa_descuento": 0.05, "n_anios": 20}))
+    parametros, n_anios = cargar_parametros(ruta)
+    assert parametros == Parametros(curva_precio=(10.0, 12.0, 14.0), tasa_descuento=0.05)
+    assert n_anios == 20
+
+
+def test_nombres_salida_unicos():
+    assert nombres_salida(["a/sol.xlsx", "b/otra.parquet"]) == ["sol", "otra"]
+    nombres = nombres_salida(["sol.xlsx", "sol.parquet", "a/x.parquet", "b/x.parquet"])
+    assert nombres == ["sol_xlsx", "sol_parquet", "a_x_parquet", "b_x_parquet"]
+    # Una ruta absoluta no sale del directorio de salida
+    assert nombres_salida(["/a/x.parquet", "/b/x.parquet"]) == ["a_x_parquet", "b_x_parquet"]
+    # Rutas distintas que colapsan al mismo nombre
+    nombres = nombres_salida(["a_b/x.parquet", "a/b_x.parquet"])
+    assert len(set(nombres)) == 2
+
+
+def test_mismo_nombre_no_sobrescribe(tmp_path, soluciones_aleatorias):
+    rutas = []
+    for carpeta, semilla in (("a", 1), ("b", 2)):
+        (tmp_path / carpeta).mkdir()
+        ruta = tmp_path / carpeta / "x.parquet"
+        soluciones_aleatorias(4, semilla=semilla).to_parquet(ruta, index=False)
+        rutas.append(str(ruta))
+    parametros = tmp_path / "base.json"
+    parametros.write_text("{}")
+    salida = tmp_path / "salida"
+    assert main([*rutas, "-p", str(parametros), "-o", str(salida), "-f", "xlsx"]) == 0
+
+    libros = sorted(salida.glob("*.xlsx"))
+    assert len(libros) == 2
+    vpn = [pd.read_excel(libro, sheet_name="Resultados")["VPN (USD)"].sum() for libro in libros]
+    assert not np.isclose(vpn[0], vpn[1])
@@ -0,0 +1,46 @@
+# Archivo: tests/test_columnar.py
+"""Ida y vuelta Parquet / Arrow IPC y proyección de columnas al leer."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.columnar import exportar, leer_soluciones, leer_soluciones_arrow, leer_soluciones_parquet, tabla_flujos
+from snc.motor import Parametros, calcular_portafolio
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def tabla(soluciones_aleatorias):
+    return soluciones_aleatorias(30, semilla=4).assign(**{"Notas de campo": "sin revisar"})
+
+
+@pytest.mark.parametrize("formato", ["parquet", "arrow"])
+def test_ida_y_vuelta(tabla, formato):
+    leido = leer_soluciones(exportar(tabla, formato), f"soluciones.{formato}")
+    # La columna que el modelo no usa no se lee
+    assert "Notas de campo" not in leido
+    esperado = tabla.drop(columns="Notas de campo")
+    assert list(leido.columns) == list(esperado.columns)
+    assert leido["Solución"].astype(str).tolist() == esperado["Solución"].tolist()
+    assert leido["Duración (años)"].dtype == np.int16
+    for columna in esperado.columns.drop("Solución"):
+        np.testing.assert_allclose(leido[columna].to_numpy(dtype=float), esperado[columna], rtol=1e-6, err_msg=columna)
+
+
+@pytest.mark.parametrize("leer, formato", [(leer_soluciones_parquet, "parquet"), (leer_soluciones_arrow, "arrow")])
+def test_proyeccion_pedida(tabla, leer, formato):
+    columnas = ["Solución", "Área (ha)", "Costo anual por ha (USD)", "CAPEX Total (USD)", "Duración (años)",
+                "No existe"]
+    leido = leer(exportar(tabla, formato), columnas=columnas)
+    assert list(leido.columns) == columnas[:-1]
+
+
+def test_tabla_flujos_igual_al_eje(tabla):
+    portafolio = calcular_portafolio(tabla, Parametros())
+    leido = pd.read_parquet(io.BytesIO(exportar(tabla_flujos(portafolio), "parquet")))
+    assert leido.shape == (len(tabla), portafolio.horizonte + 1)
+    np.testing.assert_allclose(leido.drop(columns="Solución").to_numpy(), portafolio.flujos_eje())
@@ -0,0 +1,97 @@
+# Archivo: tests/test_corridas.py
+"""Historial SQLite: corridas idénticas servidas desde la base e invalidadas por versión."""
+
+import numpy as np
+import pytest
+
+from snc import corridas
+from snc.cache import CacheDisco, huella
+from snc.corridas import AlmacenCorridas
+from snc.motor import ARREGLOS_RESULTADO, Parametros, calcular_portafolio
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def portafolio(soluciones_aleatorias):
+    return soluciones_aleatorias(12, semilla=17)
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    return AlmacenCorridas(tmp_path / "corridas.sqlite")
+
+
+class Contador:
+    def __init__(self, df, parametros):
+        self.df, self.parametros, self.llamadas = df, parametros, 0
+
+    def __call__(self):
+        self.llamadas += 1
+        return calcular_portafolio(self.df, self.parametros, N_ANIOS)
+
+
+def test_obtener_ida_y_vuelta(almacen, portafolio):
+    parametros = Parametros(precio_carbono=20.0, crecimiento_precio_carbono=0.01)
+    calcular = Contador(portafolio, parametros)
+    huella_soluciones = huella(portafolio)
+
+    calculado = almacen.obtener(huella_soluciones, parametros, N_ANIOS, calcular, "prueba")
+    leido = almacen.obtener(huella_soluciones, parametros, N_ANIOS, calcular, "prueba")
+    assert calcular.llamadas == 1
+    for campo in ARREGLOS_RESULTADO:
+        np.testing.assert_array_equal(getattr(leido, campo), getattr(calculado, campo), err_msg=campo)
+    assert list(leido.solucion) == list(calculado.solucion)
+    assert leido.horizonte == calculado.horizonte
+
+    # Otros parámetros: otra corrida
+    almacen.obtener(huella_soluciones, Parametros(precio_carbono=25.0), N_ANIOS, calcular)
+    assert calcular.llamadas == 2
+    tabla = almacen.corridas(portafolio=huella_soluciones)
+    assert len(tabla) == 2
+    assert tabla.loc[tabla["Origen"] == "prueba", "VPN (USD)"].item() == pytest.approx(calculado.vpn.sum())
+    anual = almacen.anual(int(tabla["Corrida"].min()))
+    assert anual["Año"].tolist() == list(range(1, calculado.horizonte + 1))
+    np.testing.assert_allclose(anual["Flujo (USD)"], calculado.flujo_total)
+
+
+def test_otra_version_no_es_identica(almacen, portafolio, monkeypatch):
+    parametros = Parametros()
+    calcular = Contador(portafolio, parametros)
+    almacen.obtener(huella(portafolio), parametros, N_ANIOS, calcular)
+    monkeypatch.setattr(corridas, "VERSION_MODELO", corridas.VERSION_MODELO + 1)
+    assert almacen.buscar(huella(portafolio), parametros, N_ANIOS) is None
+    almacen.obtener(huella(portafolio), parametros, N_ANIOS, calcular)
+    assert calcular.llamadas == 2
+    # Las dos corridas quedan en el historial
+    assert len(almacen.corridas(portafolio=huella(portafolio))) == 2
+
+
+def test_otra_version_no_se_sirve_del_disco(tmp_path, portafolio, monkeypatch):
+    disco = CacheDisco(tmp_path / "cache", 10**8)
+    huella_soluciones = huella(portafolio)
+    calcular = lambda: calcular_portafolio(portafolio, Parametros(), N_ANIOS).flujos  # noqa: E731
+    llamadas = []
+
+    def contado():
+        llamadas.append(1)
+        return calcular()
+
+    disco.obtener(corridas.clave_resultado("flujos", huella_soluciones, N_ANIOS), contado)
+    disco.obtener(corridas.clave_resultado("flujos", huella_soluciones, N_ANIOS), contado)
+    assert len(llamadas) == 1
+    monkeypatch.setattr(corridas, "VERSION_MODELO", corridas.VERSION_MODELO + 1)
+    disco.obtener(corridas.clave_resultado("flujos", huella_soluciones, N_ANIOS), contado)
+    assert len(llamadas) == 2 and disco.fallos == 2
+
+
+def test_evolucion_por_solucion(almacen, portafolio):
+    nombre = portafolio["Solución"].iloc[0]
+    for precio in (10.0, 20.0, 30.0):
+        parametros = Parametros(precio_carbono=precio)
+        almacen.guardar(calcular_portafolio(portafolio, parametros, N_ANIOS), parametros, N_ANIOS, huella(portafolio))
+    evolucion = almacen.evolucion(nombre, limite=2)
+    assert len(evolucion) == 2
+    assert evolucion["Corrida"].is_monotonic_decreasing
+    esperado = calcular_portafolio(portafolio, Parametros(precio_carbono=30.0), N_ANIOS)
+    assert evolucion["VPN (USD)"].iloc[0] == pytest.approx(esperado.vpn[esperado.solucion == nombre].sum())
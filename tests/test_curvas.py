@@ -0,0 +1,82 @@
+# Archivo: tests/test_curvas.py
+"""Biblioteca de curvas: cada fila recibe la curva de su fórmula y las curvas se comparten."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.curvas import curva_ha, curvas_por_fila
+from snc.motor import matriz_captura_ha, preparar_soluciones
+
+N_ANIOS = 45
+
+
+def _curva_directa(columnas, i, n_anios):
+    """Curva de la fila `i` con la fórmula de su tipo, sin pasar por la biblioteca."""
+    anios = np.arange(n_anios)
+    duracion = int(columnas["duracion"][i])
+    tipo = columnas["tipo_captura"][i]
+    if tipo == "lineal":
+        curva = np.zeros(n_anios)
+        curva[:duracion] = np.linspace(columnas["captura_inicial"][i], columnas["captura_final"][i], duracion)[:n_anios]
+    elif tipo == "sigmoidal":
+        curva = columnas["captura_maxima"][i] / (
+            1 + np.exp(-columnas["velocidad"][i] * (anios - columnas["punto_medio"][i]))
+        )
+    elif tipo == "chapman_richards":
+        curva = columnas["captura_maxima"][i] * (1 - np.exp(-columnas["velocidad"][i] * (anios + 1))) ** columnas["forma"][i]
+    else:
+        curva = np.full(n_anios, columnas["captura"][i])
+        if columnas["tipo_snc"][i] == "degradacion":
+            curva = curva * columnas["perdida_evitada"][i] / 100
+    return np.where(anios < duracion, curva, 0.0)
+
+
+@pytest.fixture
+def columnas(soluciones_aleatorias):
+    tabla = soluciones_aleatorias(300, semilla=11)
+    chapman = pd.DataFrame({
+        "Solución": ["Plantación"] * 3,
+        "Área (ha)": 50.0,
+        "Duración (años)": [20, 30, 60],
+        "Tipo Captura": "chapman_richards",
+        "Captura Máxima": [12.0, 8.0, 8.0],
+        "Velocidad": [0.1, 0.05, 0.05],
+        "Forma": [2.0, 3.0, 3.0],
+    })
+    return preparar_soluciones(pd.concat([tabla, chapman], ignore_index=True))
+
+
+def test_curvas_por_fila_igual_a_la_formula(columnas):
+    curvas, codigos = curvas_por_fila(columnas, N_ANIOS)
+    matriz = matriz_captura_ha(columnas, N_ANIOS)
+    assert matriz.shape == (len(codigos), N_ANIOS)
+    assert len(curvas) < len(codigos)
+    for i in range(len(codigos)):
+        esperada = _curva_directa(columnas, i, N_ANIOS)
+        np.testing.assert_allclose(matriz[i], esperada, rtol=1e-12, atol=1e-12, err_msg=f"fila {i}")
+
+
+def test_filas_iguales_comparten_curva(columnas):
+    curvas, codigos = curvas_por_fila(columnas, N_ANIOS)
+    # Curvas distintas por grupo y filas del mismo grupo con la misma curva
+    assert len(np.unique(curvas, axis=0)) == len(curvas)
+    for k in range(len(curvas)):
+        filas = np.flatnonzero(codigos == k)
+        assert len(filas) and all(np.array_equal(matriz, curvas[k]) for matriz in matriz_captura_ha(columnas, N_ANIOS)[filas])
+
+
+def test_curva_ha_memorizada_y_solo_lectura():
+    curva_ha.cache_clear()
+    primera = curva_ha("sigmoidal", (10.0, 0.3, 8.0), 25, N_ANIOS)
+    segunda = curva_ha("sigmoidal", (10.0, 0.3, 8.0), 25, N_ANIOS)
+    assert segunda is primera
+    assert curva_ha.cache_info().hits == 1 and curva_ha.cache_info().misses == 1
+    assert not primera.flags.writeable
+    with pytest.raises(ValueError):
+        primera[0] = 1.0
+    assert np.all(primera[25:] == 0)
+
+
+def test_tipo_desconocido_es_constante():
+    np.testing.assert_array_equal(curva_ha("otro", (4.0,), 3, 5), [4.0, 4.0, 4.0, 0.0, 0.0])
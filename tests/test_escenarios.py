@@ -0,0 +1,109 @@
+# Archivo: tests/test_escenarios.py
+"""El lote de escenarios debe coincidir con el motor evaluado escenario por escenario."""
+
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.escenarios import (
+    curvas_desde_tabla,
+    escenarios_desde_tabla,
+    evaluar_escenarios,
+    tabla_curvas,
+    tabla_escenarios,
+)
+from snc.motor import Parametros, calcular_portafolio
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def portafolio(soluciones_aleatorias):
+    return soluciones_aleatorias(60, semilla=3)
+
+
+def test_escenarios_igual_al_motor(portafolio):
+    escenarios = [
+        Parametros(precio_carbono=12.0),
+        Parametros(precio_carbono=20.0, crecimiento_precio_carbono=0.03, multiplicador_area=1.5),
+        Parametros(tasa_descuento=0.09, crecimiento_ingreso_encadenado=0.02),
+    ]
+    resultado = evaluar_escenarios(portafolio, escenarios, N_ANIOS)
+    for i, parametros in enumerate(escenarios):
+        motor = calcular_portafolio(portafolio, parametros, N_ANIOS)
+        np.testing.assert_allclose(resultado.vpn[i], motor.vpn, rtol=1e-9)
+        np.testing.assert_allclose(resultado.carbono_total[i], motor.carbono_total, rtol=1e-12)
+
+
+def test_tabla_ida_y_vuelta():
+    base = Parametros(crecimiento_ingreso_encadenado=0.01)
+    escenarios = [Parametros(precio_carbono=12.0), Parametros(tasa_descuento=0.08, multiplicador_area=2.0)]
+    tabla = tabla_escenarios(escenarios, ["Bajo", "Alto"])
+    # Una celda vacía toma el valor de la base
+    tabla.loc[0, "Crecimiento Encadenado (%)"] = None
+    leidos = escenarios_desde_tabla(tabla, base)
+    assert [nombre for nombre, _ in leidos] == ["Bajo", "Alto"]
+    assert leidos[0][1] == Parametros(precio_carbono=12.0, crecimiento_ingreso_encadenado=0.01)
+    alto = leidos[1][1]
+    assert (alto.tasa_descuento, alto.multiplicador_area) == (pytest.approx(0.08), 2.0)
+    assert alto.crecimiento_ingreso_encadenado == pytest.approx(0.0)
+
+
+def test_curvas_igual_al_motor(portafolio):
+    escenarios = [
+        Parametros(curva_precio=[10.0, 12.0, 15.0], curva_descuento=[0.03, 0.04, 0.05]),
+        Parametros(precio_carbono=20.0, curva_descuento=[0.08, 0.06]),
+    ]
+    resultado = evaluar_escenarios(portafolio, escenarios, N_ANIOS)
+    for i, parametros in enumerate(escenarios):
+        motor = calcular_portafolio(portafolio, parametros, N_ANIOS)
+        np.testing.assert_allclose(resultado.vpn[i], motor.vpn, rtol=1e-9)
+
+
+def test_precio_de_la_fila_escala_la_curva():
+    base = Parametros(curva_precio=[10.0, 12.0, 15.0])
+    tabla = tabla_escenarios([base, base])
+    # La columna de precio muestra el primer año de la curva
+    assert tabla["Precio Carbono (USD/t)"].tolist() == [10.0, 10.0]
+    tabla.loc[1, "Precio Carbono (USD/t)"] = 20.0
+    (_, igual), (_, escalada) = escenarios_desde_tabla(tabla, base)
+    assert igual.curva_precio == (10.0, 12.0, 15.0)
+    assert escalada.curva_precio == pytest.approx((20.0, 24.0, 30.0))
+
+
+def test_tabla_curvas_usa_la_curva_cargada():
+    base = Parametros(precio_carbono=15.0)
+    curvas = {"curva_precio": {"Regulado": (25.0, 30.0)}, "curva_descuento": {}}
+    tabla = tabla_curvas(base, curvas["curva_precio"])
+    (_, regulado), = escenarios_desde_tabla(tabla, base, curvas)
+    assert regulado.curva_precio == (25.0, 30.0)
+    # Un precio escrito en la fila escala la curva cargada
+    tabla.loc[0, "Precio Carbono (USD/t)"] = 50.0
+    (_, escalada), = escenarios_desde_tabla(tabla, base, curvas)
+    assert escalada.curva_precio == pytest.approx((50.0, 60.0))
+
+
+def test_curva_de_precios_que_empieza_en_cero():
+    tabla = pd.DataFrame({"Año": [2025, 2026], "Regulado": [0.0, 30.0], "Voluntario": [5.0, 6.0]})
+    with pytest.raises(ValueError, match="Regulado"):
+        curvas_desde_tabla(tabla, precios=True)
+    # Las estructuras de tasas sí pueden empezar en cero
+    assert curvas_desde_tabla(tabla, escala=0.01)["Regulado"] == pytest.approx((0.0, 0.3))
+
+
+def test_precio_cero_con_curva(portafolio):
+    base = Parametros(curva_precio=[10.0, 12.0, 15.0], crecimiento_precio_carbono=0.03)
+    tabla = tabla_escenarios([base, base])
+    tabla.loc[1, "Precio Carbono (USD/t)"] = 0.0
+    (_, igual), (_, sin_precio) = escenarios_desde_tabla(tabla, base)
+    assert igual.curva_precio == (10.0, 12.0, 15.0)
+    # Precio cero en todos los años: lo mismo que la curva multiplicada por cero
+    resultado = evaluar_escenarios(portafolio, [sin_precio], N_ANIOS)
+    motor = calcular_portafolio(portafolio, replace(base, multiplicador_precio_carbono=0.0), N_ANIOS)
+    np.testing.assert_allclose(resultado.vpn[0], motor.vpn, rtol=1e-9)
+
+    tabla.loc[1, "Precio Carbono (USD/t)"] = -5.0
+    with pytest.raises(ValueError, match="positivo"):
+        escenarios_desde_tabla(tabla, base)
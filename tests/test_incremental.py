@@ -0,0 +1,107 @@
+# Archivo: tests/test_incremental.py
+"""El portafolio incremental debe coincidir con un recálculo completo tras cada cambio."""
+
+import numpy as np
+import pytest
+
+from snc.almacen import TablaSoluciones
+from snc.incremental import PortafolioIncremental
+from snc.motor import Parametros, calcular_portafolio
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def registros(soluciones_aleatorias):
+    return soluciones_aleatorias(25, semilla=7).to_dict("records")
+
+
+CAMPOS_COPIADOS = ("vpn", "flujos", "captura", "solucion", "capex", "inicio")
+
+
+def _igual_al_recalculo(incremental):
+    completo = calcular_portafolio(None, incremental.parametros, N_ANIOS, incremental.soluciones.columnas())
+    r = incremental.resultado()
+    assert list(r.solucion) == list(completo.solucion)
+    assert r.horizonte == completo.horizonte
+    for campo in ("vpn", "carbono_total", "ingreso_total", "costo_total", "area", "capex", "inicio"):
+        np.testing.assert_allclose(getattr(r, campo), getattr(completo, campo), rtol=1e-10, err_msg=campo)
+    # Los totales por diferencia pueden tener ceros de más al final (el eje solo crece)
+    for total in ("flujo_total", "captura_total"):
+        esperado = getattr(completo, total)
+        obtenido = getattr(incremental, total)
+        np.testing.assert_allclose(obtenido[:len(esperado)], esperado, rtol=1e-9, atol=1e-6, err_msg=total)
+        np.testing.assert_allclose(obtenido[len(esperado):], 0.0, atol=1e-6, err_msg=total)
+
+
+def test_agregar_editar_eliminar(registros):
+    incremental = PortafolioIncremental(Parametros(crecimiento_precio_carbono=0.02), N_ANIOS)
+    for registro in registros[:20]:
+        incremental.agregar(registro)
+    _igual_al_recalculo(incremental)
+    assert incremental.evaluaciones == 20
+
+    incremental.editar(3, registros[20])
+    incremental.editar(0, {**registros[21], "Duración (años)": 45, "Año de Inicio": 4})
+    _igual_al_recalculo(incremental)
+
+    for indice in (5, 0, None):
+        incremental.eliminar(len(incremental) - 1 if indice is None else indice)
+        _igual_al_recalculo(incremental)
+    assert len(incremental) == 17
+    assert incremental.evaluaciones == 22
+
+    incremental.actualizar_parametros(Parametros(precio_carbono=25.0, tasa_descuento=0.07))
+    _igual_al_recalculo(incremental)
+
+
+
+def test_editar_desde_registro(registros):
+    """Como el formulario de edición de la app: la fila actual con algunos campos cambiados."""
+    incremental = PortafolioIncremental(Parametros(), N_ANIOS)
+    for registro in registros[:5]:
+        incremental.agregar(registro)
+    actual = incremental.soluciones.registro(2)
+    incremental.editar(2, {**actual, "Área (ha)": actual["Área (ha)"] * 2, "Duración (años)": 12})
+    assert incremental.soluciones.registro(2) == {**actual, "Área (ha)": actual["Área (ha)"] * 2, "Duración (años)": 12}
+    assert incremental.evaluaciones == 6
+    _igual_al_recalculo(incremental)
+
+def test_eliminar_todo(registros):
+    incremental = PortafolioIncremental(Parametros(), N_ANIOS)
+    for registro in registros[:3]:
+        incremental.agregar(registro)
+    while len(incremental):
+        incremental.eliminar(0)
+    assert len(incremental.resultado().vpn) == 0
+    np.testing.assert_allclose(incremental.flujo_total, 0.0, atol=1e-6)
+
+
+def test_resultados_entregados_no_cambian(registros):
+    incremental = PortafolioIncremental(Parametros(), N_ANIOS)
+    for registro in registros[:6]:
+        incremental.agregar(registro)
+    anterior = incremental.resultado()
+    copia = {campo: np.array(getattr(anterior, campo), copy=True) for campo in CAMPOS_COPIADOS}
+
+    incremental.editar(1, registros[10])
+    despues_de_editar = incremental.resultado()
+    incremental.eliminar(0)
+    incremental.eliminar(len(incremental) - 1)
+
+    assert despues_de_editar is not anterior
+    for campo, valores in copia.items():
+        np.testing.assert_array_equal(getattr(anterior, campo), valores, err_msg=campo)
+    assert len(despues_de_editar.vpn) == 6
+
+
+def test_resultado_reconstruido_no_ve_la_tabla(registros):
+    # Tras una reconstrucción completa los resultados no deben compartir memoria con la tabla,
+    # que se edita en sitio
+    incremental = PortafolioIncremental(Parametros(), N_ANIOS, TablaSoluciones.desde_registros(registros[:5]))
+    anterior = incremental.resultado()
+    copia = {campo: np.array(getattr(anterior, campo), copy=True) for campo in CAMPOS_COPIADOS}
+    incremental.editar(0, registros[12])
+    incremental.eliminar(1)
+    for campo, valores in copia.items():
+        np.testing.assert_array_equal(getattr(anterior, campo), valores, err_msg=campo)
@@ -0,0 +1,52 @@
+# Archivo: tests/test_indicadores.py
+"""TIR, precio de equilibrio y año de recuperación sobre flujos conocidos."""
+
+import numpy as np
+import pytest
+
+from snc.indicadores import anio_recuperacion, precio_equilibrio_soluciones, tir
+
+
+def test_tir_flujos_conocidos():
+    flujos = np.array([
+        [-100.0, 110.0, 0.0],
+        [-100.0, 60.0, 60.0],
+        [-1_000.0] + [0.0] * 2,
+    ])
+    resultado = tir(flujos)
+    assert resultado[0] == pytest.approx(0.10, abs=1e-10)
+    # -100 + 60 / (1 + r) + 60 / (1 + r)^2 = 0
+    assert resultado[1] == pytest.approx(0.130662386, abs=1e-8)
+    assert np.isnan(resultado[2])
+
+
+def test_tir_por_encima_del_intervalo_inicial():
+    # TIR de 10.000%: el extremo alto del intervalo de búsqueda se amplía
+    assert tir([-1.0] + [100.0] * 29)[0] == pytest.approx(100.0, rel=1e-8)
+
+
+def test_tir_sin_cambio_de_signo():
+    assert np.isnan(tir([[10.0, 5.0, 5.0]])).all()
+    assert np.isnan(tir([[-10.0, -5.0, 0.0]])).all()
+
+
+def test_precio_equilibrio():
+    # VPN = (-1000 + p * 10 * 20) con descuento 1 en el año 1 y 1/1.1 en el año 2
+    flujo_fijo = np.array([[-1_000.0, 0.0], [500.0, 0.0], [-10.0, 0.0]])
+    flujo_unitario = np.array([[0.0, 220.0], [0.0, 1.0], [0.0, 0.0]])
+    precio = precio_equilibrio_soluciones(flujo_fijo, flujo_unitario, 0.1)
+    assert precio[0] == pytest.approx(1_000 / 1.1 * 1.1 ** 2 / 220)
+    assert precio[1] == 0.0
+    assert np.isnan(precio[2])
+
+
+def test_anio_recuperacion():
+    flujos = np.array([
+        [-100.0, 50.0, 50.0, 10.0],
+        [-100.0, 150.0, -80.0, 40.0],
+        [-100.0, 10.0, 10.0, 10.0],
+    ])
+    # Años del portafolio desde 1, como en los gráficos de flujo: el año de inicio es el año 1
+    np.testing.assert_array_equal(anio_recuperacion(flujos), [3.0, 4.0, np.nan])
+    # Con inicio 2 el primer año de la solución es el año 3 del portafolio
+    np.testing.assert_array_equal(anio_recuperacion(flujos, np.array([0, 2, 5])), [3.0, 6.0, np.nan])
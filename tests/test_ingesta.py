@@ -0,0 +1,65 @@
+# Archivo: tests/test_ingesta.py
+"""La lectura por bloques debe dar la misma tabla que `pd.read_excel` y errores con la fila del libro."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.ingesta import ErrorIngesta, leer_soluciones_excel
+
+
+def _libro(df):
+    salida = io.BytesIO()
+    df.to_excel(salida, index=False)
+    return salida.getvalue()
+
+
+def test_bloques_igual_a_read_excel(soluciones_aleatorias):
+    df = soluciones_aleatorias(23, semilla=5)
+    datos = _libro(df)
+    # Bloques de 5 filas: el último queda incompleto
+    leido = leer_soluciones_excel(datos, tamano_bloque=5)
+    esperado = pd.read_excel(io.BytesIO(datos))
+
+    assert list(leido.columns) == list(esperado.columns)
+    assert isinstance(leido["Solución"].dtype, pd.CategoricalDtype)
+    assert leido["Duración (años)"].dtype == np.int16
+    assert leido["Área (ha)"].dtype == np.float32
+    pd.testing.assert_series_equal(leido["Solución"].astype(str), esperado["Solución"], check_names=False)
+    for columna in esperado.columns.drop("Solución"):
+        np.testing.assert_allclose(leido[columna].to_numpy(dtype=float), esperado[columna], rtol=1e-6, err_msg=columna)
+
+
+def test_inicio_vacio_toma_cero(soluciones_aleatorias):
+    df = soluciones_aleatorias(4, semilla=1).astype({"Año de Inicio": object})
+    df.loc[2, "Año de Inicio"] = None
+    leido = leer_soluciones_excel(_libro(df), tamano_bloque=3)
+    assert leido["Año de Inicio"].tolist() == [*df["Año de Inicio"][:2], 0, df["Año de Inicio"][3]]
+
+
+@pytest.mark.parametrize("columna, valor, mensaje", [
+    ("Área (ha)", "mucha", "Valor no numérico en 'Área (ha)' (fila 7 del libro): 'mucha'"),
+    ("Duración (años)", None, "Celda vacía en 'Duración (años)' (fila 7 del libro)"),
+])
+def test_error_con_la_fila_del_libro(soluciones_aleatorias, columna, valor, mensaje):
+    df = soluciones_aleatorias(8, semilla=2).astype({columna: object})
+    # Índice 5 = fila 7 del libro (encabezado en la fila 1), en el segundo bloque de 4
+    df.loc[5, columna] = valor
+    with pytest.raises(ErrorIngesta) as error:
+        leer_soluciones_excel(_libro(df), tamano_bloque=4)
+    assert str(error.value) == mensaje
+
+
+def test_columnas_faltantes(soluciones_aleatorias):
+    df = soluciones_aleatorias(3).drop(columns=["CAPEX Total (USD)", "Duración (años)"])
+    with pytest.raises(ErrorIngesta, match="Faltan columnas requeridas: CAPEX Total \\(USD\\), Duración \\(años\\)"):
+        leer_soluciones_excel(_libro(df))
+
+
+def test_archivo_danado():
+    from snc.columnar import leer_soluciones
+
+    with pytest.raises(ErrorIngesta, match="No se pudo leer 'danado.xlsx'"):
+        leer_soluciones(b"no es un libro", "danado.xlsx")
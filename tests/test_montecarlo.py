@@ -0,0 +1,56 @@
+# Archivo: tests/test_montecarlo.py
+"""Reproducibilidad del Monte Carlo y caso determinista contra el motor."""
+
+import numpy as np
+import pytest
+
+from snc.montecarlo import ConfiguracionMonteCarlo, Distribucion, simular
+from snc.motor import Parametros, calcular_portafolio
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def portafolio(soluciones_aleatorias):
+    return soluciones_aleatorias(15, semilla=9)
+
+
+@pytest.fixture
+def config():
+    return ConfiguracionMonteCarlo(
+        precio_inicial=Distribucion("lognormal", media=15.0, desviacion=0.3),
+        tasa_descuento=Distribucion("triangular", minimo=0.03, moda=0.05, maximo=0.09),
+        factor_captura=Distribucion("normal", media=1.0, desviacion=0.1, minimo=0.5, maximo=1.5),
+        n_simulaciones=2_500, tamano_lote=500, semilla=42,
+    )
+
+
+def test_misma_semilla_con_procesos(portafolio, config):
+    parametros = Parametros()
+    serie = simular(portafolio, parametros, config, N_ANIOS)
+    paralelo = simular(portafolio, parametros, ConfiguracionMonteCarlo(**{**vars(config), "procesos": 2}), N_ANIOS)
+    np.testing.assert_array_equal(paralelo.vpn, serie.vpn)
+    np.testing.assert_array_equal(paralelo.carbono, serie.carbono)
+    assert len(serie.vpn) == config.n_simulaciones
+
+    otra = simular(portafolio, parametros, ConfiguracionMonteCarlo(**{**vars(config), "semilla": 43}), N_ANIOS)
+    assert not np.array_equal(otra.vpn, serie.vpn)
+
+
+def test_triangular_degenerada():
+    rng = np.random.default_rng(0)
+    valores = Distribucion("triangular", minimo=0.05, moda=0.05, maximo=0.05).muestrear(rng, 4)
+    np.testing.assert_array_equal(valores, 0.05)
+
+
+def test_sin_incertidumbre_igual_al_motor(portafolio):
+    parametros = Parametros(precio_carbono=18.0, crecimiento_precio_carbono=0.02, tasa_descuento=0.06)
+    config = ConfiguracionMonteCarlo(
+        precio_inicial=Distribucion("fija", valor=18.0), volatilidad_precio=0.0, crecimiento_precio=0.02,
+        tasa_descuento=Distribucion("triangular", minimo=0.06, moda=0.06, maximo=0.06),
+        n_simulaciones=3, tamano_lote=2,
+    )
+    resultado = simular(portafolio, parametros, config, N_ANIOS)
+    motor = calcular_portafolio(portafolio, parametros, N_ANIOS)
+    np.testing.assert_allclose(resultado.vpn, motor.vpn.sum(), rtol=1e-9)
+    np.testing.assert_allclose(resultado.carbono, motor.carbono_total.sum(), rtol=1e-9)
@@ -0,0 +1,111 @@
+# Archivo: tests/test_motor.py
+"""Motor vectorizado contra el cálculo fila por fila de la versión original."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.motor import SOLUCIONES_PREDETERMINADAS, Parametros, calcular_portafolio, vector_descuento
+
+N_ANIOS = 30
+
+
+def _vpn_original(sol, parametros, n_anios=N_ANIOS):
+    """El bucle `iterrows` de la app original para una fila (inicio en el año 0)."""
+    catalogo = SOLUCIONES_PREDETERMINADAS[sol["Solución"]]
+    dur = int(sol["Duración (años)"])
+    area = sol["Área (ha)"] * parametros.multiplicador_area
+    if catalogo["tipo_captura"] == "lineal":
+        captura = np.linspace(catalogo["captura_inicial"], catalogo["captura_final"], dur)
+    elif catalogo["tipo_captura"] == "sigmoidal":
+        x = np.arange(dur)
+        captura = catalogo["captura_max"] / (1 + np.exp(-catalogo["velocidad"] * (x - catalogo["punto_medio"])))
+    elif catalogo["tipo_sn"] == "degradacion":
+        captura = np.full(dur, catalogo["captura"] * sol["% Pérdida Evitada"] / 100)
+    else:
+        captura = np.full(dur, float(catalogo["captura"]))
+    captura = captura * area * (1 - sol["Salvaguardas (%)"] / 100)
+
+    costo = sol["Costo anual por ha (USD)"] * area
+    ingreso_carbono = sum(
+        captura[anio] * parametros.precio_base * (1 + parametros.crecimiento_precio_carbono) ** anio
+        for anio in range(dur)
+    )
+    ingreso_encadenado = sum(
+        sol["Ingreso Encadenado (USD/año)"] * (1 + parametros.crecimiento_ingreso_encadenado) ** anio
+        for anio in range(dur)
+    )
+    flujo = np.zeros(n_anios)
+    flujo[0] = -sol["CAPEX Total (USD)"]
+    flujo[1:dur] = (ingreso_carbono + ingreso_encadenado - costo * dur) / dur
+    return sum(flujo[i] / (1 + parametros.tasa_ajustada) ** (i + 1) for i in range(n_anios))
+
+
+@pytest.fixture
+def portafolio(soluciones_aleatorias):
+    return soluciones_aleatorias(60, semilla=3)
+
+
+def test_caso_fijado_a_mano():
+    df = pd.DataFrame([{
+        "Solución": "Manglares", "Área (ha)": 100.0, "Costo anual por ha (USD)": 90.0,
+        "CAPEX Total (USD)": 800.0, "Duración (años)": 30, "Salvaguardas (%)": 0.0,
+        "Ingreso Encadenado (USD/año)": 0.0,
+    }])
+    r = calcular_portafolio(df, Parametros(precio_carbono=15.0, tasa_descuento=0.05))
+    # 100 ha × 10 tCO2e × 30 años = 30.000 t; ingreso 450.000; costo 270.000; flujo medio 6.000
+    assert r.carbono_total[0] == pytest.approx(30_000)
+    assert r.ingreso_total[0] == pytest.approx(450_000)
+    assert r.costo_total[0] == pytest.approx(270_000)
+    esperado = -800 / 1.05 + sum(6_000 / 1.05 ** t for t in range(2, 31))
+    assert r.vpn[0] == pytest.approx(esperado)
+    assert r.vpn[0] == pytest.approx(85_758.5157, abs=1e-3)
+
+
+@pytest.mark.parametrize("parametros", [
+    Parametros(),
+    Parametros(precio_carbono=22.0, crecimiento_precio_carbono=0.03, tasa_descuento=0.08,
+               crecimiento_ingreso_encadenado=0.02, multiplicador_area=1.3,
+               multiplicador_precio_carbono=0.9, multiplicador_tasa_descuento=1.1),
+])
+def test_igual_al_calculo_original(portafolio, parametros):
+    portafolio["Año de Inicio"] = 0
+    portafolio["Duración (años)"] = np.minimum(portafolio["Duración (años)"], N_ANIOS)
+    r = calcular_portafolio(portafolio, parametros, N_ANIOS)
+    esperado = [_vpn_original(sol, parametros) for _, sol in portafolio.iterrows()]
+    np.testing.assert_allclose(r.vpn, esperado, rtol=1e-9, atol=1e-6)
+
+
+def test_vpn_es_el_flujo_del_eje_descontado(portafolio):
+    parametros = Parametros(crecimiento_precio_carbono=0.02)
+    r = calcular_portafolio(portafolio, parametros, N_ANIOS)
+    assert r.horizonte == (portafolio["Año de Inicio"] + portafolio["Duración (años)"]).clip(lower=N_ANIOS).max()
+    descuento = 1 / (1 + parametros.tasa_ajustada) ** np.arange(1, r.horizonte + 1)
+    np.testing.assert_allclose(r.flujos_eje() @ descuento, r.vpn, rtol=1e-10)
+    np.testing.assert_allclose(r.flujo_total, r.flujos_eje().sum(axis=0))
+    np.testing.assert_allclose(r.captura_total.sum(), r.carbono_total.sum())
+
+
+def test_curvas_planas_igual_que_escalares(portafolio):
+    escalar = Parametros(precio_carbono=18.0, crecimiento_precio_carbono=0.02, tasa_descuento=0.06)
+    horizonte = calcular_portafolio(portafolio, escalar, N_ANIOS).horizonte
+    con_curvas = Parametros(
+        precio_carbono=18.0, crecimiento_precio_carbono=0.02, tasa_descuento=0.06,
+        curva_precio=18.0 * 1.02 ** np.arange(10), curva_descuento=[0.06] * horizonte,
+    )
+    np.testing.assert_allclose(vector_descuento(con_curvas, horizonte), vector_descuento(escalar, horizonte))
+    np.testing.assert_allclose(
+        calcular_portafolio(portafolio, con_curvas, N_ANIOS).vpn,
+        calcular_portafolio(portafolio, escalar, N_ANIOS).vpn,
+        rtol=1e-10,
+    )
+
+
+def test_tipo_captura_parcial_se_completa_del_catalogo(portafolio):
+    # Columna de texto con celdas vacías: las que faltan se toman del catálogo
+    con_tipo = portafolio.assign(**{"Tipo Captura": None})
+    con_tipo.loc[0, "Tipo Captura"] = SOLUCIONES_PREDETERMINADAS[portafolio.loc[0, "Solución"]]["tipo_captura"]
+    np.testing.assert_allclose(
+        calcular_portafolio(con_tipo, Parametros(), N_ANIOS).vpn,
+        calcular_portafolio(portafolio, Parametros(), N_ANIOS).vpn,
+    )
@@ -0,0 +1,69 @@
+# Archivo: tests/test_optimizacion.py
+"""Programa lineal pequeño con óptimo conocido y coherencia con el motor."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.motor import Parametros, calcular_portafolio
+from snc.optimizacion import Restricciones, coeficientes_por_ha, optimizar, tabla_asignacion, vpn_motor
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def coeficientes():
+    return pd.DataFrame({
+        "VPN/ha": [10.0, 6.0, -1.0],
+        "Carbono/ha": [1.0, 3.0, 5.0],
+        "CAPEX/ha": [100.0, 20.0, 10.0],
+        "Costo/ha": [0.0, 0.0, 0.0],
+    }, index=pd.Index(["A", "B", "C"], name="Solución"))
+
+
+def test_optimo_con_presupuesto_y_limites(coeficientes):
+    # B rinde más VPN por USD de CAPEX pero se limita a 30 ha; el resto del presupuesto va a A
+    restricciones = Restricciones(area_total=100.0, capex_total=5_000.0, area_maxima={"B": 30.0})
+    optimo = optimizar(coeficientes, restricciones)
+    assert optimo.exito
+    np.testing.assert_allclose(optimo.asignacion.to_numpy(), [44.0, 30.0, 0.0], atol=1e-9)
+    assert optimo.vpn == pytest.approx(620.0)
+    assert optimo.capex == pytest.approx(5_000.0)
+
+    # Un mínimo de 5 ha de C consume presupuesto de A
+    con_minimo = optimizar(coeficientes, Restricciones(100.0, 5_000.0, area_minima={"C": 5.0},
+                                                      area_maxima={"B": 30.0}))
+    np.testing.assert_allclose(con_minimo.asignacion.to_numpy(), [43.5, 30.0, 5.0], atol=1e-9)
+    assert con_minimo.vpn == pytest.approx(610.0)
+
+
+def test_carbono_minimo_y_objetivo_carbono(coeficientes):
+    restricciones = Restricciones(area_total=100.0, capex_total=5_000.0, carbono_minimo=300.0,
+                                  area_maxima={"B": 30.0})
+    optimo = optimizar(coeficientes, restricciones)
+    assert optimo.exito
+    assert optimo.carbono >= 300.0 - 1e-9
+    # Máximo carbono: todo el área en C (CAPEX 1.000)
+    carbono = optimizar(coeficientes, Restricciones(area_total=100.0, capex_total=5_000.0), objetivo="carbono")
+    assert carbono.carbono == pytest.approx(500.0)
+
+
+def test_infactible(coeficientes):
+    restricciones = Restricciones(area_total=10.0, area_minima={"A": 8.0, "C": 8.0})
+    assert not optimizar(coeficientes, restricciones).exito
+
+
+def test_vpn_del_optimizador_y_del_motor():
+    parametros = Parametros(precio_carbono=20.0, tasa_descuento=0.06)
+    restricciones = Restricciones(area_total=5_000.0, capex_total=2_000_000.0)
+    optimo = optimizar(coeficientes_por_ha(parametros, N_ANIOS), restricciones)
+    asignacion = optimo.asignacion[optimo.asignacion > 1e-6]
+
+    # Con el CAPEX escalado por el área, el motor reproduce el objetivo del programa lineal
+    por_ha = calcular_portafolio(tabla_asignacion(asignacion, capex_por_ha=True), parametros, N_ANIOS)
+    assert por_ha.vpn.sum() == pytest.approx(optimo.vpn, rel=1e-9)
+
+    # `vpn_motor` toma el CAPEX del catálogo como total por solución (el del formulario)
+    total = calcular_portafolio(tabla_asignacion(asignacion), parametros, N_ANIOS)
+    assert vpn_motor(optimo.asignacion, parametros, N_ANIOS) == pytest.approx(total.vpn.sum(), rel=1e-12)
+    assert vpn_motor(optimo.asignacion, parametros, N_ANIOS) > optimo.vpn
@@ -0,0 +1,90 @@
+# Archivo: tests/test_parcelas.py
+"""Modo parcela contra el motor y lectura de la tabla de atributos de un GeoPackage."""
+
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snc.ingesta import ErrorIngesta
+from snc.motor import SOLUCIONES_PREDETERMINADAS, Parametros, calcular_portafolio
+from snc.parcelas import calcular_parcelas, leer_parcelas
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def inventario():
+    rng = np.random.default_rng(21)
+    n = 200
+    nombres = np.array(list(SOLUCIONES_PREDETERMINADAS), dtype=object)
+    return pd.DataFrame({
+        "ID Parcela": np.arange(n),
+        "Solución": nombres[rng.integers(0, len(nombres), n)],
+        "Región": rng.choice(["Caribe", "Andina", "Pacífico"], n),
+        "Área (ha)": rng.uniform(1, 50, n),
+        "CAPEX por ha (USD)": rng.uniform(200, 900, n),
+        "Año de Inicio": rng.integers(0, 8, n),
+        "Duración (años)": rng.integers(10, 40, n),
+    })
+
+
+def _como_soluciones(inventario):
+    """La tabla de soluciones equivalente: un proyecto por parcela con su CAPEX total."""
+    return inventario.assign(**{
+        "CAPEX Total (USD)": inventario["CAPEX por ha (USD)"] * inventario["Área (ha)"],
+        "Costo anual por ha (USD)": [SOLUCIONES_PREDETERMINADAS[s]["costo"] for s in inventario["Solución"]],
+        "% Pérdida Evitada": [3.5 if SOLUCIONES_PREDETERMINADAS[s]["tipo_sn"] == "degradacion" else 0.0
+                              for s in inventario["Solución"]],
+    }).drop(columns=["CAPEX por ha (USD)", "Región", "ID Parcela"])
+
+
+def _igual_con_ceros(obtenido, esperado):
+    np.testing.assert_allclose(obtenido[:len(esperado)], esperado, rtol=1e-6, atol=1e-3)
+    np.testing.assert_allclose(obtenido[len(esperado):], 0.0, atol=1e-3)
+
+
+def test_totales_igual_al_motor(inventario):
+    parametros = Parametros(precio_carbono=18.0, crecimiento_precio_carbono=0.02, tasa_descuento=0.06)
+    # Bloques de 64 parcelas: el último queda incompleto
+    parcelas = calcular_parcelas(inventario, parametros, N_ANIOS, "Región", tamano_bloque=64)
+    portafolio = calcular_portafolio(_como_soluciones(inventario), parametros, N_ANIOS)
+
+    por_parcela = parcelas.parcelas.sort_values("ID Parcela")
+    np.testing.assert_allclose(por_parcela["VPN (USD)"], portafolio.vpn, rtol=1e-9)
+    np.testing.assert_allclose(por_parcela["Carbono Total (tCO2e)"], portafolio.carbono_total, rtol=1e-5)
+    np.testing.assert_allclose(parcelas.resumen(["Región"])["VPN (USD)"].sum(), portafolio.vpn.sum(), rtol=1e-9)
+
+    # Las series anuales por región suman las del portafolio
+    _igual_con_ceros(parcelas.flujo_anual.sum(axis=0), portafolio.flujo_total)
+    _igual_con_ceros(parcelas.captura_anual.sum(axis=0), portafolio.captura_total)
+    assert list(parcelas.grupos) == ["Andina", "Caribe", "Pacífico"]
+
+
+def _geopackage(tmp_path, tabla_declarada, tablas):
+    ruta = tmp_path / "inventario.gpkg"
+    with sqlite3.connect(ruta) as conexion:
+        conexion.execute("CREATE TABLE gpkg_contents (table_name TEXT, data_type TEXT)")
+        conexion.execute("INSERT INTO gpkg_contents VALUES (?, 'features')", (tabla_declarada,))
+        for nombre, df in tablas.items():
+            df.assign(geom=b"\x00\x01").to_sql(nombre, conexion, index=False)
+    datos = ruta.read_bytes()
+    os.remove(ruta)
+    return datos
+
+
+def test_geopackage_tabla_con_comillas(tmp_path, inventario):
+    nombre = 'parcelas "norte"; DROP TABLE gpkg_contents'
+    datos = _geopackage(tmp_path, nombre, {nombre: inventario.head(20)})
+    leido = leer_parcelas(datos, "inventario.gpkg", tamano_bloque=8)
+    assert len(leido) == 20
+    assert "geom" not in leido
+    np.testing.assert_allclose(leido["Área (ha)"], inventario["Área (ha)"].head(20), rtol=1e-6)
+
+
+def test_geopackage_tabla_inexistente(tmp_path, inventario):
+    datos = _geopackage(tmp_path, "no_existe", {"parcelas": inventario.head(5)})
+    with pytest.raises(ErrorIngesta, match="declara la tabla 'no_existe', que no existe"):
+        leer_parcelas(datos, "inventario.gpkg")
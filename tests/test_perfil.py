@@ -0,0 +1,31 @@
+# Archivo: tests/test_perfil.py
+"""El perfilador funciona sin /proc ni el módulo `resource` (Windows)."""
+
+import math
+
+import pytest
+
+from snc import perfil
+
+
+@pytest.fixture
+def sin_proc_ni_resource(monkeypatch, tmp_path):
+    monkeypatch.setattr(perfil, "resource", None)
+    monkeypatch.setattr(perfil, "_STATUS", tmp_path / "no_existe" / "status")
+    monkeypatch.setattr(perfil, "_CLEAR_REFS", tmp_path / "no_existe" / "clear_refs")
+
+
+def test_memoria_nan_sin_resource(sin_proc_ni_resource):
+    assert math.isnan(perfil.memoria_actual())
+    assert math.isnan(perfil.memoria_pico())
+    assert not perfil.reiniciar_pico()
+
+
+def test_etapa_sin_resource(sin_proc_ni_resource):
+    perfilador = perfil.Perfilador(activo=True)
+    with perfilador.etapa("calculo", 10) as registro:
+        registro["filas"] = 12
+    tabla = perfilador.tabla()
+    assert tabla["Etapa"].tolist() == ["calculo"]
+    assert tabla["Filas"].tolist() == [12]
+    assert tabla["Memoria pico del proceso (MB)"].tolist() == [0.0]
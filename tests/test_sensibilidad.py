@@ -0,0 +1,53 @@
+# Archivo: tests/test_sensibilidad.py
+"""Superficie de sensibilidad y flujos fijo / por USD contra el motor en puntos sueltos."""
+
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from snc.motor import Parametros, calcular_portafolio
+from snc.sensibilidad import flujos_por_precio, precio_equilibrio, superficie_vpn
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def portafolio(soluciones_aleatorias):
+    return soluciones_aleatorias(30, semilla=19)
+
+
+@pytest.mark.parametrize("parametros", [
+    Parametros(crecimiento_precio_carbono=0.02, crecimiento_ingreso_encadenado=0.01),
+    Parametros(curva_precio=[12.0, 14.0, 18.0], multiplicador_area=1.2),
+], ids=["crecimiento", "curva"])
+def test_superficie_igual_al_motor(portafolio, parametros):
+    precios = np.array([0.0, 8.0, 25.0, 60.0])
+    tasas = np.array([0.02, 0.07, 0.12])
+    superficie = superficie_vpn(portafolio, parametros, precios, tasas, N_ANIOS)
+    assert superficie.shape == (len(tasas), len(precios))
+    for i, tasa in enumerate(tasas):
+        for j, precio in enumerate(precios[1:], start=1):
+            # Con curva, el precio de la grilla es el del primer año y la curva se escala con él
+            movido = replace(parametros.con_precio_base(precio), tasa_descuento=tasa)
+            esperado = calcular_portafolio(portafolio, movido, N_ANIOS).vpn.sum()
+            assert superficie[i, j] == pytest.approx(esperado, rel=1e-9)
+        sin_carbono = replace(parametros, tasa_descuento=tasa, multiplicador_precio_carbono=0.0)
+        assert superficie[i, 0] == pytest.approx(calcular_portafolio(portafolio, sin_carbono, N_ANIOS).vpn.sum())
+
+
+def test_flujos_fijo_y_por_usd(portafolio):
+    parametros = Parametros(precio_carbono=17.0, crecimiento_precio_carbono=0.03)
+    fijo, unitario = flujos_por_precio(portafolio, parametros, N_ANIOS)
+    motor = calcular_portafolio(portafolio, parametros, N_ANIOS)
+    np.testing.assert_allclose(fijo + 17.0 * unitario, motor.flujos, rtol=1e-10, atol=1e-6)
+
+
+def test_precio_de_equilibrio_anula_el_vpn(portafolio):
+    parametros = Parametros()
+    tasas = np.array([0.03, 0.08])
+    precios = precio_equilibrio(portafolio, parametros, tasas, N_ANIOS)
+    for tasa, precio in zip(tasas, precios):
+        movido = replace(parametros, precio_carbono=precio, tasa_descuento=tasa)
+        vpn = calcular_portafolio(portafolio, movido, N_ANIOS).vpn.sum()
+        assert vpn == pytest.approx(0.0, abs=1e-6 * calcular_portafolio(portafolio, parametros, N_ANIOS).capex.sum())
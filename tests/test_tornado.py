@@ -0,0 +1,58 @@
+# Archivo: tests/test_tornado.py
+"""Cada barra del tornado debe coincidir con el motor evaluado con ese insumo movido."""
+
+import numpy as np
+import pytest
+
+from snc.motor import Parametros, calcular_portafolio
+from snc.tornado import VARIABLES_TORNADO, analisis_tornado
+
+N_ANIOS = 30
+
+
+@pytest.fixture
+def portafolio(soluciones_aleatorias):
+    return soluciones_aleatorias(40, semilla=11)
+
+
+@pytest.fixture
+def parametros():
+    return Parametros(precio_carbono=18.0, crecimiento_precio_carbono=0.02, tasa_descuento=0.06)
+
+
+def _fila(variable):
+    return list(VARIABLES_TORNADO).index(variable)
+
+
+def test_base_igual_al_motor(portafolio, parametros):
+    tornado = analisis_tornado(portafolio, parametros, n_anios=N_ANIOS)
+    np.testing.assert_allclose(tornado.vpn_base, calcular_portafolio(portafolio, parametros, N_ANIOS).vpn, rtol=1e-9)
+
+
+@pytest.mark.parametrize("variable, campo", [
+    ("Precio del carbono", "multiplicador_precio_carbono"),
+    ("Tasa de descuento", "multiplicador_tasa_descuento"),
+])
+def test_barras_igual_al_motor(portafolio, parametros, variable, campo):
+    tornado = analisis_tornado(portafolio, parametros, variacion=0.2, n_anios=N_ANIOS)
+    i = _fila(variable)
+    for factor, vpn in ((0.8, tornado.vpn_bajo[i]), (1.2, tornado.vpn_alto[i])):
+        movido = Parametros(**{**vars(parametros), campo: getattr(parametros, campo) * factor})
+        np.testing.assert_allclose(vpn, calcular_portafolio(portafolio, movido, N_ANIOS).vpn, rtol=1e-9)
+
+
+def test_crecimiento_y_capex_igual_al_motor(portafolio, parametros):
+    tornado = analisis_tornado(portafolio, parametros, variacion=0.2, puntos=0.01, n_anios=N_ANIOS)
+    i = _fila("Crecimiento del precio")
+    movido = Parametros(**{**vars(parametros), "crecimiento_precio_carbono": 0.03})
+    np.testing.assert_allclose(tornado.vpn_alto[i], calcular_portafolio(portafolio, movido, N_ANIOS).vpn, rtol=1e-9)
+
+    i = _fila("CAPEX")
+    con_capex = portafolio.assign(**{"CAPEX Total (USD)": portafolio["CAPEX Total (USD)"] * 1.2})
+    np.testing.assert_allclose(tornado.vpn_alto[i], calcular_portafolio(con_capex, parametros, N_ANIOS).vpn, rtol=1e-9)
+
+
+def test_tabla_ordenada_por_rango(portafolio, parametros):
+    tabla = analisis_tornado(portafolio, parametros, n_anios=N_ANIOS).tabla()
+    assert len(tabla) == len(VARIABLES_TORNADO)
+    assert (np.diff(tabla["Rango (USD)"].to_numpy()) <= 0).all()